@@ -0,0 +1,157 @@
+"""Helpers shared by the benchmark scripts in this directory."""
+from collections import OrderedDict
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from civis import _spec_cache
+
+SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         os.pardir, "civis", "tests", "civis_api_spec.json")
+API_KEY = "benchmark-key"
+
+
+def load_raw_spec():
+    """Return the bundled test copy of the API spec."""
+    with open(SPEC_PATH) as f:
+        return json.load(f, object_pairs_hook=OrderedDict)
+
+
+def write_spec_cache(path, api_key=API_KEY):
+    """Write the bundled spec to the spec cache at `path`, so that clients
+    and the CLI can start without network access."""
+    _spec_cache.write_entry(_spec_cache.entry_path(path, api_key), api_key,
+                            "1.0", load_raw_spec())
+
+
+def spec_cache_env(path, api_key=API_KEY):
+    """Return a copy of the environment which uses the spec cache at
+    `path`, for benchmarks which run civis in a subprocess."""
+    env = dict(os.environ, CIVIS_API_KEY=api_key,
+               CIVIS_API_SPEC_CACHE=path,
+               CIVIS_API_SPEC_CACHE_TTL=str(24 * 60 * 60))
+    root = os.path.dirname(os.path.dirname(SPEC_PATH))
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in [os.path.dirname(root), env.get("PYTHONPATH")] if p)
+    return env
+
+
+def best_of(func, repeat, setup=None):
+    """Return the shortest of `repeat` timings of ``func()`` in seconds.
+    ``setup()``, if given, is called untimed before each run."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def peak_memory(func, setup=None):
+    """Return the peak memory in bytes allocated by Python while running
+    ``func()``, as traced by :mod:`tracemalloc`."""
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# Run a module or a code string in a child interpreter and write the peak
+# resident set size of the child to the file named by argv[1] when it exits.
+# On Linux the child's ru_maxrss would include the memory of this process,
+# which it inherits through fork, so /proc/self/status is used instead.
+_CHILD = """
+import atexit, resource, runpy, sys
+
+def _write_peak_rss(path=sys.argv[1]):
+    try:
+        with open('/proc/self/status') as f:
+            rss = [int(line.split()[1]) * 1024 for line in f
+                   if line.startswith('VmHWM:')][0]
+    except (OSError, IndexError):
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform != 'darwin':
+            rss *= 1024
+    with open(path, 'w') as f:
+        f.write(str(rss))
+
+atexit.register(_write_peak_rss)
+kind, target = sys.argv[2:4]
+sys.argv = sys.argv[3:]
+if kind == '-m':
+    runpy.run_module(target, run_name='__main__', alter_sys=True)
+else:
+    exec(compile(target, '<benchmark>', 'exec'), {'__name__': '__main__'})
+"""
+
+
+def run_process(args, env, repeat):
+    """Run Python in a new process `repeat` times.
+
+    Parameters
+    ----------
+    args : list of str
+        Arguments to the Python interpreter: either ``["-c", code]`` or
+        ``["-m", module, *module_args]``.
+    env : dict
+        The environment of the new process.
+    repeat : int
+
+    Returns
+    -------
+    seconds : float
+        The shortest wall time of the runs.
+    rss : int
+        The largest peak resident set size of the runs, in bytes.
+    """
+    times, rss = [], []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        rss_path = os.path.join(tmpdir, "rss")
+        cmd = [sys.executable, "-c", _CHILD, rss_path] + list(args)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            proc = subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.PIPE)
+            times.append(time.perf_counter() - start)
+            if proc.returncode != 0:
+                raise RuntimeError("python {} failed:\n{}".format(
+                    " ".join(args), proc.stderr.decode("utf-8", "replace")))
+            with open(rss_path) as f:
+                rss.append(int(f.read()))
+    return min(times), max(rss)
+
+
+def report(title, rows, as_json=False):
+    """Print benchmark results.
+
+    Parameters
+    ----------
+    title : str
+    rows : list of (name, seconds, memory, memory_kind) tuples
+        `memory` is in bytes; `memory_kind` describes how it was measured.
+    as_json : bool
+        Print a JSON object, e.g. to compare releases, instead of a table.
+    """
+    if as_json:
+        print(json.dumps({"benchmark": title, "results": [
+            {"name": name, "seconds": seconds, "memory_bytes": memory,
+             "memory_kind": kind}
+            for name, seconds, memory, kind in rows]}, indent=2))
+        return
+    print(title)
+    print("{:<40} {:>10} {:>12}".format("", "time (ms)", "memory (MB)"))
+    for name, seconds, memory, kind in rows:
+        print("{:<40} {:>10.1f} {:>8.1f} {:<3}".format(
+            name, seconds * 1000, memory / 2 ** 20, kind))
+    print("memory: 'py' is peak traced Python allocations, 'rss' is the "
+          "peak resident set size of the process")
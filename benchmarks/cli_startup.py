@@ -0,0 +1,65 @@
+"""Benchmark the start up of the ``civis`` command line interface.
+
+Run with civis installed (e.g. ``pip install -e .``)::
+
+    python benchmarks/cli_startup.py [--repeat N] [--json]
+
+The bundled test copy of the API spec is written to a temporary spec cache,
+so no network access or API key is needed. In-process numbers are reported
+for loading the spec and for :func:`~civis.cli.__main__.generate_cli`, which
+builds a command for every API operation. ``civis --help`` and the help of
+a single subcommand are also run in new processes, which includes the
+interpreter start up and imports. Use ``--json`` to save results for
+comparison between releases.
+"""
+import argparse
+import os
+import tempfile
+
+from _common import (best_of, peak_memory, report, run_process,
+                     spec_cache_env, write_spec_cache)
+
+import civis
+from civis.cli import __main__ as cli_main
+
+SUBCOMMAND = ["users", "list-me", "--help"]
+
+
+def benchmark_in_process(repeat):
+    rows = []
+    for name, func in [("retrieve_spec_dict", cli_main.retrieve_spec_dict),
+                       ("generate_cli", cli_main.generate_cli)]:
+        rows.append((name, best_of(func, repeat), peak_memory(func), "py"))
+    return rows
+
+
+def benchmark_processes(env, repeat):
+    rows = []
+    for name, args in [("civis --help", ["--help"]),
+                       ("civis " + " ".join(SUBCOMMAND), SUBCOMMAND)]:
+        seconds, rss = run_process(["-m", "civis.cli"] + args, env, repeat)
+        rows.append((name, seconds, rss, "rss"))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="report the best of this many runs")
+    parser.add_argument("--json", action="store_true",
+                        help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_path = os.path.join(tmpdir, "spec.json")
+        write_spec_cache(cache_path)
+        env = spec_cache_env(cache_path)
+        os.environ.update(env)
+        rows = benchmark_in_process(args.repeat)
+        rows.extend(benchmark_processes(env, args.repeat))
+    report("CLI startup (civis {})".format(civis.__version__), rows,
+           args.json)
+
+
+if __name__ == "__main__":
+    main()
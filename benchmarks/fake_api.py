@@ -0,0 +1,117 @@
+"""Benchmark civis.io file transfers and job polling against a fake API.
+
+Run from a source checkout with civis installed (e.g. ``pip install -e .``)::
+
+    python benchmarks/fake_api.py [--latency SECONDS] [--jobs N] [--json]
+
+A :class:`civis.fake_api.FakeCivisAPI` on localhost stands in for the API
+and the storage service, answering every request after a fixed delay. Files
+of several sizes are uploaded with :func:`civis.io.file_to_civis` and
+downloaded with :func:`civis.io.civis_to_file`, and SQL exports are run with
+:func:`civis.io.civis_to_csv` from several threads at once, polling until
+each run finishes. The number of API requests per export shows how much the
+polling costs.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import io
+import json
+import os
+import tempfile
+import time
+
+import civis
+from civis.fake_api import FakeCivisAPI
+
+from _common import API_KEY, SPEC_PATH
+
+FILE_SIZES = [2 ** 10, 2 ** 20, 16 * 2 ** 20]
+
+
+def transfer(client, size, repeat):
+    """Return the best upload and download times of `size` bytes."""
+    contents = os.urandom(size)
+    uploads, downloads = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        file_id = civis.io.file_to_civis(io.BytesIO(contents), "benchmark",
+                                         client=client)
+        uploads.append(time.perf_counter() - start)
+        buf = io.BytesIO()
+        start = time.perf_counter()
+        civis.io.civis_to_file(file_id, buf, client=client)
+        downloads.append(time.perf_counter() - start)
+        assert buf.getvalue() == contents
+    return min(uploads), min(downloads)
+
+
+def export(client, server, n_jobs, polling_interval):
+    """Run `n_jobs` SQL exports at once. Return the wall time and the
+    number of API requests per export."""
+    before = server.requests
+    with tempfile.TemporaryDirectory() as tmpdir:
+
+        def run(i):
+            filename = os.path.join(tmpdir, "{}.csv".format(i))
+            civis.io.civis_to_csv(filename, "select 1", "fake-db",
+                                  polling_interval=polling_interval,
+                                  archive=False, client=client).result()
+            with open(filename, "rb") as f:
+                assert f.read() == server.query_result
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(n_jobs) as pool:
+            list(pool.map(run, range(n_jobs)))
+        seconds = time.perf_counter() - start
+    return seconds, (server.requests - before) / n_jobs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--latency", type=float, default=0.01,
+                        help="seconds the server waits before responding")
+    parser.add_argument("--job-duration", type=float, default=0.5,
+                        help="seconds each SQL run takes")
+    parser.add_argument("--polling-interval", type=float, default=0.1,
+                        help="seconds between polls of a run")
+    parser.add_argument("--jobs", type=int, default=8,
+                        help="number of concurrent SQL exports")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="number of transfers of each file size")
+    parser.add_argument("--json", action="store_true",
+                        help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    server = FakeCivisAPI(spec=SPEC_PATH, latency=args.latency,
+                          job_duration=args.job_duration, rate_limit=None)
+    with server:
+        client = civis.APIClient(api_key=API_KEY, base_url=server.url,
+                                 pool_maxsize=max(args.jobs, 10))
+        client.default_credential  # warm up
+        transfers = [(size,) + transfer(client, size, args.repeat)
+                     for size in FILE_SIZES]
+        seconds, requests_per_job = export(client, server, args.jobs,
+                                           args.polling_interval)
+
+    if args.json:
+        print(json.dumps({"benchmark": "fake_api", "results": {
+            "transfers": [{"bytes": size, "upload_seconds": up,
+                           "download_seconds": down}
+                          for size, up, down in transfers],
+            "exports": {"jobs": args.jobs, "seconds": seconds,
+                        "requests_per_job": requests_per_job}}}, indent=2))
+        return
+    print("civis.io against a fake API (civis {}, {:.0f} ms latency)".format(
+        civis.__version__, args.latency * 1000))
+    print("{:>12} {:>14} {:>16}".format("file (KB)", "upload (MB/s)",
+                                        "download (MB/s)"))
+    for size, up, down in transfers:
+        print("{:>12} {:>14.1f} {:>16.1f}".format(
+            size // 2 ** 10, size / up / 2 ** 20, size / down / 2 ** 20))
+    print("{} concurrent exports of {:.1f} s runs: {:.2f} s, {:.1f} API "
+          "requests each".format(args.jobs, args.job_duration, seconds,
+                                 requests_per_job))
+
+
+if __name__ == "__main__":
+    main()
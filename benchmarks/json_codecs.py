@@ -0,0 +1,141 @@
+"""Benchmark the JSON codecs available to :class:`civis.APIClient`.
+
+Run with civis installed (e.g. ``pip install -e .``)::
+
+    python benchmarks/json_codecs.py [--items N] [--repeat N] [--json]
+
+Synthetic ``tables.list`` and ``scripts.list`` pages are decoded with each
+installed codec (see ``APIClient(json_codec=...)``), both to plain objects
+and through the ``'snake'`` return type, which also builds
+:class:`~civis.response.Response` objects. The default, ``requests``, is
+:meth:`requests.Response.json`. Encoding a large request body is timed too.
+"""
+import argparse
+import json
+
+import requests
+
+from _common import best_of
+
+import civis
+from civis import _json
+from civis.response import convert_response_data_type
+
+
+def table(i):
+    return {
+        "id": i, "databaseId": 32, "schema": "schema_{}".format(i % 40),
+        "name": "table_{}".format(i),
+        "description": "Table number {}".format(i),
+        "isView": i % 7 == 0, "rowCount": i * 1013, "columnCount": i % 90,
+        "sizeMb": i * 0.37, "owner": "dbadmin", "distkey": "id",
+        "sortkeys": "created_at,id", "refreshStatus": "current",
+        "lastRefresh": "2016-11-07T18:31:02.000Z",
+        "dataUpdatedAt": "2016-11-07T18:31:02.000Z",
+        "schemaUpdatedAt": "2016-11-01T10:00:00.000Z", "refreshId": None,
+        "lastRun": {"id": i * 3, "state": "succeeded",
+                    "createdAt": "2016-11-07T18:30:00.000Z",
+                    "startedAt": "2016-11-07T18:30:01.000Z",
+                    "finishedAt": "2016-11-07T18:31:02.000Z",
+                    "error": None},
+    }
+
+
+def script(i):
+    return {
+        "id": i, "name": "Script {}".format(i), "type": "SqlScript",
+        "createdAt": "2016-10-01T12:00:00.000Z",
+        "updatedAt": "2016-11-07T18:31:02.000Z",
+        "author": {"id": 42, "name": "Jane Doe", "username": "jdoe",
+                   "initials": "JD", "online": False},
+        "state": "succeeded", "finishedAt": "2016-11-07T18:31:02.000Z",
+        "category": "script", "projects": [{"id": 7, "name": "Inventory"}],
+        "parentId": None, "userContext": "runner",
+        "params": [{"name": "LIMIT", "type": "integer", "default": "100"}],
+        "arguments": {"LIMIT": 100}, "isTemplate": False,
+        "publishedAsTemplateId": None, "fromTemplateId": None,
+        "templateDependentsCount": None, "templateScriptName": None,
+        "links": {"details": "api.civisanalytics.com/scripts/{}".format(i),
+                  "runs": "api.civisanalytics.com/scripts/{}/runs".format(i)},
+        "schedule": {"scheduled": False, "scheduledDays": [],
+                     "scheduledHours": [], "scheduledMinutes": [],
+                     "scheduledRunsPerHour": None},
+        "archived": "false", "hidden": False,
+    }
+
+
+def raw_response(items):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = "application/json"
+    response._content = json.dumps(items).encode("utf-8")
+    return response
+
+
+def available_codecs():
+    codecs = [("requests", None)]
+    for name in _json.CODEC_NAMES:
+        try:
+            codecs.append((name, _json.get_codec(name)))
+        except ImportError:
+            pass
+    return codecs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--items", type=int, default=5000,
+                        help="number of items in each listing")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="report the best of this many runs")
+    parser.add_argument("--json", action="store_true",
+                        help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    listings = [("tables.list", [table(i) for i in range(args.items)]),
+                ("scripts.list", [script(i) for i in range(args.items)])]
+    results = []
+    for listing, items in listings:
+        response = raw_response(items)
+        for name, codec in available_codecs():
+            for return_type in ["raw", "snake"]:
+                def decode():
+                    # The response must be decoded every time, so bypass
+                    # any caching of the parsed body.
+                    if return_type == "raw":
+                        if codec is None:
+                            return response.json()
+                        return codec.loads(response.content)
+                    return convert_response_data_type(
+                        response, return_type="snake", json_codec=codec)
+
+                seconds = best_of(decode, args.repeat)
+                results.append(("decode " + listing, name, return_type,
+                                seconds))
+        body = {"rows": items}
+        for name, codec in available_codecs():
+            dumps = json.dumps if codec is None else codec.dumps
+            seconds = best_of(lambda: dumps(body), args.repeat)
+            results.append(("encode " + listing, name, "-", seconds))
+
+    if args.json:
+        print(json.dumps({"benchmark": "json_codecs", "items": args.items,
+                          "results": [
+                              {"case": case, "codec": name, "return_type": rt,
+                               "seconds": seconds}
+                              for case, name, rt, seconds in results]},
+                         indent=2))
+        return
+    print("JSON codecs (civis {}, {} items per listing, {:.1f} MB "
+          "tables.list page)".format(
+              civis.__version__, args.items,
+              len(raw_response(listings[0][1]).content) / 2 ** 20))
+    print("{:<22} {:<10} {:<8} {:>10}".format("case", "codec", "returns",
+                                              "time (ms)"))
+    for case, name, return_type, seconds in results:
+        print("{:<22} {:<10} {:<8} {:>10.1f}".format(case, name, return_type,
+                                                     seconds * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark building :class:`~civis.response.Response` objects.
+
+Run with civis installed (e.g. ``pip install -e .``)::
+
+    python benchmarks/responses.py [--items N] [--repeat N] [--json]
+
+The decoded items of synthetic ``tables.list`` and ``scripts.list`` pages
+(the same as in ``json_codecs.py``) are turned into ``Response`` objects, as
+the ``'snake'`` return type does. Each listing is timed when only the
+responses are built, when a few fields of each are read, and when every
+nested value is read (by encoding the responses as JSON). Nested values are
+converted when they are first read, so the first two cases show what
+callers which use part of a large listing pay.
+"""
+import argparse
+import json
+
+from _common import best_of, peak_memory, report
+from json_codecs import script, table
+
+import civis
+from civis.response import Response
+
+
+def build(items):
+    return [Response(item) for item in items]
+
+
+def read_fields(items):
+    for response in build(items):
+        response.id, response.name, response.get("last_run")
+
+
+def read_all(items):
+    json.dumps(build(items))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--items", type=int, default=5000,
+                        help="number of items in each listing")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="report the best of this many runs")
+    parser.add_argument("--json", action="store_true",
+                        help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    listings = [("tables.list", [table(i) for i in range(args.items)]),
+                ("scripts.list", [script(i) for i in range(args.items)])]
+    cases = [("build", build), ("read fields", read_fields),
+             ("read all", read_all)]
+    rows = []
+    for listing, items in listings:
+        for case, func in cases:
+            seconds = best_of(lambda: func(items), args.repeat)
+            memory = peak_memory(lambda: func(items))
+            rows.append(("{} {}".format(listing, case), seconds, memory,
+                         "py"))
+    report("Response objects (civis {}, {} items per listing)".format(
+        civis.__version__, args.items), rows, as_json=args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Benchmark the construction of :class:`civis.APIClient`.
+
+Run with civis installed (e.g. ``pip install -e .``)::
+
+    python benchmarks/startup.py [--repeat N] [--json]
+
+The bundled test copy of the API spec is written to a temporary spec cache,
+so no network access or API key is needed. The time to build the endpoint
+classes is broken down into
+
+* spec load: reading the spec from the spec cache,
+* ref resolution: resolving the ``$ref``s of every operation,
+* class creation: creating the methods and endpoint classes from the
+  resolved operations,
+* :func:`~civis.resources._resources.parse_swagger`, which does the last
+  two steps, and
+* docstrings: building every method docstring. Docstrings are built on
+  first use, so this is time that client construction does not spend.
+
+Whole-client numbers are reported for a cold client (no cached spec or
+classes in the process), a warm client (a second client in the same
+process) and a new Python process which imports civis and creates a client.
+Use ``--json`` to save results for comparison between releases.
+"""
+import argparse
+import os
+import tempfile
+
+from _common import (API_KEY, best_of, load_raw_spec, peak_memory, report,
+                     run_process, spec_cache_env, write_spec_cache)
+
+import civis
+from civis import _spec_cache
+from civis.resources import _resources
+from civis.resources._refs import RefResolver
+
+
+def _no_fetch(headers):
+    raise RuntimeError("The benchmark spec cache was not used")
+
+
+def _resolve_groups(spec):
+    resolver = RefResolver(spec)
+    groups = _resources.group_paths(spec['paths'], "1.0", "all")
+    return [[(path, resolver.resolve(ops)) for path, ops in paths]
+            for paths in groups.values()]
+
+
+def _create_classes(resolved_groups):
+    return [_resources.parse_resource(paths, "1.0", "all")
+            for paths in resolved_groups]
+
+
+def _build_docs(classes):
+    for cls in classes.values():
+        for name, method in vars(cls).items():
+            if not name.startswith('_'):
+                method.__doc__
+
+
+def _clear_caches():
+    with _resources._spec_memo_lock:
+        _resources._spec_memo.clear()
+    with _resources._class_cache_lock:
+        _resources._class_cache.clear()
+    _resources._spec_digests.clear()
+
+
+def benchmark_phases(cache_path, repeat):
+    rows = []
+
+    def load():
+        return _spec_cache.load_spec(_no_fetch, API_KEY, "1.0",
+                                     path=cache_path)
+
+    rows.append(("spec load", best_of(load, repeat), peak_memory(load),
+                 "py"))
+
+    spec = load_raw_spec()
+    rows.append(("ref resolution",
+                 best_of(lambda: _resolve_groups(spec), repeat),
+                 peak_memory(lambda: _resolve_groups(spec)), "py"))
+
+    resolved = _resolve_groups(spec)
+    rows.append(("class creation",
+                 best_of(lambda: _create_classes(resolved), repeat),
+                 peak_memory(lambda: _create_classes(resolved)), "py"))
+
+    def parse():
+        return _resources.parse_swagger(spec, "1.0", "all")
+
+    rows.append(("parse_swagger", best_of(parse, repeat), peak_memory(parse),
+                 "py"))
+
+    # Docstrings are cached once built, so build them on new classes.
+    classes = []
+    rows.append(("docstrings",
+                 best_of(lambda: _build_docs(classes[-1]), repeat,
+                         setup=lambda: classes.append(parse())),
+                 peak_memory(lambda: _build_docs(classes[-1]),
+                             setup=lambda: classes.append(parse())),
+                 "py"))
+    return rows
+
+
+def benchmark_clients(cache_path, repeat):
+    def client():
+        return civis.APIClient(api_key=API_KEY, resources="all")
+
+    rows = [("APIClient() cold", best_of(client, repeat, _clear_caches),
+             peak_memory(client, _clear_caches), "py")]
+    client()
+    rows.append(("APIClient() warm", best_of(client, repeat),
+                 peak_memory(client), "py"))
+
+    env = spec_cache_env(cache_path)
+    for name, code in [
+            ("python: interpreter only", "pass"),
+            ("python: import civis", "import civis"),
+            ("python: APIClient()", "import civis; civis.APIClient()"),
+            ("python: APIClient(lazy_resources=True)",
+             "import civis; civis.APIClient(lazy_resources=True)")]:
+        seconds, rss = run_process(["-c", code], env, repeat)
+        rows.append((name, seconds, rss, "rss"))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="report the best of this many runs")
+    parser.add_argument("--json", action="store_true",
+                        help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_path = os.path.join(tmpdir, "spec.json")
+        write_spec_cache(cache_path)
+        os.environ.update(spec_cache_env(cache_path))
+        rows = benchmark_phases(cache_path, args.repeat)
+        rows.extend(benchmark_clients(cache_path, args.repeat))
+    report("APIClient startup (civis {})".format(civis.__version__), rows,
+           args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark request throughput of one client shared by several threads.
+
+Run with civis installed (e.g. ``pip install -e .``)::
+
+    python benchmarks/threads.py [--requests N] [--latency SECONDS] [--json]
+
+A local HTTP server stands in for the API and answers every request after
+a fixed delay, which plays the part of network and server latency. The same
+number of requests is sent through a single session by 1, 2, 4, 8 and 16
+threads. As long as the connection pool is at least as large as the number
+of threads, throughput should grow close to linearly with the thread count.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import http.server
+import json
+import socketserver
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import civis
+from civis.base import Endpoint
+
+THREAD_COUNTS = [1, 2, 4, 8, 16]
+
+
+class _Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+    request_queue_size = 64
+
+
+def _handler(latency):
+    body = json.dumps({"id": 1, "name": "benchmark"}).encode("utf-8")
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def run(endpoint, n_threads, n_requests):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(n_threads) as pool:
+        results = pool.map(lambda _: endpoint._call_api("get", "objects/1"),
+                           range(n_requests))
+        assert all(r["name"] == "benchmark" for r in results)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--requests", type=int, default=200,
+                        help="number of requests per thread count")
+    parser.add_argument("--latency", type=float, default=0.02,
+                        help="seconds the server waits before responding")
+    parser.add_argument("--json", action="store_true",
+                        help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    server = _Server(("127.0.0.1", 0), _handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_maxsize=max(THREAD_COUNTS)))
+    endpoint = Endpoint(
+        session, return_type="snake",
+        base_url="http://127.0.0.1:{}/".format(server.server_port))
+
+    rows = []
+    try:
+        run(endpoint, max(THREAD_COUNTS), max(THREAD_COUNTS))  # warm up
+        for n_threads in THREAD_COUNTS:
+            seconds = run(endpoint, n_threads, args.requests)
+            rows.append((n_threads, args.requests / seconds))
+    finally:
+        server.shutdown()
+        server.server_close()
+        session.close()
+
+    if args.json:
+        print(json.dumps({"benchmark": "threads", "results": [
+            {"threads": n, "requests_per_second": rps} for n, rps in rows]},
+            indent=2))
+        return
+    print("Shared session throughput (civis {}, {:.0f} ms latency)".format(
+        civis.__version__, args.latency * 1000))
+    print("{:>8} {:>14} {:>9}".format("threads", "requests/s", "speedup"))
+    for n_threads, rps in rows:
+        print("{:>8} {:>14.1f} {:>8.1f}x".format(n_threads, rps,
+                                                 rps / rows[0][1]))
+
+
+if __name__ == "__main__":
+    main()
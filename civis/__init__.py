@@ -1,5 +1,43 @@
+import importlib
+import importlib.util
+import sys
+
 from ._version import __version__
-from .civis import APIClient, find, find_one
-from . import io
 
 __all__ = ["__version__", "APIClient", "find", "find_one", "io"]
+
+# Importing `civis.civis` pulls in `requests` and the resource generator,
+# which is a noticeable share of the runtime of short scripts. Where the
+# interpreter supports module-level ``__getattr__`` (PEP 562), those
+# imports are deferred until the names are first used.
+_LAZY_ATTRIBUTES = {
+    "APIClient": ".civis",
+    "find": ".civis",
+    "find_one": ".civis",
+    "io": ".io",
+    "AsyncAPIClient": ".aio",
+}
+
+if sys.version_info < (3, 7):
+    from .civis import APIClient, find, find_one  # noqa: F401
+    from . import base, io, polling, resources, response  # noqa: F401
+else:
+    __all__.append("AsyncAPIClient")
+
+    def __getattr__(name):
+        module_name = _LAZY_ATTRIBUTES.get(name)
+        if module_name is None:
+            # Submodules such as `civis.base` used to be imported along with
+            # `civis.civis`, so code may use them after only `import civis`.
+            if (name.startswith("__") or
+                    importlib.util.find_spec(__name__ + "." + name) is None):
+                raise AttributeError("module {!r} has no attribute "
+                                     "{!r}".format(__name__, name))
+            return importlib.import_module(__name__ + "." + name)
+        module = importlib.import_module(module_name, __name__)
+        value = module if name == "io" else getattr(module, name)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,92 @@
+"""JSON codecs for encoding request bodies and decoding responses.
+
+By default, :mod:`requests` encodes and decodes JSON with the standard
+library. ``civis.APIClient(json_codec=...)`` can select a faster library,
+which makes a difference for large listings.
+"""
+import importlib
+import json
+
+
+CODEC_NAMES = ["json", "orjson", "ujson"]
+
+# The codecs ``"auto"`` tries, fastest first
+_AUTO_ORDER = ("orjson", "ujson", "json")
+
+
+class JSONCodec:
+    """A pair of functions to decode and encode JSON.
+
+    Parameters
+    ----------
+    name : str
+        A name for the codec, e.g. the name of the library.
+    loads : callable
+        Takes a JSON document as bytes and returns the decoded object.
+        Must raise a :class:`ValueError` for invalid JSON.
+    dumps : callable
+        Takes an object and returns a JSON document as str or bytes.
+    """
+    def __init__(self, name, loads, dumps):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+    def __repr__(self):
+        return "<JSONCodec {}>".format(self.name)
+
+
+def _stdlib_loads(data):
+    # json.loads only accepts bytes from Python 3.6.
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj, separators=(',', ':'))
+
+
+def _load_codec(name):
+    if name == "json":
+        return JSONCodec("json", _stdlib_loads, _stdlib_dumps)
+    module = importlib.import_module(name)
+    return JSONCodec(name, module.loads, module.dumps)
+
+
+def get_codec(codec):
+    """Return a :class:`JSONCodec`.
+
+    Parameters
+    ----------
+    codec : str or object
+        One of ``"json"``, ``"orjson"`` or ``"ujson"`` to use that library,
+        ``"auto"`` to use the first of ``"orjson"``, ``"ujson"`` and
+        ``"json"`` that is installed, or any object with ``loads`` and
+        ``dumps`` functions.
+
+    Raises
+    ------
+    ImportError
+        If the requested library is not installed.
+    ValueError
+        If `codec` is not a known name.
+    TypeError
+        If `codec` is an object without ``loads`` and ``dumps`` functions.
+    """
+    if not isinstance(codec, str):
+        if not (callable(getattr(codec, "loads", None)) and
+                callable(getattr(codec, "dumps", None))):
+            raise TypeError("A JSON codec must have loads and dumps "
+                            "functions")
+        return codec
+    if codec == "auto":
+        for name in _AUTO_ORDER:
+            try:
+                return _load_codec(name)
+            except ImportError:
+                continue
+    if codec not in CODEC_NAMES:
+        raise ValueError("json_codec must be 'auto', one of {}, or an object "
+                         "with loads and dumps functions".format(CODEC_NAMES))
+    return _load_codec(codec)
@@ -0,0 +1,256 @@
+"""On-disk cache for the Civis API specification.
+
+Both :class:`civis.APIClient` and the ``civis`` command line interface need
+the OpenAPI specification served at ``/endpoints`` before they can do
+anything useful. Downloading it on every process start is slow, so the
+specification is cached in JSON files shared by the client and the CLI.
+The specification can differ between users and APIs, so each API key and
+API base URL (see :envvar:`CIVIS_API_ENDPOINT`) has its own file, named
+after the cache location (``~/.civis_api_spec.json`` by default) with a hash
+of the key and URL added, e.g. ``~/.civis_api_spec-0123456789abcdef.json``.
+
+Each cache file is a small JSON envelope around the raw specification::
+
+    {"cache_version": 1, "api_version": "1.0", "key_hash": "...",
+     "base_url": "https://api.civisanalytics.com/",
+     "fetched_at": 1478000000.0, "etag": "...", "last_modified": "...",
+     "spec": {...}}
+
+A cached specification is only used for the same API version, API key and
+API base URL as it was fetched for.
+
+Once a cached specification is older than the TTL, it is revalidated with a
+conditional request using the ``ETag`` and ``Last-Modified`` headers of the
+response it came from. If the API answers ``304 Not Modified``, the cached
+copy is used for another TTL period without downloading it again.
+
+Set the :envvar:`CIVIS_API_SPEC_CACHE` environment variable to change the
+cache location (from which the file names are derived) and
+:envvar:`CIVIS_API_SPEC_CACHE_TTL` to change the number of seconds for which
+a cached specification is trusted. A TTL of ``0`` disables the cache.
+
+Whenever a specification is written to the cache, cache files which haven't
+been written for longer than the TTL are removed. Specifications of APIs on
+the local machine (e.g. a :class:`civis.fake_api.FakeCivisAPI`, which runs
+on a new port each time) are never cached.
+"""
+from collections import OrderedDict
+import hashlib
+import ipaddress
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+from civis._utils import DEFAULT_API_BASE_URL
+
+
+log = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_PATH = \
+    os.path.join(os.path.expanduser('~'), ".civis_api_spec.json")
+DEFAULT_CACHE_TTL = 24 * 60 * 60
+
+
+def cache_path():
+    """Return the location of the API spec cache file."""
+    return os.environ.get("CIVIS_API_SPEC_CACHE") or DEFAULT_CACHE_PATH
+
+
+def cache_ttl():
+    """Return the number of seconds for which a cached spec is valid."""
+    ttl = os.environ.get("CIVIS_API_SPEC_CACHE_TTL")
+    if not ttl:
+        return DEFAULT_CACHE_TTL
+    try:
+        return float(ttl)
+    except ValueError:
+        log.warning("Ignoring invalid CIVIS_API_SPEC_CACHE_TTL %r", ttl)
+        return DEFAULT_CACHE_TTL
+
+
+def _key_hash(api_key):
+    # The spec can differ between users, so remember whose spec this is
+    # without writing the key itself to disk.
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+
+
+def entry_path(path, api_key, base_url=DEFAULT_API_BASE_URL):
+    """Return the cache file for `api_key` and `base_url`.
+
+    The name of the file is `path` with a hash of the key and base URL
+    inserted before the extension, so clients for several users or APIs
+    don't overwrite each other's cached specs.
+    """
+    digest = hashlib.sha256(
+        "{}\n{}".format(_key_hash(api_key), base_url).encode('utf-8'))
+    root, ext = os.path.splitext(path)
+    return "{}-{}{}".format(root, digest.hexdigest()[:16], ext)
+
+
+def _is_loopback(base_url):
+    host = urlsplit(base_url).hostname or ""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def prune(path, ttl, keep=None):
+    """Remove the cache files derived from `path` (see :func:`entry_path`)
+    which haven't been written for more than `ttl` seconds, except `keep`.
+    Failure to remove a file is logged and otherwise ignored.
+    """
+    root, ext = os.path.splitext(os.path.abspath(path))
+    dirname, prefix = os.path.split(root)
+    pattern = re.compile(re.escape(prefix) + r"-[0-9a-f]{16}" +
+                         re.escape(ext) + "$")
+    try:
+        names = os.listdir(dirname)
+    except OSError:
+        return
+    now = time.time()
+    for name in names:
+        filename = os.path.join(dirname, name)
+        if not pattern.match(name) or filename == keep:
+            continue
+        try:
+            if now - os.path.getmtime(filename) > ttl:
+                os.unlink(filename)
+        except OSError as e:
+            log.debug("Unable to remove API spec cache %s: %s", filename, e)
+
+
+def read_entry(path, api_key, api_version, base_url=DEFAULT_API_BASE_URL):
+    """Read a cache entry from `path`.
+
+    Returns
+    -------
+    dict or None
+        The cache envelope, or ``None`` if the file does not exist, can't be
+        parsed, or was written for a different format, API version, user or
+        API base URL.
+    """
+    try:
+        with open(path) as f:
+            entry = json.load(f, object_pairs_hook=OrderedDict)
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(entry, dict) or
+            entry.get("cache_version") != CACHE_VERSION or
+            entry.get("api_version") != api_version or
+            entry.get("key_hash") != _key_hash(api_key) or
+            entry.get("base_url", DEFAULT_API_BASE_URL) != base_url or
+            not isinstance(entry.get("fetched_at"), (int, float)) or
+            not isinstance(entry.get("spec"), dict)):
+        return None
+    return entry
+
+
+def write_entry(path, api_key, api_version, spec, etag=None,
+                last_modified=None, base_url=DEFAULT_API_BASE_URL):
+    """Atomically write `spec` to the cache file at `path`.
+
+    The entry is written to a temporary file in the same directory and then
+    moved into place, so concurrent readers see either the old or the new
+    cache file, never a partial one. Failure to write the cache is logged
+    and otherwise ignored.
+    """
+    entry = OrderedDict([("cache_version", CACHE_VERSION),
+                         ("api_version", api_version),
+                         ("key_hash", _key_hash(api_key)),
+                         ("base_url", base_url),
+                         ("fetched_at", time.time()),
+                         ("etag", etag),
+                         ("last_modified", last_modified),
+                         ("spec", spec)])
+    dirname = os.path.dirname(os.path.abspath(path))
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=dirname, suffix=".tmp",
+                                        prefix=".civis_api_spec")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        log.debug("Unable to write API spec cache %s: %s", path, e)
+
+
+def _conditional_headers(entry):
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def load_spec(fetch, api_key, api_version, path=None, ttl=None,
+              base_url=DEFAULT_API_BASE_URL):
+    """Return the API spec from the on-disk cache or from `fetch`.
+
+    Parameters
+    ----------
+    fetch : callable
+        Called with a dict of extra request headers when the cache can't be
+        used as is. Must return a :class:`requests:requests.Response` for
+        the ``/endpoints`` request. The headers make the request conditional
+        when a stale copy of the spec is cached, in which case the response
+        may be a ``304 Not Modified``.
+    api_key : str
+        The API key used to retrieve the spec.
+    api_version : str
+        The version of the API spec.
+    path : str, optional
+        The location of the cache, from which the name of the cache file
+        for `api_key` and `base_url` is derived (see :func:`entry_path`).
+        Defaults to :func:`cache_path`.
+    ttl : float, optional
+        Seconds for which a cached spec is valid. Defaults to
+        :func:`cache_ttl`. A non-positive value bypasses the cache.
+        The cache is also bypassed for a `base_url` on the local machine.
+    base_url : str, optional
+        The base URL of the API which `fetch` requests the spec from.
+
+    Returns
+    -------
+    spec : OrderedDict
+        The parsed API specification.
+    """
+    base_path = cache_path() if path is None else path
+    path = entry_path(base_path, api_key, base_url)
+    ttl = cache_ttl() if ttl is None else ttl
+    use_cache = ttl > 0 and not _is_loopback(base_url)
+
+    entry = None
+    if use_cache:
+        entry = read_entry(path, api_key, api_version, base_url)
+        if entry is not None and time.time() - entry["fetched_at"] < ttl:
+            return entry["spec"]
+
+    headers = _conditional_headers(entry) if entry is not None else {}
+    response = fetch(headers)
+    if response.status_code == 304 and entry is not None:
+        spec = entry["spec"]
+        etag = response.headers.get("ETag") or entry.get("etag")
+        last_modified = (response.headers.get("Last-Modified") or
+                         entry.get("last_modified"))
+    else:
+        response.raise_for_status()
+        spec = json.loads(response.text, object_pairs_hook=OrderedDict)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+    if use_cache:
+        write_entry(path, api_key, api_version, spec, etag, last_modified,
+                    base_url)
+        prune(base_path, ttl, keep=os.path.abspath(path))
+    return spec
@@ -1,11 +1,25 @@
+import os
 import re
 import uuid
 
 
+DEFAULT_API_BASE_URL = "https://api.civisanalytics.com/"
+
 UNDERSCORER1 = re.compile(r'(.)([A-Z][a-z]+)')
 UNDERSCORER2 = re.compile('([a-z0-9])([A-Z])')
 
 
+def get_api_base_url(base_url=None):
+    """Return the base URL of the Civis API, ending with a slash.
+
+    This is `base_url` if given, otherwise the :envvar:`CIVIS_API_ENDPOINT`
+    environment variable if it is set, otherwise the public API.
+    """
+    base_url = (base_url or os.environ.get("CIVIS_API_ENDPOINT") or
+                DEFAULT_API_BASE_URL)
+    return base_url.rstrip("/") + "/"
+
+
 def maybe_get_random_name(name):
     if not name:
         name = uuid.uuid4().hex
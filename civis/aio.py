@@ -0,0 +1,336 @@
+"""An asyncio client for the Civis API.
+
+:class:`AsyncAPIClient` is generated from the same API specification as
+:class:`civis.APIClient`, but its endpoint methods return coroutines, so a
+single thread can have many API calls in flight at once::
+
+    >>> import asyncio
+    >>> from civis.aio import AsyncAPIClient
+    >>> async def main():
+    ...     async with AsyncAPIClient() as client:
+    ...         me, scripts = await asyncio.gather(
+    ...             client.users.list_me(), client.scripts.list())
+    ...         async for query in client.queries.list(iterator=True):
+    ...             print(query.id)
+    >>> asyncio.run(main())
+
+Requests are sent with `aiohttp <https://docs.aiohttp.org>`_, which must be
+installed separately unless you pass in your own session. This module
+requires Python 3.6 or later.
+"""
+import base64
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import civis
+from civis._utils import get_api_base_url
+from civis.base import CivisAPIError, CivisAPIKeyError, Endpoint
+from civis.civis import _get_api_key
+from civis.response import _response_to_json, convert_response_data_type
+
+
+def _to_requests_response(status, reason, headers, body, url):
+    # Build a requests.Response from an aiohttp response, so that errors and
+    # return types are handled exactly as for the synchronous client.
+    response = requests.Response()
+    response.status_code = status
+    response.reason = reason
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = body
+    response.url = url
+    response.encoding = requests.utils.get_encoding_from_headers(
+        response.headers)
+    return response
+
+
+def _query_params(params):
+    """Return `params` as a list of query parameters which aiohttp accepts.
+
+    Unlike requests, aiohttp rejects booleans and ``None``. Booleans are
+    sent as ``true`` or ``false``, ``None`` values are left out and lists
+    are sent as repeated parameters.
+    """
+    if not params:
+        return None
+    query = []
+    for name, value in params.items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        for value in values:
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                value = "true" if value else "false"
+            query.append((name, value))
+    return query
+
+
+class AsyncEndpoint(Endpoint):
+    """Base class of the endpoint classes of :class:`AsyncAPIClient`.
+
+    Generated methods return a coroutine which makes the API call, or, if
+    called with ``iterator=True``, an :class:`AsyncPaginatedResponse`.
+
+    Parameters
+    ----------
+    session : ``aiohttp.ClientSession``
+        The session with which to make requests.
+    return_type : str, optional
+        See :class:`AsyncAPIClient`.
+    timeout : ``aiohttp.ClientTimeout``, optional
+        Timeout for each request.
+    headers : dict, optional
+        Headers to send with each request, e.g. for authentication.
+    base_url : str, optional
+        The URL of the API.
+    """
+    def __init__(self, session, return_type='snake', timeout=None,
+                 headers=None, base_url=None):
+        super().__init__(session, return_type, timeout, base_url=base_url)
+        self._headers = headers or {}
+
+    async def _make_request(self, method, path=None, params=None, data=None,
+                            **kwargs):
+        url = self._build_path(path)
+        if self._timeout is not None:
+            kwargs.setdefault('timeout', self._timeout)
+        headers = dict(self._headers, **kwargs.pop('headers', {}))
+
+        async with self._session.request(method, url, json=data,
+                                         params=_query_params(params),
+                                         headers=headers,
+                                         **kwargs) as resp:
+            body = await resp.read()
+            response = _to_requests_response(resp.status, resp.reason,
+                                             resp.headers, body, str(resp.url))
+
+        if response.status_code in [204, 205]:
+            return
+
+        if response.status_code == 401:
+            auth_error = response.headers["www-authenticate"]
+            raise CivisAPIKeyError(auth_error) from CivisAPIError(response)
+
+        if not response.ok:
+            raise CivisAPIError(response)
+
+        return response
+
+    async def _call_api_async(self, method, path, params, data, **kwargs):
+        resp = await self._make_request(method, path, params, data, **kwargs)
+        return convert_response_data_type(resp, return_type=self._return_type)
+
+    def _call_api(self, method, path=None, params=None, data=None, **kwargs):
+        iterator = kwargs.pop('iterator', False)
+        kwargs.pop('path_template', None)
+
+        if iterator:
+            return AsyncPaginatedResponse(path, params, self)
+        else:
+            return self._call_api_async(method, path, params, data, **kwargs)
+
+
+class AsyncPaginatedResponse:
+    """An asynchronous iterator over every item of a paginated endpoint.
+
+    This is the asyncio counterpart of
+    :class:`~civis.response.PaginatedResponse`. Pages are requested one at
+    a time as the items of the previous page are consumed.
+
+    Parameters
+    ----------
+    path : str
+        Make GET requests to this path.
+    initial_params : dict
+        Query params that should be passed along with each request. Note that
+        if `initial_params` contains the keys `page_num` or `limit`, they will
+        be ignored. The given dict is not modified.
+    endpoint : :class:`AsyncEndpoint`
+        An endpoint used to make API requests.
+
+    Examples
+    --------
+    >>> async for query in client.queries.list(iterator=True):
+    ...    print(query['id'])
+    """
+    def __init__(self, path, initial_params, endpoint):
+        self._path = path
+        self._params = initial_params.copy()
+        self._endpoint = endpoint
+
+        # We are paginating through all items, so start at the beginning and
+        # let the API determine the limit.
+        self._params['page_num'] = 1
+        self._params.pop('limit', None)
+
+    async def __aiter__(self):
+        while True:
+            response = await self._endpoint._make_request('GET',
+                                                          self._path,
+                                                          self._params)
+            page_data = _response_to_json(response)
+            if len(page_data) == 0:
+                return
+
+            for data in page_data:
+                converted_data = convert_response_data_type(
+                    data,
+                    headers=response.headers,
+                    return_type=self._endpoint._return_type
+                )
+                yield converted_data
+
+            self._params['page_num'] += 1
+
+
+class _LazySession:
+    # aiohttp sessions should be created inside a running event loop, so
+    # the client creates its session when the first request is made.
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._session = None
+
+    def request(self, method, url, **kwargs):
+        if self._session is None:
+            self._session = self._factory()
+        return self._session.request(method, url, **kwargs)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+def _import_aiohttp():
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError("AsyncAPIClient requires aiohttp unless a session "
+                          "is given.") from None
+    return aiohttp
+
+
+class AsyncAPIClient:
+    """An asyncio client for the Civis API.
+
+    The endpoint classes are generated from the API specification like
+    those of :class:`civis.APIClient`, and have the same methods. Calling a
+    method returns a coroutine which makes the API call. Paginated methods
+    called with ``iterator=True`` return an :class:`AsyncPaginatedResponse`
+    to use with ``async for``.
+
+    The API specification is loaded (usually from the on-disk spec cache)
+    when the client is created, which blocks. The helper methods of
+    :class:`civis.APIClient`, e.g. ``get_database_id``, aren't available.
+
+    Parameters
+    ----------
+    api_key : str, optional
+        Your API key obtained from the Civis Platform. If not given, the
+        client will use the :envvar:`CIVIS_API_KEY` environment variable.
+    return_type : str, optional
+        ``'snake'``, ``'raw'`` or ``'pandas'``. See :class:`civis.APIClient`.
+    api_version : string, optional
+        The version of endpoints to call. Currently only "1.0" is supported.
+    resources : string, optional
+        Either "base" or "all". See :class:`civis.APIClient`.
+    lazy_resources : bool, optional
+        If ``True``, the endpoint class of each resource is only built from
+        the API specification when the resource is first accessed.
+    pool_maxsize : int, optional
+        The maximum number of simultaneous connections to the API, if the
+        client creates its own session.
+    timeout : float or tuple, optional
+        How many seconds to wait for each request, as a single number or a
+        ``(connect timeout, read timeout)`` tuple. Requires aiohttp.
+    session : ``aiohttp.ClientSession``, optional
+        The session with which to make API requests. If not given, the client
+        creates one on its first request and closes it in :meth:`close`.
+        The client sends its own authentication and ``User-Agent`` headers
+        with each request.
+    base_url : str, optional
+        The URL of the API. See :class:`civis.APIClient`.
+
+    Examples
+    --------
+    >>> async with AsyncAPIClient() as client:
+    ...     me = await client.users.list_me()
+    """
+    def __init__(self, api_key=None, return_type='snake', api_version="1.0",
+                 resources="base", lazy_resources=False, pool_maxsize=100,
+                 timeout=None, session=None, base_url=None):
+        if return_type not in ['snake', 'raw', 'pandas']:
+            raise ValueError("Return type must be one of 'snake', 'raw', "
+                             "'pandas'")
+        self._return_type = return_type
+        session_auth_key = _get_api_key(api_key)
+        user_agent = "civis-python/{} asyncio".format(civis.__version__)
+        credentials = base64.b64encode(
+            "{}:".format(session_auth_key).encode('utf-8')).decode('ascii')
+        headers = {"Authorization": "Basic " + credentials,
+                   "User-Agent": user_agent}
+
+        if timeout is not None:
+            aiohttp = _import_aiohttp()
+            if isinstance(timeout, tuple):
+                connect, read = timeout
+                timeout = aiohttp.ClientTimeout(sock_connect=connect,
+                                                sock_read=read)
+            else:
+                timeout = aiohttp.ClientTimeout(total=timeout)
+        if session is None:
+            aiohttp = _import_aiohttp()
+
+            def factory():
+                connector = aiohttp.TCPConnector(limit=pool_maxsize)
+                return aiohttp.ClientSession(connector=connector)
+
+            session = _LazySession(factory)
+        self._session = session
+        base_url = get_api_base_url(base_url)
+        self._endpoint_kwargs = {'timeout': timeout, 'headers': headers,
+                                 'base_url': base_url}
+
+        from civis.resources import generate_classes
+        classes = generate_classes(api_key=session_auth_key,
+                                   user_agent=user_agent,
+                                   api_version=api_version,
+                                   resources=resources,
+                                   lazy=lazy_resources,
+                                   endpoint_class=AsyncEndpoint,
+                                   base_url=base_url)
+        if lazy_resources:
+            self._lazy_classes = classes
+        else:
+            for class_name, cls in classes.items():
+                setattr(self, class_name, cls(session, return_type,
+                                              **self._endpoint_kwargs))
+
+    def __getattr__(self, name):
+        # Only called when regular attribute lookup fails, e.g. for resources
+        # which have not been accessed yet when `lazy_resources` is True.
+        classes = self.__dict__.get('_lazy_classes')
+        if classes is None or name not in classes:
+            raise AttributeError("{!r} object has no attribute {!r}".format(
+                type(self).__name__, name))
+        endpoint = classes[name](self._session, self._return_type,
+                                 **self._endpoint_kwargs)
+        setattr(self, name, endpoint)
+        return endpoint
+
+    def __dir__(self):
+        names = set(super().__dir__())
+        names.update(self.__dict__.get('_lazy_classes', ()))
+        return sorted(names)
+
+    async def close(self):
+        """Close the session, if the client created it."""
+        if isinstance(self._session, _LazySession):
+            await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -1,13 +1,32 @@
+import functools
 from posixpath import join
-import threading
+import time
 
+from civis._utils import DEFAULT_API_BASE_URL
+from civis.cache import request_key
+from civis.metrics import RequestInfo
 from civis.response import PaginatedResponse, convert_response_data_type
 
 
+_WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
 def tostr_urljoin(*x):
     return join(*map(str, x))
 
 
+def _adapter_retries(response):
+    """Return the number of times the transport adapter (i.e. urllib3)
+    retried before it got `response`.
+
+    urllib3 only records its retries from version 1.19 (vendored by
+    requests 2.12); with older versions, this is always 0.
+    """
+    retries = getattr(response.raw, "retries", None)
+    history = getattr(retries, "history", None)
+    return len(history) if history else 0
+
+
 class CivisJobFailure(Exception):
     def __init__(self, err_msg, response=None):
         self.error_message = err_msg
@@ -44,13 +63,33 @@ class CivisAPIKeyError(Exception):
 
 
 class Endpoint:
+    """Base class of the endpoint classes generated from the API spec.
+
+    Endpoints make their requests with the :class:`requests.Session` of the
+    client which created them. Requests aren't serialized, so a client can
+    be used from several threads at once, limited by the size of the
+    session's connection pool.
+    """
 
-    _base_url = "https://api.civisanalytics.com/"
-    _lock = threading.Lock()
+    _base_url = DEFAULT_API_BASE_URL
 
-    def __init__(self, session, return_type='civis'):
+    def __init__(self, session, return_type='civis', timeout=None,
+                 rate_limiter=None, json_codec=None, response_cache=None,
+                 single_flight=None, etag_cache=None, hedging_policy=None,
+                 retry_policy=None, hooks=(), base_url=None):
         self._session = session
         self._return_type = return_type
+        self._timeout = timeout
+        self._rate_limiter = rate_limiter
+        self._json_codec = json_codec
+        self._response_cache = response_cache
+        self._single_flight = single_flight
+        self._etag_cache = etag_cache
+        self._hedging_policy = hedging_policy
+        self._retry_policy = retry_policy
+        self._hooks = tuple(hooks)
+        if base_url is not None:
+            self._base_url = base_url
 
     def _build_path(self, path):
         if not path:
@@ -58,12 +97,24 @@ class Endpoint:
         return tostr_urljoin(self._base_url, path.strip("/"))
 
     def _make_request(self, method, path=None, params=None, data=None,
-                      **kwargs):
+                      path_template=None, **kwargs):
         url = self._build_path(path)
-
-        with self._lock:
-            response = self._session.request(method, url, json=data,
-                                             params=params, **kwargs)
+        kwargs.setdefault('timeout', self._timeout)
+        if data is not None and self._json_codec is not None:
+            headers = kwargs.get('headers') or {}
+            kwargs['headers'] = dict(headers, **{
+                'Content-Type': 'application/json'})
+            kwargs['data'] = self._json_codec.dumps(data)
+            data = None
+
+        send = functools.partial(self._send, method, url, json=data,
+                                 params=params, **kwargs)
+        if self._hedging_policy is not None and method.upper() == 'GET':
+            send = functools.partial(self._hedging_policy.send, send)
+        if self._hooks:
+            response = self._observe(method, path, path_template, send)
+        else:
+            response = self._retry(method, send)
 
         if response.status_code in [204, 205]:
             return
@@ -77,13 +128,116 @@ class Endpoint:
 
         return response
 
+    def _retry(self, method, send):
+        if self._retry_policy is None:
+            return send()
+        return self._retry_policy.run(method, send)
+
+    def _observe(self, method, path, path_template, send):
+        """Make a request with `send`, and report it to the hooks."""
+        info = RequestInfo(method.upper(), path, path_template)
+        for hook in self._hooks:
+            hook.before_request(info)
+        # The number of retries made by the adapter for each attempt
+        attempts = []
+
+        def counted():
+            attempts.append(0)
+            response = send()
+            attempts[-1] = _adapter_retries(response)
+            return response
+
+        start = time.perf_counter()
+        try:
+            response = self._retry(method, counted)
+            info._update(response)
+            return response
+        except Exception as e:
+            info.error = e
+            raise
+        finally:
+            info.latency = time.perf_counter() - start
+            info.retries = max(0, len(attempts) - 1) + sum(attempts)
+            for hook in self._hooks:
+                hook.after_request(info)
+
+    def _send(self, method, url, **kwargs):
+        limiter = self._rate_limiter
+        if limiter is None:
+            return self._session.request(method, url, **kwargs)
+        limiter.acquire()
+        response = None
+        try:
+            response = self._session.request(method, url, **kwargs)
+        finally:
+            limiter.release(response)
+        return response
+
+    def _request(self, method, path=None, params=None, data=None, **kwargs):
+        """Make a request through the response cache and request coalescing,
+        where enabled.
+
+        ``GET`` responses are served from and stored in the cache, ``GET``
+        requests for stored objects are made conditional, and identical
+        ``GET`` requests in flight at the same time share one request. Other
+        requests which may change data invalidate the cached
+        responses of related paths once they finish.
+        """
+        cache = self._response_cache
+        verb = method.upper()
+        if verb == 'GET':
+            if cache is not None:
+                response = cache.get(path, params)
+                if response is not None:
+                    return response
+            if self._single_flight is not None:
+                response = self._single_flight.do(
+                    request_key(path, params),
+                    lambda: self._get(method, path, params, data, **kwargs))
+            else:
+                response = self._get(method, path, params, data, **kwargs)
+            if cache is not None and response is not None:
+                cache.set(path, params, response)
+            return response
+        if cache is None or verb not in _WRITE_METHODS:
+            return self._make_request(method, path, params, data, **kwargs)
+        try:
+            return self._make_request(method, path, params, data, **kwargs)
+        finally:
+            cache.invalidate(path)
+
+    def _get(self, method, path, params, data, **kwargs):
+        etags = self._etag_cache
+        if etags is None:
+            return self._make_request(method, path, params, data, **kwargs)
+        headers = kwargs.pop('headers', None) or {}
+        conditions = etags.headers(path, params)
+        response = etags.update(path, params, self._make_request(
+            method, path, params, data, headers=dict(conditions, **headers),
+            **kwargs))
+        if response is not None and response.status_code == 304:
+            # The stored response was discarded while the request was made.
+            response = etags.update(path, params, self._make_request(
+                method, path, params, data, headers=headers, **kwargs))
+        return response
+
     def _call_api(self, method, path=None, params=None, data=None, **kwargs):
         iterator = kwargs.pop('iterator', False)
 
         if iterator:
-            return PaginatedResponse(path, params, self)
+            return PaginatedResponse(path, params, self,
+                                     json_codec=self._json_codec,
+                                     path_template=kwargs.get(
+                                         'path_template'))
         else:
-            resp = self._make_request(method, path, params, data, **kwargs)
+            if (self._response_cache is None and
+                    self._single_flight is None and
+                    self._etag_cache is None):
+                resp = self._make_request(method, path, params, data,
+                                          **kwargs)
+            else:
+                resp = self._request(method, path, params, data, **kwargs)
             resp = convert_response_data_type(resp,
-                                              return_type=self._return_type)
+                                              return_type=self._return_type,
+                                              json_codec=self._json_codec)
             return resp
@@ -0,0 +1,268 @@
+"""In-memory caching of API responses.
+
+Metadata such as the list of databases or the current user rarely changes,
+but programs often look it up many times. A :class:`ResponseCache` keeps the
+responses to ``GET`` requests for a limited time, so repeated calls are
+answered without a round trip to the API::
+
+    >>> client = civis.APIClient(response_cache=True)
+    >>> client.databases.list()  # Requests the databases from the API
+    >>> client.databases.list()  # Returns the cached response
+
+Writes (``POST``, ``PUT``, ``PATCH`` and ``DELETE``) made through a client
+invalidate the cached responses for the paths they may have changed.
+
+An :class:`ETagCache` instead keeps the last response for each ``GET``
+request along with its ``ETag`` or ``Last-Modified`` header, and makes the
+next request for the same object conditional. When the object hasn't
+changed, the API answers with an empty ``304 Not Modified`` response and the
+kept response is used (``civis.APIClient(etag_cache=True)``).
+
+Similarly, when several threads make the same ``GET`` request at the same
+time, a :class:`SingleFlight` lets them share a single request to the API
+(``civis.APIClient(coalesce_requests=True)``).
+"""
+from collections import OrderedDict
+import copy
+import threading
+import time
+
+
+DEFAULT_TTL = 60
+DEFAULT_RESOURCE_TTLS = {
+    "credentials": 5 * 60,
+    "databases": 60 * 60,
+    "users": 5 * 60,
+}
+DEFAULT_MAXSIZE = 1024
+
+
+def _split_path(path):
+    return tuple(part for part in (path or "").split("/") if part)
+
+
+def _is_prefix(a, b):
+    return a == b[:len(a)]
+
+
+def request_key(path, params=None):
+    """Return a hashable key for a ``GET`` request to `path` with the query
+    parameters `params`."""
+    items = tuple(sorted((str(k), str(v))
+                         for k, v in (params or {}).items()))
+    return _split_path(path), items
+
+
+class ResponseCache:
+    """A thread-safe, size-limited cache of ``GET`` responses.
+
+    Parameters
+    ----------
+    ttl : float, optional
+        The number of seconds for which a response is reused, for resources
+        which aren't in `resource_ttls`.
+    resource_ttls : dict, optional
+        Maps resource names (the first part of a path, e.g. ``"databases"``)
+        to the number of seconds for which their responses are reused. A TTL
+        of 0 disables caching for a resource. These are added to (and
+        override) :data:`DEFAULT_RESOURCE_TTLS`.
+    maxsize : int, optional
+        The maximum number of responses to keep. When the cache is full, the
+        least recently used response is discarded.
+
+    Notes
+    -----
+    Responses are cached by path and query parameters only, so a cache must
+    not be shared by clients with different API keys.
+    """
+    def __init__(self, ttl=DEFAULT_TTL, resource_ttls=None,
+                 maxsize=DEFAULT_MAXSIZE):
+        self.ttl = ttl
+        self.resource_ttls = dict(DEFAULT_RESOURCE_TTLS,
+                                  **(resource_ttls or {}))
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _ttl(self, parts):
+        resource = parts[0] if parts else ""
+        return self.resource_ttls.get(resource, self.ttl)
+
+    def get(self, path, params=None):
+        """Return the cached response for a ``GET`` request, or ``None``."""
+        key = request_key(path, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, path, params, response):
+        """Cache the response to a ``GET`` request."""
+        key = request_key(path, params)
+        ttl = self._ttl(key[0])
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, path):
+        """Discard the responses which a write to `path` may have changed.
+
+        These are the responses for `path` itself, for its parents (e.g.
+        the listing at ``scripts`` when ``scripts/5`` changes), and for
+        paths below it (e.g. ``scripts/5/runs``).
+        """
+        parts = _split_path(path)
+        with self._lock:
+            stale = [key for key in self._entries
+                     if _is_prefix(key[0], parts) or _is_prefix(parts, key[0])]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        """Discard all cached responses."""
+        with self._lock:
+            self._entries.clear()
+
+
+class ETagCache:
+    """A thread-safe, size-limited store of ``GET`` responses, used to make
+    conditional requests.
+
+    Only responses with an ``ETag`` or ``Last-Modified`` header are stored.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        The maximum number of responses to keep. When the store is full, the
+        least recently used response is discarded.
+
+    Notes
+    -----
+    Responses are stored by path and query parameters only, so a store must
+    not be shared by clients with different API keys.
+    """
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def headers(self, path, params=None):
+        """Return the headers which make a ``GET`` request conditional on
+        the stored response having changed."""
+        key = request_key(path, params)
+        with self._lock:
+            response = self._entries.get(key)
+            if response is None:
+                return {}
+            self._entries.move_to_end(key)
+        headers = {}
+        if response.headers.get("ETag"):
+            headers["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = response.headers["Last-Modified"]
+        return headers
+
+    def update(self, path, params, response):
+        """Store the response to a ``GET`` request, and return the response
+        to use.
+
+        If `response` is ``304 Not Modified``, return a copy of the stored
+        response with the headers of `response`. Otherwise store `response`
+        (if it has an ``ETag`` or ``Last-Modified`` header) and return it.
+        """
+        key = request_key(path, params)
+        with self._lock:
+            if response is not None and response.status_code == 304:
+                stored = self._entries.get(key)
+                if stored is not None:
+                    self.hits += 1
+                    fresh = copy.copy(stored)
+                    fresh.headers = stored.headers.copy()
+                    fresh.headers.update(response.headers)
+                    return fresh
+                return response
+            self.misses += 1
+            if (response is None or self.maxsize <= 0 or
+                    not (response.headers.get("ETag") or
+                         response.headers.get("Last-Modified"))):
+                self._entries.pop(key, None)
+                return response
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return response
+
+    def clear(self):
+        """Discard all stored responses."""
+        with self._lock:
+            self._entries.clear()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+class SingleFlight:
+    """Share the result of a call between all threads which make the same
+    call while it is in progress.
+
+    Examples
+    --------
+    >>> flights = SingleFlight()
+    >>> flights.do(("scripts", 5), lambda: client.scripts.get(5))
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """Return ``func()``, or wait for and return the result of the call
+        with the same `key` which is already in progress.
+
+        If the call raises an exception, it is raised in every waiting
+        thread.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 import functools
 import logging
 import os
@@ -7,13 +8,12 @@ from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util import Retry
 
 import civis
-from civis.resources import generate_classes
+from civis._utils import get_api_base_url
+from civis.retries import RETRY_CODES
 
 
 log = logging.getLogger(__name__)
 
-RETRY_CODES = [429, 502, 503, 504]
-
 
 def _get_api_key(api_key):
     """Pass-through if `api_key` is not None otherwise tries the CIVIS_API_KEY
@@ -275,6 +275,13 @@ class APIClient(MetaMixin):
     retry_total : int, optional
         A number indicating the maximum number of retries for 429, 502, 503, or
         504 errors.
+    retry_policy : bool or :class:`civis.retries.RetryPolicy`, optional
+        If ``True`` or a :class:`~civis.retries.RetryPolicy`, the client
+        retries requests itself: waits between attempts are randomized and
+        honor the ``Retry-After`` header, connection and read errors are
+        retried for idempotent requests, and the total time spent retrying
+        is capped. ``True`` allows `retry_total` retries. The transport
+        adapter then makes no retries of its own.
     api_version : string, optional
         The version of endpoints to call. May instantiate multiple client
         objects with different versions. Currently only "1.0" is supported.
@@ -283,14 +290,159 @@ class APIClient(MetaMixin):
         client object. Set to "all" to include all endpoints available for
         a given user, including those that may be in development and subject
         to breaking changes at a later date.
+    lazy_resources : bool, optional
+        If ``True``, the endpoint class of each resource (e.g.
+        ``client.scripts``) is only built from the API specification when
+        the resource is first accessed. This makes creating a client much
+        faster for programs which only use a few resources.
+    endpoints_module : str or module, optional
+        A module of endpoint classes written ahead of time by
+        :func:`civis.resources.write_endpoints_module` (or the
+        ``civis generate-endpoints`` command), or its import name. If given,
+        the client uses these classes instead of fetching and parsing the
+        API specification, and `resources` and `lazy_resources` are ignored.
+    pool_connections : int, optional
+        The number of connection pools to cache. See
+        :class:`requests:requests.adapters.HTTPAdapter`.
+    pool_maxsize : int, optional
+        The maximum number of connections to the API to keep open for reuse.
+        Set this to at least the number of threads sharing the client.
+    pool_block : bool, optional
+        If ``True``, a request waits for a free connection when `pool_maxsize`
+        connections are in use. Otherwise, extra connections are opened and
+        closed after use.
+    timeout : float or tuple, optional
+        How many seconds to wait for the API before giving up on a request,
+        as a single number or a ``(connect timeout, read timeout)`` tuple.
+        By default, requests wait indefinitely.
+    rate_limit : bool or :class:`civis.ratelimit.RateLimiter`, optional
+        If ``True``, pace requests to stay within the API rate limit, using a
+        :class:`~civis.ratelimit.RateLimiter` shared by every client in the
+        process with the same API key. A limiter can also be given directly.
+    json_codec : str or object, optional
+        The library with which to encode request bodies and decode
+        responses: ``"json"``, ``"orjson"``, ``"ujson"``, or ``"auto"`` for
+        the fastest of those which is installed. Any object with ``loads``
+        (taking bytes) and ``dumps`` functions can also be given. By
+        default, :mod:`requests` uses the standard library.
+    response_cache : bool or :class:`civis.cache.ResponseCache`, optional
+        If ``True``, reuse the responses to ``GET`` requests for a while
+        (see :class:`~civis.cache.ResponseCache` for the default lifetimes).
+        A cache can also be given directly, e.g. to set the lifetimes. Don't
+        share a cache between clients with different API keys.
+    etag_cache : bool or :class:`civis.cache.ETagCache`, optional
+        If ``True`` or an :class:`~civis.cache.ETagCache`, remember the
+        ``ETag`` and ``Last-Modified`` headers of ``GET`` responses, and make
+        the next request for the same object conditional on it having
+        changed. If it hasn't, the API sends no body and the remembered
+        response is used again. Don't share a store between clients with
+        different API keys.
+    hedging : bool or :class:`civis.hedging.HedgingPolicy`, optional
+        If ``True`` or a :class:`~civis.hedging.HedgingPolicy`, send a
+        second copy of a ``GET`` request which is much slower than usual,
+        and use whichever response arrives first.
+    coalesce_requests : bool, optional
+        If ``True``, identical ``GET`` requests made by several threads at
+        the same time share a single request to the API, and all of them
+        get its result.
+    hooks : list of :class:`civis.metrics.RequestHook`, optional
+        Objects whose ``before_request`` and ``after_request`` methods are
+        called with a :class:`~civis.metrics.RequestInfo` around each API
+        request, e.g. to log or measure requests.
+    metrics : bool or :class:`civis.metrics.MetricsRegistry`, optional
+        If ``True`` or a :class:`~civis.metrics.MetricsRegistry`, keep
+        request counts and latency histograms of each endpoint in
+        :attr:`metrics`.
+    base_url : str, optional
+        The URL of the API, e.g. of a :class:`civis.fake_api.FakeCivisAPI`
+        for testing. If not given, the client uses the
+        :envvar:`CIVIS_API_ENDPOINT` environment variable if it is set, and
+        ``https://api.civisanalytics.com/`` otherwise.
+    adapter : :class:`requests:requests.adapters.BaseAdapter`, optional
+        A transport adapter to mount for ``https://`` requests instead of the
+        default :class:`~requests:requests.adapters.HTTPAdapter`. If given,
+        `retry_total` and the ``pool_*`` options are ignored.
+    session : :class:`requests:requests.Session`, optional
+        The session with which to make API requests, e.g. to configure
+        proxies or certificates. The client sets its authentication and
+        ``User-Agent`` header. No adapter is mounted on it unless `adapter`
+        is given, so `retry_total` and the ``pool_*`` options are ignored.
+
+    Attributes
+    ----------
+    metrics : :class:`civis.metrics.MetricsRegistry` or None
+        The metrics of the client's requests, if `metrics` was given.
+
+    Notes
+    -----
+    A client can be shared by several threads. Their requests are sent
+    concurrently, with up to `pool_maxsize` connections to the API kept open
+    for reuse.
     """
     def __init__(self, api_key=None, return_type='snake',
-                 retry_total=6, api_version="1.0", resources="base"):
+                 retry_total=6, api_version="1.0", resources="base",
+                 lazy_resources=False, endpoints_module=None,
+                 pool_connections=10, pool_maxsize=10, pool_block=False,
+                 timeout=None, adapter=None, session=None, rate_limit=False,
+                 json_codec=None, response_cache=None,
+                 coalesce_requests=False, etag_cache=None, hedging=None,
+                 retry_policy=None, hooks=None, metrics=False,
+                 base_url=None):
         if return_type not in ['snake', 'raw', 'pandas']:
             raise ValueError("Return type must be one of 'snake', 'raw', "
                              "'pandas'")
+        self._return_type = return_type
+        self._timeout = timeout
+        self._pool_maxsize = pool_maxsize
+        self._base_url = base_url = get_api_base_url(base_url)
         session_auth_key = _get_api_key(api_key)
-        self._session = session = requests.session()
+        if rate_limit is True:
+            from civis.ratelimit import shared_rate_limiter
+            rate_limit = shared_rate_limiter(session_auth_key)
+        if response_cache is True:
+            from civis.cache import ResponseCache
+            response_cache = ResponseCache()
+        elif response_cache is False:
+            response_cache = None
+        if etag_cache is True:
+            from civis.cache import ETagCache
+            etag_cache = ETagCache()
+        elif etag_cache is False:
+            etag_cache = None
+        if hedging is True:
+            from civis.hedging import HedgingPolicy
+            hedging = HedgingPolicy()
+        if retry_policy is True:
+            from civis.retries import RetryPolicy
+            retry_policy = RetryPolicy(max_retries=retry_total)
+        hooks = list(hooks or ())
+        if metrics is True:
+            from civis.metrics import MetricsRegistry
+            metrics = MetricsRegistry()
+        self.metrics = metrics or None
+        if self.metrics is not None:
+            hooks.append(self.metrics)
+        single_flight = None
+        if coalesce_requests:
+            from civis.cache import SingleFlight
+            single_flight = SingleFlight()
+        if json_codec is not None:
+            from civis._json import get_codec
+            json_codec = get_codec(json_codec)
+        self._endpoint_kwargs = {'timeout': timeout,
+                                 'rate_limiter': rate_limit or None,
+                                 'json_codec': json_codec,
+                                 'response_cache': response_cache,
+                                 'single_flight': single_flight,
+                                 'etag_cache': etag_cache,
+                                 'hedging_policy': hedging or None,
+                                 'retry_policy': retry_policy or None,
+                                 'hooks': hooks,
+                                 'base_url': base_url}
+        mount_adapter = session is None or adapter is not None
+        if session is None:
+            session = requests.session()
+        self._session = session
         session.auth = (session_auth_key, '')
 
         civis_version = civis.__version__
@@ -298,15 +450,113 @@ class APIClient(MetaMixin):
         user_agent = "civis-python/{} {}".format(civis_version, session_agent)
         session.headers.update({"User-Agent": user_agent.strip()})
 
-        max_retries = Retry(retry_total, backoff_factor=.75,
-                            status_forcelist=RETRY_CODES)
-        adapter = HTTPAdapter(max_retries=max_retries)
+        if adapter is None:
+            if retry_policy:
+                max_retries = Retry(0, read=False)
+            else:
+                max_retries = Retry(retry_total, backoff_factor=.75,
+                                    status_forcelist=RETRY_CODES)
+            adapter = HTTPAdapter(pool_connections=pool_connections,
+                                  pool_maxsize=pool_maxsize,
+                                  pool_block=pool_block,
+                                  max_retries=max_retries)
+        if mount_adapter:
+            session.mount("https://", adapter)
+            if not base_url.startswith("https://"):
+                session.mount(base_url, adapter)
+
+        if endpoints_module is not None:
+            from civis.resources._codegen import load_endpoints_module
+            classes = load_endpoints_module(endpoints_module, api_version)
+            lazy_resources = False
+        else:
+            from civis.resources import generate_classes
+            classes = generate_classes(api_key=session_auth_key,
+                                       user_agent=user_agent,
+                                       api_version=api_version,
+                                       resources=resources,
+                                       lazy=lazy_resources,
+                                       base_url=base_url)
+        if lazy_resources:
+            self._lazy_classes = classes
+        else:
+            for class_name, cls in classes.items():
+                setattr(self, class_name, cls(session, return_type,
+                                              **self._endpoint_kwargs))
+
+    def __getattr__(self, name):
+        # Only called when regular attribute lookup fails, e.g. for resources
+        # which have not been accessed yet when `lazy_resources` is True.
+        classes = self.__dict__.get('_lazy_classes')
+        if classes is None or name not in classes:
+            raise AttributeError("{!r} object has no attribute {!r}".format(
+                type(self).__name__, name))
+        endpoint = classes[name](self._session, self._return_type,
+                                 **self._endpoint_kwargs)
+        setattr(self, name, endpoint)
+        return endpoint
+
+    def __dir__(self):
+        names = set(super().__dir__())
+        names.update(self.__dict__.get('_lazy_classes', ()))
+        return sorted(names)
+
+    def batch(self, calls, max_workers=None, return_exceptions=True):
+        """Make many API calls concurrently.
+
+        Parameters
+        ----------
+        calls : iterable
+            The calls to make. Each call is either a callable which takes no
+            arguments, or a tuple of a callable (e.g. an endpoint method),
+            a sequence of positional arguments and optionally a dict of
+            keyword arguments.
+        max_workers : int, optional
+            The maximum number of calls to make at once. Defaults to the
+            size of the client's connection pool (`pool_maxsize`).
+        return_exceptions : bool, optional
+            If ``True`` (the default), an exception raised by a call is
+            returned in place of its result, and the other calls still run.
+            If ``False``, the first exception (in the order of `calls`) is
+            raised once all calls have finished.
 
-        session.mount("https://", adapter)
+        Returns
+        -------
+        results : list
+            The result of each call, in the order of `calls`.
 
-        classes = generate_classes(api_key=session_auth_key,
-                                   user_agent=user_agent,
-                                   api_version=api_version,
-                                   resources=resources)
-        for class_name, cls in classes.items():
-            setattr(self, class_name, cls(session, return_type))
+        Examples
+        --------
+        >>> client = civis.APIClient()
+        >>> tables = client.batch([(client.tables.get, (table_id,))
+        ...                        for table_id in table_ids])
+        >>> runs = client.batch([
+        ...     functools.partial(client.scripts.get_sql_runs, id, run_id)
+        ...     for id, run_id in sql_runs])
+        """
+        funcs = [_batch_call(call) for call in calls]
+        if not funcs:
+            return []
+        max_workers = min(max_workers or self._pool_maxsize, len(funcs))
+        with ThreadPoolExecutor(max_workers) as executor:
+            futures = [executor.submit(func) for func in funcs]
+        results = []
+        for future in futures:
+            exc = future.exception()
+            if exc is not None and not return_exceptions:
+                raise exc
+            results.append(future.result() if exc is None else exc)
+        return results
+
+
+def _batch_call(call):
+    """Return a callable without arguments for a call given to
+    :meth:`APIClient.batch`."""
+    if callable(call):
+        return call
+    if isinstance(call, tuple) and 2 <= len(call) <= 3 and callable(call[0]):
+        func, args = call[0], call[1]
+        kwargs = call[2] if len(call) == 3 else {}
+        return functools.partial(func, *args, **kwargs)
+    raise TypeError("Each call must be a callable or a (callable, args[, "
+                    "kwargs]) tuple, not {!r}".format(call))
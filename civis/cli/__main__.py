@@ -9,29 +9,25 @@ https://github.com/zalando/openapi-cli-client/blob/master/LICENSE
 """
 
 
-import calendar
-from collections import OrderedDict
 from functools import partial
 import json
 import os
 import re
 import sys
-import time
 from warnings import warn
 
 import click
-from jsonref import JsonRef
 import requests
 import yaml
+from civis import _spec_cache
+from civis._utils import get_api_base_url
+from civis.resources._refs import RefResolver
 from civis.cli._cli_commands import \
-    civis_ascii_art, files_download_cmd, files_upload_cmd
+    civis_ascii_art, files_download_cmd, files_upload_cmd, \
+    generate_endpoints_cmd
 
 
 _REPLACEABLE_COMMAND_CHARS = re.compile(r'[^A-Za-z0-9]+')
-_API_URL = "https://api.civisanalytics.com"
-_OPENAPI_SPEC_URL = "https://api.civisanalytics.com/endpoints"
-_CACHED_SPEC_PATH = \
-    os.path.join(os.path.expanduser('~'), ".civis_api_spec.json")
 
 
 class YAMLParamType(click.ParamType):
@@ -156,7 +152,7 @@ def invoke(method, path, op, *args, json_output=False, **kwargs):
         headers=make_api_request_headers(),
         params=query,
         json=body,
-        url=_API_URL + path.format(**kwargs),
+        url=get_api_base_url() + path.format(**kwargs).lstrip('/'),
         method=method
     )
     response = requests.request(**request_info)
@@ -186,34 +182,24 @@ def invoke(method, path, op, *args, json_output=False, **kwargs):
 
 
 def retrieve_spec_dict():
-    """Retrieve the API specification from a cached version or from Civis."""
+    """Retrieve the API specification from a cached version or from Civis.
 
-    refresh_spec = True
-    now_timestamp = calendar.timegm(time.gmtime())
+    The cache is shared with :class:`civis.APIClient`; see
+    :mod:`civis._spec_cache` for how to configure it.
+    """
+    headers = make_api_request_headers()
+    base_url = get_api_base_url()
 
-    try:
-        # If the cached spec is from the last 24 hours, use it.
-        modified_time = os.path.getmtime(_CACHED_SPEC_PATH)
-        if now_timestamp - modified_time < 10:
-            refresh_spec = False
-            with open(_CACHED_SPEC_PATH) as f:
-                spec_dict = json.load(f, object_pairs_hook=OrderedDict)
-    except (FileNotFoundError, ValueError):
-        # If the file doesn't exist or we can't parse it, just keep going.
-        refresh_spec = True
-
-    # Download the spec and cache it in the user's home directory.
-    if refresh_spec:
-        resp = requests.get(_OPENAPI_SPEC_URL,
-                            headers=make_api_request_headers())
-        assert resp.status_code == 200, \
+    def fetch(conditional_headers):
+        resp = requests.get(base_url + "endpoints",
+                            headers=dict(headers, **conditional_headers))
+        assert resp.status_code in (200, 304), \
             "Failure downloading API specification: %d %s" % \
             (resp.status_code, resp.reason)
-        with open(_CACHED_SPEC_PATH, "w") as f:
-            f.write(resp.text)
-        spec_dict = json.loads(resp.text, object_pairs_hook=OrderedDict)
+        return resp
 
-    return spec_dict
+    return _spec_cache.load_spec(fetch, os.environ["CIVIS_API_KEY"], "1.0",
+                                 base_url=base_url)
 
 
 def add_extra_commands(cli):
@@ -222,15 +208,16 @@ def add_extra_commands(cli):
     files_cmd.add_command(files_download_cmd)
     files_cmd.add_command(files_upload_cmd)
     cli.add_command(civis_ascii_art)
+    cli.add_command(generate_endpoints_cmd)
 
 
 def generate_cli():
 
     spec = retrieve_spec_dict()
 
-    # Replace references in the spec so that we don't have to worry about them
-    # when making the CLI.
-    spec = JsonRef.replace_refs(spec)
+    # Resolve references in each path as we go so that we don't have to worry
+    # about them when making the CLI.
+    resolver = RefResolver(spec)
 
     cli = click.Group()
 
@@ -245,7 +232,7 @@ def generate_cli():
             cli.add_command(grp)
             groups[resource] = grp
 
-        add_path_commands(path, path_dict, grp, resource)
+        add_path_commands(path, resolver.resolve(path_dict), grp, resource)
 
     add_extra_commands(cli)
 
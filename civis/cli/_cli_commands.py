@@ -9,6 +9,7 @@ import os
 import click
 
 from civis.io import file_to_civis, civis_to_file
+from civis.resources import write_endpoints_module
 
 
 # From http://patorjk.com/software/taag/#p=display&f=3D%20Diagonal&t=CIVIS
@@ -67,6 +68,21 @@ def files_download_cmd(file_id, path):
         civis_to_file(file_id, f)
 
 
+@click.command('generate-endpoints')
+@click.argument('path')
+@click.option('--resources', type=click.Choice(['base', 'all']),
+              default='base',
+              help="Generate only the default endpoints (base) or all "
+                   "endpoints available to you (all).")
+def generate_endpoints_cmd(path, resources):
+    """Write a Python module of API client endpoint classes to PATH.
+
+    Pass the module to civis.APIClient(endpoints_module=...) to create
+    clients without downloading and parsing the API specification.
+    """
+    write_endpoints_module(path, resources=resources)
+
+
 @click.command('civis', help="Print Civis")
 def civis_ascii_art():
     print(_CIVIS_ASCII_ART)
@@ -0,0 +1,505 @@
+"""A local fake of the Civis API, for tests and benchmarks.
+
+:class:`FakeCivisAPI` is an HTTP server which answers requests to every
+endpoint of an API specification with objects shaped like the responses
+described by the specification. It keeps the objects which are created in
+memory, runs jobs which finish after a fixed time, paginates lists, sends
+rate limit headers and stands in for the storage service which files are
+uploaded to and downloaded from. Point a client at it with `base_url`::
+
+    >>> from civis.fake_api import FakeCivisAPI
+    >>> with FakeCivisAPI() as server:
+    ...     client = civis.APIClient(api_key="fake", base_url=server.url)
+    ...     file_id = civis.io.file_to_civis(io.BytesIO(b"data"), "name",
+    ...                                      client=client)
+
+or, for code which creates its own clients, with the
+:envvar:`CIVIS_API_ENDPOINT` environment variable.
+
+The server is a fake, not a simulation: it doesn't check request bodies
+against the specification, ignores filters, and stores objects by the path
+they were created at, so that e.g. a script created with ``POST
+/scripts/sql`` is found with ``GET /scripts/sql/{id}`` but not with ``GET
+/scripts/{id}``.
+"""
+from collections import OrderedDict
+import copy
+import email.parser
+import hashlib
+import http.server
+import itertools
+import json
+import math
+import os
+import re
+import socketserver
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from civis.resources._refs import RefResolver
+
+
+DEFAULT_SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 "tests", "civis_api_spec.json")
+DEFAULT_QUERY_RESULT = b"id,name\n1,fake\n"
+
+_STORAGE_PREFIX = "/storage/"
+
+
+def _now():
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+
+
+def _example(schema, depth=0):
+    """Return an object shaped like `schema`, with ``None`` for every
+    scalar and empty lists for arrays."""
+    if not isinstance(schema, dict) or depth > 4:
+        return None
+    if schema.get("type") == "array":
+        return []
+    if "properties" in schema:
+        return OrderedDict((name, _example(prop, depth + 1))
+                           for name, prop in schema["properties"].items())
+    if schema.get("type") == "object":
+        return OrderedDict()
+    return None
+
+
+def _parse_form(content_type, body):
+    """Return the fields of a ``multipart/form-data`` body as bytes."""
+    header = "Content-Type: {}\r\n\r\n".format(content_type).encode("utf-8")
+    message = email.parser.BytesParser().parsebytes(header + body)
+    fields = {}
+    for part in message.get_payload():
+        name = part.get_param("name", header="content-disposition")
+        fields[name] = part.get_payload(decode=True)
+    return fields
+
+
+class _Operation:
+    def __init__(self, status, schema):
+        self.status = status
+        self.schema = schema
+        self.is_list = schema is not None and schema.get("type") == "array"
+
+
+class _Route:
+    def __init__(self, template, operations):
+        self.template = template
+        segments = template.split("/")
+        self.is_item = segments[-1].startswith("{")
+        pattern = "/".join("[^/]+" if s.startswith("{") else re.escape(s)
+                           for s in segments)
+        self.regex = re.compile("^{}$".format(pattern))
+        # Literal segments take precedence, so that e.g. "users/me" isn't
+        # matched by "users/{id}".
+        self.sort_key = tuple(s.startswith("{") for s in segments)
+        self.operations = operations
+
+
+def _routes(spec):
+    resolver = RefResolver(spec)
+    routes = []
+    for path, methods in spec["paths"].items():
+        operations = {}
+        for method, operation in methods.items():
+            if method.startswith("x-") or method == "parameters":
+                continue
+            responses = operation.get("responses", {})
+            status = min((code for code in responses if code.isdigit()),
+                         default="200")
+            schema = responses.get(status, {}).get("schema")
+            operations[method.upper()] = _Operation(
+                int(status), resolver.resolve(schema) if schema else None)
+        routes.append(_Route(path.strip("/"), operations))
+    return sorted(routes, key=lambda route: route.sort_key)
+
+
+class _Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+    request_queue_size = 64
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        api = self.server.fake_api
+        status, headers, content = api._handle(self.command, self.path,
+                                               self.headers, body)
+        if api.latency:
+            time.sleep(api.latency)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(content)
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeCivisAPI:
+    """A local HTTP server which fakes the Civis API.
+
+    The server starts in a background thread when :meth:`start` is called
+    or the ``with`` block is entered, and stops at :meth:`stop` or the end
+    of the block.
+
+    Requests to the API need an ``Authorization`` header, but any API key
+    is accepted. Objects created with ``POST`` requests are kept until the
+    server stops, and have the fields of the response described by the
+    specification, with ``None`` for fields not in the request. The server
+    starts with a database named ``"fake-db"``, a database credential and
+    the current user, ``"fake-user"``, so that e.g.
+    :meth:`civis.APIClient.get_database_id` and
+    :attr:`civis.APIClient.default_credential` work.
+
+    Runs of jobs (e.g. ``POST /scripts/sql/{id}/runs``) are ``"running"``
+    for `job_duration` seconds, then end in `final_state`. Runs of SQL
+    scripts have one output, a CSV file with the contents `query_result`.
+
+    File uploads and downloads go to ``storage/`` URLs on the same server.
+    Uploaded contents are kept in :attr:`storage`.
+
+    Parameters
+    ----------
+    spec : dict or str, optional
+        The API specification, or the path of a JSON file with it. By
+        default, the copy of the specification in the tests of this package
+        is used, which is only present in a source checkout.
+    host : str, optional
+        The address to listen at.
+    port : int, optional
+        The port to listen at. By default, a free port is chosen.
+    latency : float, optional
+        Seconds to wait before answering each request.
+    job_duration : float, optional
+        Seconds for which each run is ``"running"``.
+    final_state : str, optional
+        The state of runs once they have finished, e.g. ``"failed"``.
+    page_size : int, optional
+        The number of items on each page of lists, if the request doesn't
+        give a ``limit``.
+    rate_limit : int, optional
+        The number of API requests allowed in each `rate_limit_period`.
+        Further requests get ``429 Too Many Requests`` responses with a
+        ``Retry-After`` header. ``None`` disables rate limiting.
+    rate_limit_period : float, optional
+        The length in seconds of a rate limit window.
+    query_result : bytes, optional
+        The contents of the output of SQL script runs.
+
+    Attributes
+    ----------
+    requests : int
+        The number of API requests which the server has answered, not
+        counting requests to storage URLs.
+    storage : dict
+        The contents of uploaded and generated files, keyed by their path
+        after ``storage/``.
+    """
+    def __init__(self, spec=None, host="127.0.0.1", port=0, latency=0,
+                 job_duration=0.1, final_state="succeeded", page_size=50,
+                 rate_limit=1000, rate_limit_period=300,
+                 query_result=DEFAULT_QUERY_RESULT):
+        if spec is None:
+            if not os.path.exists(DEFAULT_SPEC_PATH):
+                raise ValueError("No API specification found at {}. Pass "
+                                 "the specification with `spec`."
+                                 .format(DEFAULT_SPEC_PATH))
+            spec = DEFAULT_SPEC_PATH
+        if isinstance(spec, str):
+            with open(spec) as f:
+                spec = json.load(f, object_pairs_hook=OrderedDict)
+        self._spec_body = json.dumps(spec).encode("utf-8")
+        self._spec_etag = '"{}"'.format(
+            hashlib.sha256(self._spec_body).hexdigest())
+        self._routes = _routes(spec)
+        self._address = (host, port)
+        self.latency = latency
+        self.job_duration = job_duration
+        self.final_state = final_state
+        self.page_size = page_size
+        self.rate_limit = rate_limit
+        self.rate_limit_period = rate_limit_period
+        self.query_result = query_result
+
+        self.requests = 0
+        self.storage = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._collections = {}
+        self._singletons = {}
+        self._finish_at = {}
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._server = None
+        self._thread = None
+
+        self.add("databases", {"name": "fake-db"})
+        self.add("credentials", {"name": "fake-user", "type": "Database",
+                                 "username": "fake-user",
+                                 "remoteHostId": None})
+        self._singletons["users/me"] = self._new(
+            "users/me", "GET", {"id": next(self._ids), "name": "Fake User",
+                                "username": "fake-user"})
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def url(self):
+        """The base URL of the API, e.g. ``"http://127.0.0.1:8080/"``."""
+        if self._server is None:
+            raise RuntimeError("The server hasn't been started.")
+        host, port = self._server.server_address[:2]
+        return "http://{}:{}/".format(host, port)
+
+    def start(self):
+        """Start answering requests in a background thread."""
+        if self._server is None:
+            self._server = _Server(self._address, _Handler)
+            self._server.fake_api = self
+            self._thread = threading.Thread(target=self._server.serve_forever,
+                                            kwargs={"poll_interval": 0.05},
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop answering requests."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = self._thread = None
+
+    def add(self, collection, obj):
+        """Add an object to a collection, e.g. ``"databases"``, and return it.
+
+        The object is given the next ID unless it has an ``"id"``. Fields
+        of the API response which `obj` doesn't have are ``None``.
+        """
+        collection = collection.strip("/")
+        with self._lock:
+            obj = self._new(collection, "POST", obj)
+            if obj.get("id") is None:
+                obj["id"] = next(self._ids)
+            self._collections.setdefault(collection, OrderedDict())[
+                str(obj["id"])] = obj
+        return copy.deepcopy(obj)
+
+    def _new(self, path, method, fields):
+        obj = OrderedDict()
+        route = self._match(path)
+        if route is not None:
+            operation = (route.operations.get(method) or
+                         route.operations.get("GET"))
+            if operation is not None and operation.schema is not None:
+                schema = operation.schema
+                if operation.is_list:
+                    schema = schema.get("items")
+                obj = _example(schema) or OrderedDict()
+        obj.update(fields)
+        return obj
+
+    def _match(self, path):
+        for route in self._routes:
+            if route.regex.match(path):
+                return route
+        return None
+
+    def _handle(self, method, raw_path, headers, body):
+        """Answer a request. Return the status, headers and body of the
+        response."""
+        url = urlsplit(raw_path)
+        if url.path.startswith(_STORAGE_PREFIX):
+            return self._storage(method, url.path[len(_STORAGE_PREFIX):],
+                                 headers, body)
+        with self._lock:
+            self.requests += 1
+            rate_headers, retry_after = self._count_request()
+        if not headers.get("Authorization"):
+            return self._json(401, {"error": "unauthorized",
+                                    "errorDescription": "Missing API key.",
+                                    "code": 401},
+                              {"WWW-Authenticate": 'Basic realm="Civis"'})
+        if retry_after is not None:
+            rate_headers["Retry-After"] = str(retry_after)
+            return self._json(429, {"error": "too_many_requests",
+                                    "errorDescription": "Rate limit exceeded.",
+                                    "code": 429}, rate_headers)
+        path = url.path.strip("/")
+        if path == "endpoints" and method == "GET":
+            if headers.get("If-None-Match") == self._spec_etag:
+                return 304, {"ETag": self._spec_etag}, b""
+            return 200, {"Content-Type": "application/json",
+                         "ETag": self._spec_etag}, self._spec_body
+        route = self._match(path)
+        if route is None:
+            return self._not_found(rate_headers)
+        operation = route.operations.get(method)
+        if operation is None:
+            return self._json(405, {"error": "method_not_allowed",
+                                    "errorDescription": "Method not allowed.",
+                                    "code": 405}, rate_headers)
+        data = json.loads(body.decode("utf-8")) if body else {}
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        with self._lock:
+            return self._dispatch(method, path, route, operation, query,
+                                  data, rate_headers)
+
+    def _count_request(self):
+        if self.rate_limit is None:
+            return {}, None
+        now = time.monotonic()
+        if now - self._window_start >= self.rate_limit_period:
+            self._window_start, self._window_count = now, 0
+        self._window_count += 1
+        remaining = self.rate_limit - self._window_count
+        headers = {"X-RateLimit-Limit": str(self.rate_limit),
+                   "X-RateLimit-Remaining": str(max(remaining, 0))}
+        if remaining >= 0:
+            return headers, None
+        wait = self._window_start + self.rate_limit_period - now
+        return headers, max(1, math.ceil(wait))
+
+    def _dispatch(self, method, path, route, operation, query, data,
+                  headers):
+        if route.is_item:
+            collection, obj_id = path.rsplit("/", 1)
+            items = self._collections.get(collection, {})
+            if obj_id not in items:
+                return self._not_found(headers)
+            if method == "DELETE":
+                del items[obj_id]
+                return self._json(operation.status, None, headers)
+            if method in ("PUT", "PATCH"):
+                items[obj_id].update(data)
+            return self._json(operation.status, self._refresh(
+                collection, items[obj_id]), headers)
+
+        if method == "GET" and operation.is_list:
+            items = [self._refresh(path, obj) for obj in
+                     self._collections.get(path, {}).values()]
+            return self._page(items, query, headers)
+        if method == "POST":
+            obj = self._create(path, route, data)
+            return self._json(operation.status, obj, headers)
+        # Everything else, e.g. "users/me", is a single object at `path`.
+        obj = self._singletons.get(path)
+        if obj is None:
+            obj = self._singletons[path] = self._new(path, method, {})
+        if method in ("PUT", "PATCH"):
+            obj.update(data)
+        elif method == "DELETE":
+            del self._singletons[path]
+            obj = None
+        return self._json(operation.status, obj, headers)
+
+    def _create(self, path, route, data):
+        obj = self._new(path, "POST", data)
+        obj["id"] = obj_id = next(self._ids)
+        obj.setdefault("createdAt", _now())
+        if route.template.endswith("/runs"):
+            self._start_run(path, obj)
+        elif route.template == "files":
+            key = "files/{}".format(obj_id)
+            obj.update(uploadUrl=self._storage_url(""),
+                       uploadFields={"key": key},
+                       fileUrl=self._storage_url(key))
+        elif route.template == "imports/files":
+            obj.update(uploadUri=self._storage_url("imports/{}".format(
+                obj_id)), runUri="{}imports/files/{}/runs".format(
+                    self.url, obj_id))
+        self._collections.setdefault(path, OrderedDict())[str(obj_id)] = obj
+        return obj
+
+    def _start_run(self, path, run):
+        # The first ID field other than "id" is the ID of the job, e.g.
+        # "sqlId" or "importId".
+        parent_id = path.split("/")[-2]
+        for name in run:
+            if name != "id" and name.endswith("Id"):
+                run[name] = int(parent_id) if parent_id.isdigit() \
+                    else parent_id
+                break
+        run.update(state="running", startedAt=_now(), finishedAt=None,
+                   isCancelRequested=False)
+        if path.startswith("scripts/sql/"):
+            key = "runs/{}.csv".format(run["id"])
+            self.storage[key] = self.query_result
+            run["output"] = [{"outputName": "Output", "fileId": run["id"],
+                              "path": self._storage_url(key)}]
+        self._finish_at[(path, str(run["id"]))] = \
+            time.monotonic() + self.job_duration
+
+    def _refresh(self, collection, obj):
+        key = (collection, str(obj.get("id")))
+        finish_at = self._finish_at.get(key)
+        if finish_at is not None and time.monotonic() >= finish_at:
+            del self._finish_at[key]
+            obj.update(state=self.final_state, finishedAt=_now())
+            if self.final_state == "failed":
+                obj["error"] = "The run failed."
+        return obj
+
+    def _page(self, items, query, headers):
+        try:
+            limit = max(1, int(query.get("limit", self.page_size)))
+            page_num = max(1, int(query.get("page_num", 1)))
+        except ValueError:
+            return self._json(400, {"error": "bad_request",
+                                    "errorDescription": "Invalid page.",
+                                    "code": 400}, headers)
+        start = (page_num - 1) * limit
+        headers = dict(headers, **{
+            "X-Pagination-Current-Page": str(page_num),
+            "X-Pagination-Per-Page": str(limit),
+            "X-Pagination-Total-Entries": str(len(items)),
+            "X-Pagination-Total-Pages": str(math.ceil(len(items) / limit)),
+        })
+        return self._json(200, items[start:start + limit], headers)
+
+    def _storage_url(self, key):
+        return "{}{}{}".format(self.url, _STORAGE_PREFIX.lstrip("/"), key)
+
+    def _storage(self, method, key, headers, body):
+        if method == "POST":
+            fields = _parse_form(headers.get("Content-Type", ""), body)
+            key = fields.get("key", b"").decode("utf-8")
+            body = fields.get("file", b"")
+        if method in ("POST", "PUT"):
+            with self._lock:
+                self.storage[key] = body
+            return 204 if method == "POST" else 200, {}, b""
+        with self._lock:
+            content = self.storage.get(key)
+        if content is None or method not in ("GET", "HEAD"):
+            return 404, {}, b""
+        return 200, {"Content-Type": "application/octet-stream"}, content
+
+    def _json(self, status, data, headers):
+        if data is None:
+            # Responses without a schema have no body.
+            return 204, headers, b""
+        headers = dict(headers, **{"Content-Type": "application/json"})
+        return status, headers, json.dumps(data).encode("utf-8")
+
+    def _not_found(self, headers):
+        return self._json(404, {"error": "not_found",
+                                "errorDescription": "The requested resource "
+                                                    "could not be found.",
+                                "code": 404}, headers)
@@ -0,0 +1,165 @@
+"""Hedged requests, which reduce the tail latency of ``GET`` requests.
+
+Occasionally, an API request takes much longer than usual, e.g. when it
+lands on a busy server. A :class:`HedgingPolicy` sends a second copy of a
+``GET`` request if the first hasn't been answered after a delay, uses
+whichever response arrives first and discards the other. The delay is a
+percentile of the recent request latencies, so only the slowest requests are
+hedged, and a budget limits how many extra requests can be made. It is
+enabled with ``civis.APIClient(hedging=True)``.
+"""
+import collections
+from concurrent import futures
+import threading
+import time
+
+from civis.ratelimit import _is_background, background
+
+
+DEFAULT_PERCENTILE = 95
+DEFAULT_BUDGET = 0.05
+DEFAULT_MIN_DELAY = 0.01
+DEFAULT_INITIAL_DELAY = 1.0
+DEFAULT_WINDOW = 1000
+
+# Hedging starts after this many latencies have been recorded ...
+_MIN_SAMPLES = 20
+# ... and unspent budget accumulates up to this many hedges.
+_MAX_TOKENS = 10
+
+
+class HedgingPolicy:
+    """Decide when to send a duplicate ``GET`` request, and send it.
+
+    Parameters
+    ----------
+    percentile : float, optional
+        Hedge requests which haven't been answered after this percentile of
+        the recent request latencies.
+    budget : float, optional
+        The number of hedged requests allowed per request, e.g. ``0.05`` lets
+        at most 5% of requests be sent twice. Unspent budget accumulates up
+        to 10 requests.
+    min_delay : float, optional
+        The shortest delay in seconds before a request is hedged.
+    initial_delay : float, optional
+        The delay in seconds before a request is hedged, until enough
+        latencies have been recorded to compute the percentile.
+    window : int, optional
+        The number of recent latencies from which the percentile is
+        computed.
+
+    Attributes
+    ----------
+    hedged : int
+        The number of duplicate requests sent.
+    hedge_wins : int
+        The number of duplicate requests which were answered first.
+    """
+    def __init__(self, percentile=DEFAULT_PERCENTILE, budget=DEFAULT_BUDGET,
+                 min_delay=DEFAULT_MIN_DELAY,
+                 initial_delay=DEFAULT_INITIAL_DELAY, window=DEFAULT_WINDOW):
+        if not 0 < percentile <= 100:
+            raise ValueError("percentile must be in (0, 100]")
+        self.percentile = percentile
+        self.budget = budget
+        self.min_delay = min_delay
+        self.initial_delay = initial_delay
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._latencies = collections.deque(maxlen=window)
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def delay(self):
+        """Return the number of seconds after which a request is hedged."""
+        with self._lock:
+            if len(self._latencies) < _MIN_SAMPLES:
+                return self.initial_delay
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1,
+                    int(len(ordered) * self.percentile / 100))
+        return max(self.min_delay, ordered[index])
+
+    def record(self, latency):
+        """Record the latency of a request, in seconds."""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def _earn(self):
+        with self._lock:
+            self._tokens = min(_MAX_TOKENS, self._tokens + self.budget)
+            return self._tokens >= 1
+
+    def _spend(self):
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self.hedged += 1
+            return True
+
+    def _timed(self, send, is_background=False):
+        start = time.monotonic()
+        if is_background:
+            with background():
+                result = send()
+        else:
+            result = send()
+        self.record(time.monotonic() - start)
+        return result
+
+    def _start(self, send, is_background):
+        """Call ``send()`` on a new thread and return a future of its
+        result."""
+        future = futures.Future()
+
+        def run():
+            try:
+                future.set_result(self._timed(send, is_background))
+            except BaseException as e:
+                future.set_exception(e)
+
+        # Each request gets its own thread rather than one from a bounded
+        # pool, so requests are never queued behind each other, and
+        # `Thread.start` returns once the thread is running, so the hedging
+        # delay counts from when the request is actually sent.
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+    def send(self, send):
+        """Return the result of ``send()``, calling it a second time if the
+        first call takes longer than :meth:`delay` and the budget allows.
+
+        Parameters
+        ----------
+        send : callable
+            Sends a request and returns the response. It must be safe to call
+            twice at the same time.
+
+        Returns
+        -------
+        The result of whichever call finished first without an exception.
+        If both raise, the exception of the first call is raised.
+        """
+        if not self._earn():
+            return self._timed(send)
+
+        is_background = _is_background()
+        primary = self._start(send, is_background)
+        done, _ = futures.wait([primary], timeout=self.delay())
+        if done or not self._spend():
+            return primary.result()
+
+        hedge = self._start(send, is_background)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = futures.wait(
+                pending, return_when=futures.FIRST_COMPLETED)
+            for future in (primary, hedge):
+                if future in done and future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+        return primary.result()
@@ -1,3 +1,5 @@
+from ._clients import share_clients
+from ._transfers import configure_transfers
 from ._databases import query_civis, transfer_table
 from ._files import file_to_civis, civis_to_file
 from ._tables import (read_civis, read_civis_sql, civis_to_csv,
@@ -5,4 +7,5 @@ from ._tables import (read_civis, read_civis_sql, civis_to_csv,
 
 __all__ = ["query_civis", "transfer_table", "file_to_civis", "civis_to_file",
            "read_civis", "read_civis_sql", "civis_to_csv",
-           "dataframe_to_civis", "csv_to_civis"]
+           "dataframe_to_civis", "csv_to_civis", "share_clients",
+           "configure_transfers"]
@@ -0,0 +1,53 @@
+import threading
+
+from civis import APIClient
+from civis.civis import _get_api_key
+
+
+_shared_clients = {}
+_shared_clients_lock = threading.Lock()
+_share = False
+
+
+def share_clients(enabled=True):
+    """Reuse one :class:`~civis.APIClient` per API key in ``civis.io``.
+
+    By default, every ``civis.io`` function which isn't given a `client`
+    creates a new :class:`~civis.APIClient`. With client sharing enabled,
+    those functions instead use a process-wide client for each API key, so
+    that repeated calls share a connection pool as well as the cached
+    lookups of database and credential IDs.
+
+    Parameters
+    ----------
+    enabled : bool, optional
+        Whether to share clients. Disabling sharing discards the shared
+        clients.
+
+    Examples
+    --------
+    >>> civis.io.share_clients()
+    >>> for table in tables:
+    ...     civis.io.read_civis(table, "my_database")
+    """
+    global _share
+    with _shared_clients_lock:
+        _share = bool(enabled)
+        if not _share:
+            _shared_clients.clear()
+
+
+def _get_client(api_key=None, client=None):
+    """Return the client which a ``civis.io`` function should use."""
+    if client is not None:
+        if api_key is not None:
+            raise ValueError("Provide either api_key or client, not both.")
+        return client
+    if not _share:
+        return APIClient(api_key=api_key)
+    api_key = _get_api_key(api_key)
+    with _shared_clients_lock:
+        client = _shared_clients.get(api_key)
+        if client is None:
+            client = _shared_clients[api_key] = APIClient(api_key=api_key)
+    return client
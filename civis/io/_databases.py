@@ -1,11 +1,11 @@
-from civis import APIClient
 from civis._utils import maybe_get_random_name
+from civis.io._clients import _get_client
 from civis.polling import PollableResult, _DEFAULT_POLLING_INTERVAL
 
 
 def query_civis(sql, database, api_key=None, credential_id=None,
                 preview_rows=10,
-                polling_interval=_DEFAULT_POLLING_INTERVAL):
+                polling_interval=_DEFAULT_POLLING_INTERVAL, client=None):
     """Execute a SQL statement as a Civis query.
 
     Run a query that may return no results or where only a small
@@ -29,6 +29,9 @@ def query_civis(sql, database, api_key=None, credential_id=None,
         returned at once.
     polling_interval : int or float, optional
         Number of seconds to wait between checks for query completion.
+    client : :class:`civis.APIClient`, optional
+        Make API calls with this client instead of creating a new one.
+        Can't be used together with `api_key`.
 
     Returns
     -------
@@ -40,7 +43,7 @@ def query_civis(sql, database, api_key=None, credential_id=None,
     >>> run = query_civis(sql="DELETE schema.table", database='database')
     >>> run.result()  # Wait for query to complete
     """
-    client = APIClient(api_key=api_key)
+    client = _get_client(api_key, client)
     database_id = client.get_database_id(database)
     cred_id = credential_id or client.default_credential
     resp = client.queries.post(database_id, sql, preview_rows,
@@ -52,7 +55,7 @@ def transfer_table(source_db, dest_db, source_table, dest_table,
                    job_name=None, api_key=None, source_credential_id=None,
                    dest_credential_id=None,
                    polling_interval=_DEFAULT_POLLING_INTERVAL,
-                   **advanced_options):
+                   client=None, **advanced_options):
     """Transfer a table from one location to another.
 
     Parameters
@@ -82,6 +85,9 @@ def transfer_table(source_db, dest_db, source_table, dest_table,
         the default credential will be used.
     polling_interval : int or float, optional
         Number of seconds to wait between checks for job completion.
+    client : :class:`civis.APIClient`, optional
+        Make API calls with this client instead of creating a new one.
+        Can't be used together with `api_key`.
     **advanced_options : kwargs
         Extra keyword arguments will be passed to the import sync job. See
         :func:`~civis.resources._resources.Imports.post_syncs`.
@@ -96,7 +102,7 @@ def transfer_table(source_db, dest_db, source_table, dest_table,
     >>> transfer_table(source_db='Cluster A', dest_db='Cluster B',
     ...                source_table='schma.tbl', dest_table='schma.tbl')
     """
-    client = APIClient(api_key=api_key)
+    client = _get_client(api_key, client)
     source_cred_id = source_credential_id or client.default_credential
     dest_cred_id = dest_credential_id or client.default_credential
     job_name = maybe_get_random_name(job_name)
@@ -1,12 +1,11 @@
 from collections import OrderedDict
 
-import requests
-
-from civis import APIClient
 from civis.base import EmptyResultError
+from civis.io._clients import _get_client
+from civis.io._transfers import _transfer
 
 
-def file_to_civis(buf, name, api_key=None, **kwargs):
+def file_to_civis(buf, name, api_key=None, client=None, **kwargs):
     """Upload a file to Civis.
 
     Parameters
@@ -18,6 +17,9 @@ def file_to_civis(buf, name, api_key=None, **kwargs):
     api_key : str, optional
         Your Civis API key. If not given, the :envvar:`CIVIS_API_KEY`
         environment variable will be used.
+    client : :class:`civis.APIClient`, optional
+        Make API calls with this client instead of creating a new one.
+        Can't be used together with `api_key`.
     **kwargs : kwargs
         Extra keyword arguments will be passed to the file creation
         endpoint. See :func:`~civis.resources._resources.Files.post`.
@@ -33,7 +35,7 @@ def file_to_civis(buf, name, api_key=None, **kwargs):
     pass to this function, do so using the ``'rb'`` (read binary)
     mode (e.g., ``open('myfile.zip', 'rb')``).
     """
-    client = APIClient(api_key=api_key)
+    client = _get_client(api_key, client)
     file_response = client.files.post(name, **kwargs)
 
     form = file_response.upload_fields
@@ -43,13 +45,13 @@ def file_to_civis(buf, name, api_key=None, **kwargs):
     form_key['file'] = buf
 
     url = file_response.upload_url
-    response = requests.post(url, files=form_key)
+    response = _transfer('POST', url, files=form_key)
     response.raise_for_status()
 
     return file_response.id
 
 
-def civis_to_file(file_id, buf, api_key=None):
+def civis_to_file(file_id, buf, api_key=None, client=None):
     """Download a file from Civis.
 
     Parameters
@@ -62,6 +64,9 @@ def civis_to_file(file_id, buf, api_key=None):
     api_key : str, optional
         Your Civis API key. If not given, the :envvar:`CIVIS_API_KEY`
         environment variable will be used.
+    client : :class:`civis.APIClient`, optional
+        Make API calls with this client instead of creating a new one.
+        Can't be used together with `api_key`.
 
     Returns
     -------
@@ -73,12 +78,13 @@ def civis_to_file(file_id, buf, api_key=None):
     >>> with open("my_file.txt", "w") as f:
     ...    civis_to_file(file_id, f)
     """
-    url = _get_url_from_file_id(file_id, api_key=api_key)
+    client = _get_client(api_key, client)
+    url = _get_url_from_file_id(file_id, client)
     if not url:
         raise EmptyResultError('Unable to locate file {}. If it previously '
                                'existed, it may have '
                                'expired.'.format(file_id))
-    response = requests.get(url, stream=True)
+    response = _transfer('GET', url, stream=True)
     response.raise_for_status()
     chunk_size = 32 * 1024
     chunked = response.iter_content(chunk_size)
@@ -86,8 +92,7 @@ def civis_to_file(file_id, buf, api_key=None):
         buf.write(lines)
 
 
-def _get_url_from_file_id(file_id, api_key=None):
-    client = APIClient(api_key=api_key)
+def _get_url_from_file_id(file_id, client):
     files_response = client.files.get(file_id)
     url = files_response.file_url
     return url
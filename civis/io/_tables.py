@@ -1,18 +1,22 @@
 import csv
 import tempfile
 
-try:
-    import pandas as pd
-    NO_PANDAS = False
-except ImportError:
-    NO_PANDAS = True
-import requests
-
-from civis import APIClient
 from civis._utils import maybe_get_random_name
+from civis.io._clients import _get_client
+from civis.io._transfers import _transfer
 from civis.polling import PollableResult, _DEFAULT_POLLING_INTERVAL
 
 
+def _import_pandas():
+    # pandas is slow to import, so only do it when it's going to be used.
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("use_pandas is True but pandas is not "
+                          "installed.") from None
+    return pd
+
+
 DELIMITERS = {
     ',': 'comma',
     '\t': 'tab',
@@ -23,7 +27,7 @@ DELIMITERS = {
 def read_civis(table, database, columns=None, use_pandas=False,
                job_name=None, api_key=None, credential_id=None,
                polling_interval=_DEFAULT_POLLING_INTERVAL,
-               archive=True, **kwargs):
+               archive=True, client=None, **kwargs):
     """Read data from a Civis table.
 
     Parameters
@@ -53,6 +57,9 @@ def read_civis(table, database, columns=None, use_pandas=False,
     archive : bool, optional
         If ``True`` (the default), archive the export job as soon as it
         completes.
+    client : :class:`civis.APIClient`, optional
+        Make API calls with this client instead of creating a new one.
+        Can't be used together with `api_key`.
     **kwargs : kwargs
         Extra keyword arguments are passed into
         :func:`pandas:pandas.read_csv` if `use_pandas` is ``True`` or
@@ -90,21 +97,21 @@ def read_civis(table, database, columns=None, use_pandas=False,
     civis.io.read_civis_sql : Read directly into memory using SQL.
     civis.io.civis_to_csv : Write directly to csv.
     """
-    if use_pandas and NO_PANDAS:
-        raise ImportError("use_pandas is True but pandas is not installed.")
+    if use_pandas:
+        _import_pandas()
     sql = _get_sql_select(table, columns)
     data = read_civis_sql(sql=sql, database=database, use_pandas=use_pandas,
                           job_name=job_name, api_key=api_key,
                           credential_id=credential_id,
                           polling_interval=polling_interval,
-                          archive=archive, **kwargs)
+                          archive=archive, client=client, **kwargs)
     return data
 
 
 def read_civis_sql(sql, database, use_pandas=False, job_name=None,
                    api_key=None, credential_id=None,
                    polling_interval=_DEFAULT_POLLING_INTERVAL,
-                   archive=True, **kwargs):
+                   archive=True, client=None, **kwargs):
     """Read data from Civis using a custom SQL string.
 
     Parameters
@@ -131,6 +138,9 @@ def read_civis_sql(sql, database, use_pandas=False, job_name=None,
     archive : bool, optional
         If ``True`` (the default), archive the export job as soon as it
         completes.
+    client : :class:`civis.APIClient`, optional
+        Make API calls with this client instead of creating a new one.
+        Can't be used together with `api_key`.
     **kwargs : kwargs
         Extra keyword arguments are passed into
         :func:`pandas:pandas.read_csv` if `use_pandas` is ``True`` or
@@ -170,13 +180,14 @@ def read_civis_sql(sql, database, use_pandas=False, job_name=None,
     civis.io.read_civis : Read directly into memory without SQL.
     civis.io.civis_to_csv : Write directly to a CSV file.
     """
-    if use_pandas and NO_PANDAS:
-        raise ImportError("use_pandas is True but pandas is not installed.")
+    if use_pandas:
+        pd = _import_pandas()
     with tempfile.NamedTemporaryFile(mode="w+") as f:
         csv_poll = civis_to_csv(f.name, sql=sql, database=database,
                                 job_name=job_name, credential_id=credential_id,
                                 polling_interval=polling_interval,
-                                archive=archive, api_key=api_key)
+                                archive=archive, api_key=api_key,
+                                client=client)
         csv_poll.result()
         if use_pandas:
             data = pd.read_csv(f.name, **kwargs)
@@ -188,7 +199,8 @@ def read_civis_sql(sql, database, use_pandas=False, job_name=None,
 
 def civis_to_csv(filename, sql, database, job_name=None, api_key=None,
                  credential_id=None,
-                 polling_interval=_DEFAULT_POLLING_INTERVAL, archive=True):
+                 polling_interval=_DEFAULT_POLLING_INTERVAL, archive=True,
+                 client=None):
     """Export data from Civis to a local CSV file.
 
     Parameters
@@ -213,6 +225,9 @@ def civis_to_csv(filename, sql, database, job_name=None, api_key=None,
     archive : bool, optional
         If ``True`` (the default), archive the export job as soon as it
         completes.
+    client : :class:`civis.APIClient`, optional
+        Make API calls with this client instead of creating a new one.
+        Can't be used together with `api_key`.
 
     Returns
     -------
@@ -230,7 +245,7 @@ def civis_to_csv(filename, sql, database, job_name=None, api_key=None,
     civis.io.read_civis : Read table contents into memory.
     civis.io.read_civis_sql : Read results of a SQL query into memory.
     """
-    client = APIClient(api_key=api_key)
+    client = _get_client(api_key, client)
     script_id, run_id = _sql_script(client, sql, database,
                                     job_name, credential_id)
     poll = PollableResult(client.scripts.get_sql_runs,
@@ -253,7 +268,7 @@ def dataframe_to_civis(df, database, table, api_key=None,
                        distkey=None, sortkey1=None, sortkey2=None,
                        headers=None, credential_id=None,
                        polling_interval=_DEFAULT_POLLING_INTERVAL,
-                       archive=True, **kwargs):
+                       archive=True, client=None, **kwargs):
     """Upload a `pandas` `DataFrame` into a Civis table.
 
     Parameters
@@ -293,6 +308,9 @@ def dataframe_to_civis(df, database, table, api_key=None,
     archive : bool, optional
         If ``True`` (the default), archive the import job as soon as it
         completes.
+    client : :class:`civis.APIClient`, optional
+        Make API calls with this client instead of creating a new one.
+        Can't be used together with `api_key`.
     **kwargs : kwargs
         Extra keyword arguments will be passed to
         :meth:`pandas:pandas.DataFrame.to_csv`.
@@ -319,7 +337,7 @@ def dataframe_to_civis(df, database, table, api_key=None,
                             headers=headers, credential_id=credential_id,
                             polling_interval=_DEFAULT_POLLING_INTERVAL,
                             existing_table_rows=existing_table_rows,
-                            archive=archive)
+                            archive=archive, client=client)
     return poll
 
 
@@ -329,7 +347,7 @@ def csv_to_civis(filename, database, table, api_key=None,
                  delimiter=",", headers=None,
                  credential_id=None,
                  polling_interval=_DEFAULT_POLLING_INTERVAL,
-                 archive=True):
+                 archive=True, client=None):
     """Upload the contents of a local CSV file to Civis.
 
     Parameters
@@ -371,6 +389,9 @@ def csv_to_civis(filename, database, table, api_key=None,
     archive : bool, optional
         If ``True`` (the default), archive the import job as soon as it
         completes.
+    client : :class:`civis.APIClient`, optional
+        Make API calls with this client instead of creating a new one.
+        Can't be used together with `api_key`.
 
     Returns
     -------
@@ -390,7 +411,7 @@ def csv_to_civis(filename, database, table, api_key=None,
     ...                                'scratch.my_data')
     >>> poller.result()
     """
-    client = APIClient(api_key=api_key)
+    client = _get_client(api_key, client)
     schema, table = table.split(".", 1)
     db_id = client.get_database_id(database)
     cred_id = credential_id or client.default_credential
@@ -405,9 +426,10 @@ def csv_to_civis(filename, database, table, api_key=None,
 
     import_job = client.imports.post_files(**kwargs)
     with open(filename, "rb") as data:
-        put_response = requests.put(import_job.upload_uri, data)
+        put_response = _transfer('PUT', import_job.upload_uri, data=data)
     put_response.raise_for_status()
-    run_job_result = client._session.post(import_job.run_uri)
+    run_job_result = client._session.post(import_job.run_uri,
+                                          timeout=client._timeout)
     run_job_result.raise_for_status()
     run_info = run_job_result.json()
     poll = PollableResult(client.imports.get_files_runs,
@@ -443,7 +465,7 @@ def _get_sql_select(table, columns=None):
 
 
 def _download_file(url, local_path):
-    response = requests.get(url, stream=True)
+    response = _transfer('GET', url, stream=True)
     response.raise_for_status()
 
     chunk_size = 32 * 1024
@@ -0,0 +1,118 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import civis
+from civis.retries import RetryPolicy
+
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+_lock = threading.Lock()
+_settings = {}
+
+
+def configure_transfers(pool_connections=DEFAULT_POOL_CONNECTIONS,
+                        pool_maxsize=DEFAULT_POOL_MAXSIZE, timeout=None,
+                        retry_policy=True, session=None):
+    """Configure the session which ``civis.io`` uses to transfer files.
+
+    File contents are uploaded to and downloaded from storage URLs which the
+    API provides, rather than through the API itself. These transfers share
+    one :class:`requests:requests.Session` (separate from the sessions of
+    API clients), so that connections to the storage service are reused.
+    Calling this function replaces that session for later transfers.
+
+    Parameters
+    ----------
+    pool_connections : int, optional
+        The number of connection pools to cache. See
+        :class:`requests:requests.adapters.HTTPAdapter`.
+    pool_maxsize : int, optional
+        The maximum number of connections to keep open to each host. Use at
+        least the number of threads which transfer files at the same time.
+    timeout : float or tuple, optional
+        How many seconds to wait for the storage service to respond, as a
+        single number or a ``(connect timeout, read timeout)`` tuple. By
+        default, wait indefinitely.
+    retry_policy : bool or :class:`civis.retries.RetryPolicy`, optional
+        How to retry failed transfers. ``True`` uses a
+        :class:`~civis.retries.RetryPolicy` with its default settings, and
+        ``False`` disables retries. Uploads are retried only if their
+        contents can be read again from the start.
+    session : :class:`requests:requests.Session`, optional
+        The session with which to transfer files, e.g. to configure proxies.
+        No adapter is mounted on it, so `pool_connections` and
+        `pool_maxsize` are ignored.
+
+    Examples
+    --------
+    >>> civis.io.configure_transfers(pool_maxsize=32, timeout=(5, 60))
+    """
+    if retry_policy is True:
+        retry_policy = RetryPolicy()
+    if session is None:
+        session = _new_session(pool_connections, pool_maxsize)
+    with _lock:
+        _settings.update(session=session, timeout=timeout,
+                         retry_policy=retry_policy or None)
+
+
+def _new_session(pool_connections, pool_maxsize):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections,
+                          pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    user_agent = "civis-python/{} {}".format(
+        civis.__version__, session.headers.get("User-Agent", ""))
+    session.headers["User-Agent"] = user_agent.strip()
+    return session
+
+
+def _get_settings():
+    with _lock:
+        if not _settings:
+            _settings.update(
+                session=_new_session(DEFAULT_POOL_CONNECTIONS,
+                                     DEFAULT_POOL_MAXSIZE),
+                timeout=None, retry_policy=RetryPolicy())
+        return (_settings["session"], _settings["timeout"],
+                _settings["retry_policy"])
+
+
+def _positions(kwargs):
+    """Return the bodies of a request with their current positions, or
+    ``None`` if a body can't be read again."""
+    bodies = [kwargs.get("data")]
+    bodies.extend((kwargs.get("files") or {}).values())
+    positions = []
+    for body in bodies:
+        if body is None or isinstance(body, (bytes, str, dict)):
+            continue
+        try:
+            positions.append((body, body.tell()))
+        except (AttributeError, OSError, ValueError):
+            return None
+    return positions
+
+
+def _transfer(method, url, **kwargs):
+    """Make a request to a storage URL with the transfer session, retrying
+    it according to the transfer retry policy."""
+    session, timeout, policy = _get_settings()
+    kwargs.setdefault("timeout", timeout)
+    positions = _positions(kwargs) if policy is not None else None
+    if positions is None:
+        return session.request(method, url, **kwargs)
+
+    def send():
+        for body, position in positions:
+            body.seek(position)
+        return session.request(method, url, **kwargs)
+
+    # Storage URLs are signed for one object, so repeating an upload
+    # rewrites the same object.
+    return policy.run(method, send, idempotent=True)
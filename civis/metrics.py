@@ -0,0 +1,252 @@
+"""Instrumentation of API requests.
+
+Hooks are called before and after every request an :class:`~civis.APIClient`
+makes. Each call receives a :class:`RequestInfo` which describes the request:
+its method, path and path template (e.g. ``scripts/sql/{id}/runs/{run_id}``),
+and once it has finished, its status, latency, size, number of retries and
+rate limit headers. Hooks are given with
+``civis.APIClient(hooks=[my_hook])``.
+
+:class:`MetricsRegistry` is a hook which keeps request counts and latency
+histograms in memory, grouped by endpoint::
+
+    >>> client = civis.APIClient(metrics=True)
+    >>> ...
+    >>> for stats in client.metrics.top(5):
+    ...     print(stats.method, stats.path_template, stats.latency.sum)
+"""
+import bisect
+import copy
+import threading
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0, 60.0)
+
+
+class RequestInfo:
+    """A description of an API request, passed to request hooks.
+
+    Attributes
+    ----------
+    method : str
+        The HTTP method, e.g. ``"GET"``.
+    path : str
+        The path which was requested, e.g. ``"scripts/sql/5/runs/7"``.
+    path_template : str
+        The path of the endpoint in the API specification, e.g.
+        ``"scripts/sql/{id}/runs/{run_id}"``, or `path` if the request
+        wasn't made by an endpoint method.
+    status_code : int or None
+        The status of the final response, or ``None`` if there was none.
+    latency : float or None
+        The number of seconds the request took, including retries.
+    bytes_sent : int or None
+        The size of the request body.
+    bytes_received : int or None
+        The size of the response body.
+    retries : int
+        The number of times the request was retried, whether by a
+        :class:`~civis.retries.RetryPolicy` or by the transport adapter.
+        Retries made by the adapter are only counted with requests 2.12
+        or later.
+    rate_limit : dict
+        The ``X-RateLimit-*`` headers of the final response.
+    error : Exception or None
+        The exception raised while making the request, if any. Error
+        responses (e.g. ``404``) are reported by `status_code` instead.
+    """
+    __slots__ = ("method", "path", "path_template", "status_code", "latency",
+                 "bytes_sent", "bytes_received", "retries", "rate_limit",
+                 "error")
+
+    def __init__(self, method, path, path_template=None):
+        self.method = method
+        self.path = path
+        self.path_template = path_template or path
+        self.status_code = None
+        self.latency = None
+        self.bytes_sent = None
+        self.bytes_received = None
+        self.retries = 0
+        self.rate_limit = {}
+        self.error = None
+
+    def __repr__(self):
+        return "<RequestInfo {} {} status={} latency={}>".format(
+            self.method, self.path_template, self.status_code, self.latency)
+
+    def _update(self, response):
+        self.status_code = response.status_code
+        self.rate_limit = {k: v for k, v in response.headers.items()
+                           if k.lower().startswith("x-ratelimit")}
+        self.bytes_received = len(response.content or b"")
+        request = response.request
+        body = getattr(request, "body", None) if request else None
+        if isinstance(body, (bytes, str)):
+            self.bytes_sent = len(body)
+        elif body is None:
+            self.bytes_sent = 0
+
+
+class RequestHook:
+    """Base class of request hooks.
+
+    Subclasses override either method. Exceptions raised by a hook are not
+    caught, and propagate to the caller of the API method.
+    """
+    def before_request(self, info):
+        """Called with a :class:`RequestInfo` before a request is made."""
+
+    def after_request(self, info):
+        """Called with the completed :class:`RequestInfo` after a request
+        has finished, whether or not it succeeded."""
+
+
+class Histogram:
+    """A thread-unsafe histogram of observed values.
+
+    Parameters
+    ----------
+    buckets : sequence of float, optional
+        The upper bounds of the buckets, in increasing order. Larger values
+        are counted in an extra, unbounded bucket.
+
+    Attributes
+    ----------
+    counts : list of int
+        The number of values in each bucket.
+    count : int
+        The number of values observed.
+    sum : float
+        The sum of the values observed.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Record `value`."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Return an upper bound of the `q` quantile (0 to 1) of the observed
+        values, or ``None`` if no values were observed. Returns ``inf`` if
+        the quantile is in the unbounded bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+class EndpointStats:
+    """Metrics of the requests to one endpoint.
+
+    Attributes
+    ----------
+    method : str
+    path_template : str
+    requests : int
+        The number of requests.
+    errors : int
+        The number of requests which raised an exception or got an error
+        response.
+    retries : int
+        The total number of retries.
+    bytes_sent : int
+    bytes_received : int
+    latency : :class:`Histogram`
+        The latencies of the requests, in seconds.
+    status_codes : dict
+        The number of responses with each status.
+    """
+    def __init__(self, method, path_template, buckets=DEFAULT_BUCKETS):
+        self.method = method
+        self.path_template = path_template
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency = Histogram(buckets)
+        self.status_codes = {}
+
+    def __repr__(self):
+        return "<EndpointStats {} {} requests={} latency={:.3f}s>".format(
+            self.method, self.path_template, self.requests, self.latency.sum)
+
+
+class MetricsRegistry(RequestHook):
+    """A request hook which keeps metrics of requests in memory, grouped by
+    method and path template.
+
+    Parameters
+    ----------
+    buckets : sequence of float, optional
+        The upper bounds, in seconds, of the buckets of the latency
+        histograms.
+
+    Attributes
+    ----------
+    rate_limit : dict
+        The ``X-RateLimit-*`` headers of the most recent response.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.rate_limit = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def after_request(self, info):
+        key = (info.method, info.path_template)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = EndpointStats(
+                    info.method, info.path_template, self.buckets)
+            stats.requests += 1
+            if info.error is not None or (info.status_code or 0) >= 400:
+                stats.errors += 1
+            stats.retries += info.retries
+            stats.bytes_sent += info.bytes_sent or 0
+            stats.bytes_received += info.bytes_received or 0
+            if info.latency is not None:
+                stats.latency.observe(info.latency)
+            if info.status_code is not None:
+                stats.status_codes[info.status_code] = \
+                    stats.status_codes.get(info.status_code, 0) + 1
+            if info.rate_limit:
+                self.rate_limit = dict(info.rate_limit)
+
+    def get(self, method, path_template):
+        """Return the :class:`EndpointStats` of an endpoint, or ``None``."""
+        with self._lock:
+            return copy.deepcopy(
+                self._stats.get((method.upper(), path_template)))
+
+    def snapshot(self):
+        """Return a copy of the :class:`EndpointStats` of every endpoint
+        which has been requested."""
+        with self._lock:
+            return copy.deepcopy(list(self._stats.values()))
+
+    def top(self, n=10):
+        """Return the :class:`EndpointStats` of the `n` endpoints with the
+        highest total latency."""
+        return sorted(self.snapshot(), key=lambda s: s.latency.sum,
+                      reverse=True)[:n]
+
+    def reset(self):
+        """Discard all metrics."""
+        with self._lock:
+            self._stats.clear()
+            self.rate_limit = {}
@@ -2,6 +2,7 @@ from concurrent import futures
 import time
 
 from civis.base import CivisJobFailure
+from civis.ratelimit import background
 from civis.response import Response
 
 
@@ -39,7 +40,8 @@ class PollableResult(futures.Future):
         The number of seconds between API requests to check whether a result
         is ready.
     """
-    # this may not be friendly to a rate-limited api
+    # Polling requests are made in a `civis.ratelimit.background` context, so
+    # a client with a rate limiter gives priority to other requests.
     # Implementation notes: The `PollableResult` depends on some private
     # features of the `concurrent.futures.Future` class, so it's possible
     # that future versions of Python could break something here.
@@ -146,7 +148,8 @@ class PollableResult(futures.Future):
                 # Poll for a new result
                 self._last_polled = now
                 try:
-                    self._last_result = self._poller(*self._poller_args)
+                    with background():
+                        self._last_result = self._poller(*self._poller_args)
                 except Exception as e:
                     # The _poller can raise API exceptions
                     # Set those directly as this Future's exception
@@ -0,0 +1,192 @@
+"""Client-side pacing of API requests.
+
+The Civis API limits how many requests each user can make in a period of
+time, and reports the limit and the number of requests remaining in the
+``X-RateLimit-Limit`` and ``X-RateLimit-Remaining`` headers of its responses.
+A :class:`RateLimiter` uses those headers to pace requests before the API
+starts rejecting them with ``429 Too Many Requests``. It is enabled with
+``civis.APIClient(rate_limit=True)``, which shares one limiter between every
+client in the process that uses the same API key.
+
+Requests made in a :func:`background` context, such as the polling done by
+:class:`~civis.polling.PollableResult`, have lower priority: they leave part
+of the remaining requests to other (interactive) calls, and wait while those
+are waiting.
+"""
+import contextlib
+import hashlib
+import threading
+import time
+
+
+DEFAULT_PERIOD = 5 * 60
+DEFAULT_RESERVE = 0.1
+
+_context = threading.local()
+_shared_limiters = {}
+_shared_limiters_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def background():
+    """Mark the API requests made by this thread in the block as background
+    requests, which yield to other requests when the rate limit is close.
+
+    Examples
+    --------
+    >>> with civis.ratelimit.background():
+    ...     client.scripts.get_sql_runs(script_id, run_id)
+    """
+    previous = getattr(_context, "background", False)
+    _context.background = True
+    try:
+        yield
+    finally:
+        _context.background = previous
+
+
+def _is_background():
+    return getattr(_context, "background", False)
+
+
+def _header_int(headers, name):
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """A token bucket which paces API requests.
+
+    Each request takes a token from the bucket, and tokens are added back
+    at a steady rate of `limit` tokens per `period` seconds. When the bucket
+    is empty, requests wait for the next token. The limit and the number of
+    tokens are updated from the rate limit headers of every response, so
+    requests made by other processes with the same API key are accounted for.
+
+    Parameters
+    ----------
+    limit : int, optional
+        The number of requests allowed per `period`. If not given, requests
+        are not paced until a response reports the limit.
+    period : float, optional
+        The length in seconds of the API's rate limit period.
+    reserve : float, optional
+        The fraction of `limit` which background requests leave for other
+        requests.
+    """
+    def __init__(self, limit=None, period=DEFAULT_PERIOD,
+                 reserve=DEFAULT_RESERVE):
+        self.period = period
+        self.reserve = reserve
+        self._condition = threading.Condition()
+        self._limit = None
+        self._tokens = None
+        self._updated = time.monotonic()
+        self._in_flight = 0
+        self._interactive_waiting = 0
+        if limit is not None:
+            self._set_limit(limit)
+            self._tokens = float(limit)
+
+    @property
+    def limit(self):
+        """The number of requests allowed per `period`, if known."""
+        return self._limit
+
+    @property
+    def tokens(self):
+        """The number of requests which can be made without waiting."""
+        with self._condition:
+            self._refill()
+            return self._tokens
+
+    def _set_limit(self, limit):
+        self._limit = limit
+        self._rate = limit / self.period
+
+    def _refill(self):
+        now = time.monotonic()
+        if self._limit is not None:
+            self._tokens = min(self._limit, self._tokens +
+                               (now - self._updated) * self._rate)
+        self._updated = now
+
+    def _wait_time(self, is_background):
+        """Return how long to wait before a request can be made, or 0 and
+        take a token if it can be made now."""
+        if self._limit is None:
+            return 0
+        self._refill()
+        needed = 1
+        if is_background:
+            if self._interactive_waiting:
+                return self.period / self._limit
+            needed += self.reserve * self._limit
+        if self._tokens >= needed:
+            self._tokens -= 1
+            return 0
+        return (needed - self._tokens) / self._rate
+
+    def acquire(self):
+        """Wait until a request can be made, then take a token for it.
+
+        Every call must be followed by a call to :meth:`release` once the
+        request has finished.
+        """
+        is_background = _is_background()
+        with self._condition:
+            if not is_background:
+                self._interactive_waiting += 1
+            try:
+                while True:
+                    wait = self._wait_time(is_background)
+                    if not wait:
+                        break
+                    self._condition.wait(wait)
+            finally:
+                if not is_background:
+                    self._interactive_waiting -= 1
+                    self._condition.notify_all()
+            self._in_flight += 1
+
+    def release(self, response=None):
+        """Record the end of a request.
+
+        Parameters
+        ----------
+        response : :class:`requests:requests.Response`, optional
+            The response to the request, if there was one. Its rate limit
+            headers update the limit and the number of tokens.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if response is None:
+                return
+            limit = _header_int(response.headers, "X-RateLimit-Limit")
+            remaining = _header_int(response.headers,
+                                    "X-RateLimit-Remaining")
+            if response.status_code == 429:
+                remaining = 0
+            if limit is not None and limit > 0 and limit != self._limit:
+                self._set_limit(limit)
+                if self._tokens is None:
+                    self._tokens = float(limit)
+            if remaining is not None and self._limit is not None:
+                self._refill()
+                # The API hasn't counted the requests still in flight.
+                tokens = remaining - self._in_flight
+                self._tokens = float(max(0, min(self._limit, tokens)))
+            self._condition.notify_all()
+
+
+def shared_rate_limiter(api_key):
+    """Return the :class:`RateLimiter` shared by every client in this
+    process which uses `api_key`."""
+    key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    with _shared_limiters_lock:
+        limiter = _shared_limiters.get(key)
+        if limiter is None:
+            limiter = _shared_limiters[key] = RateLimiter()
+        return limiter
@@ -1,3 +1,4 @@
 from ._resources import generate_classes
+from ._codegen import generate_module, write_endpoints_module
 
-__all__ = ["generate_classes"]
+__all__ = ["generate_classes", "generate_module", "write_endpoints_module"]
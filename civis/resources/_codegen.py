@@ -0,0 +1,207 @@
+"""Generate a static Python module of endpoint classes from the API spec.
+
+:func:`generate_classes` builds the endpoint classes at runtime, which means
+every process has to fetch (or read) and parse the API specification. The
+functions in this module do that work once, ahead of time, and write the
+result out as a regular Python module. The module can be imported without
+network access and is byte-compiled like any other Python code::
+
+    $ civis generate-endpoints my_project/civis_endpoints.py
+
+    >>> client = civis.APIClient(
+    ...     endpoints_module='my_project.civis_endpoints')
+"""
+import importlib
+import keyword
+import re
+import textwrap
+
+import civis
+from civis._utils import get_api_base_url, to_camelcase
+from civis.resources import _resources
+from civis.resources._resources import (
+    API_VERSIONS, group_paths, is_deprecated, iterable_method, method_doc,
+    parse_args, parse_method_name, spec_digest, split_method_params)
+from civis.resources._refs import RefResolver
+
+
+_HEADER = '''"""Civis API endpoint classes.
+
+Generated by civis-python {version} from the API spec with SHA-256 digest
+{digest}.
+Do not edit this file; regenerate it with ``civis generate-endpoints``.
+"""
+# flake8: noqa
+from civis.base import Endpoint
+
+
+API_VERSION = {api_version!r}
+RESOURCES = {resources!r}
+SPEC_DIGEST = {digest!r}
+'''
+
+
+def _docstring(doc, indent):
+    doc = doc.replace('\\', '\\\\').replace('"""', '\\"\\"\\"')
+    return textwrap.indent('"""{}\n"""'.format(doc), indent).lstrip(' ')
+
+
+def _class_name(class_name):
+    name = re.sub(r'\W', '_', class_name)
+    return name + '_' if keyword.iskeyword(name) else name
+
+
+def _method_source(verb, operation, path):
+    """Return the source code of the method generated for an operation.
+
+    The method behaves like the function returned by
+    :func:`~civis.resources._resources.create_method`.
+    """
+    args = parse_args(operation["parameters"], verb)
+    name = parse_method_name(verb, path)
+    elements = split_method_params(args)
+    required, optional, body_params, query_params, path_params = elements
+
+    signature = ["self"] + required
+    if optional:
+        signature.append("**kwargs")
+    lines = ["def {}({}):".format(name, ", ".join(signature)),
+             "    " + _docstring(method_doc(verb, operation), " " * 4)]
+    pairs = ", ".join("{!r}: {}".format(x, x) for x in required)
+    lines.append("    arguments = {{{}}}".format(pairs))
+    if optional:
+        lines.append("    arguments.update(kwargs)")
+    for var, params in (("body", body_params), ("query", query_params)):
+        if params:
+            lines.append("    {} = {{x: arguments[x] for x in {!r} "
+                         "if x in arguments}}".format(var, tuple(params)))
+        else:
+            lines.append("    {} = {{}}".format(var))
+    if path_params:
+        lines.append("    path_vals = {{x: arguments[x] for x in {!r} "
+                     "if x in arguments}}".format(tuple(path_params)))
+        lines.append("    url = {0!r}.format(**path_vals) if path_vals "
+                     "else {0!r}".format(path))
+    else:
+        lines.append("    url = {!r}".format(path))
+    if iterable_method(verb, query_params):
+        lines.append("    iterator = bool(arguments.get('iterator', False))")
+    else:
+        lines.append("    iterator = False")
+    lines.append("    return self._call_api({!r}, url, query, body, "
+                 "iterator=iterator, path_template={!r})".format(verb, path))
+    return name, textwrap.indent("\n".join(lines), " " * 4)
+
+
+def generate_module(swagger, api_version="1.0", resources="base"):
+    """Return the source code of a module of endpoint classes.
+
+    Parameters
+    ----------
+    swagger : dict
+        The raw API specification, e.g. as returned by
+        :func:`~civis.resources._resources.get_swagger_spec`.
+    api_version : string, optional
+        The version of the API spec. Currently only "1.0" is supported.
+    resources : string, optional
+        Either "base" to include only the default endpoints, or "all" to
+        include every endpoint in the spec.
+
+    Returns
+    -------
+    source : str
+        Python source code. The module defines one
+        :class:`~civis.base.Endpoint` subclass per resource and a
+        ``CLASSES`` dict mapping resource names to those classes, in the
+        same form as returned by
+        :func:`~civis.resources.generate_classes`.
+    """
+    digest = spec_digest(swagger)
+    resolver = RefResolver(swagger)
+    chunks = [_HEADER.format(version=civis.__version__, digest=digest,
+                             api_version=api_version, resources=resources)]
+    class_names = {}
+    groups = group_paths(swagger['paths'], api_version, resources)
+    for resource, paths in groups.items():
+        methods = []
+        for path, ops in paths:
+            path = path.strip('/')
+            for verb, op in resolver.resolve(ops).items():
+                if not is_deprecated(op):
+                    methods.append(_method_source(verb, op, path))
+        base_path = paths[0][0].strip('/').split('/')[0]
+        class_name = _class_name(to_camelcase(base_path))
+        class_names[resource] = class_name
+        body = "\n\n".join(source for _, source in methods)
+        chunks.append("\n\nclass {}(Endpoint):\n\n{}\n".format(
+            class_name, body))
+    entries = "".join("    {!r}: {},\n".format(resource, class_name)
+                      for resource, class_name in class_names.items())
+    chunks.append("\n\nCLASSES = {{\n{}}}\n".format(entries))
+    return "".join(chunks)
+
+
+def write_endpoints_module(path, api_key=None, api_version="1.0",
+                           resources="base"):
+    """Fetch the API spec and write a module of endpoint classes to `path`.
+
+    Parameters
+    ----------
+    path : str
+        Write the module to this file.
+    api_key : str, optional
+        Your API key obtained from the Civis Platform. If not given, the
+        :envvar:`CIVIS_API_KEY` environment variable will be used.
+    api_version : string, optional
+        The version of endpoints to generate. Currently only "1.0" is
+        supported.
+    resources : string, optional
+        Either "base" to include only the default endpoints, or "all" to
+        include every endpoint available to you.
+
+    See Also
+    --------
+    civis.resources.generate_module : Generate the module source code.
+    """
+    from civis.civis import _get_api_key
+
+    assert api_version in API_VERSIONS, (
+        "api_version must be one of {}".format(API_VERSIONS))
+    user_agent = "civis-python/{}".format(civis.__version__)
+    swagger = _resources.get_swagger_spec(_get_api_key(api_key), user_agent,
+                                          api_version, get_api_base_url())
+    source = generate_module(swagger, api_version, resources)
+    with open(path, "w") as f:
+        f.write(source)
+
+
+def load_endpoints_module(module, api_version="1.0", resources=None):
+    """Return the endpoint classes of a generated module.
+
+    Parameters
+    ----------
+    module : str or module
+        A module written by :func:`write_endpoints_module`, or its import
+        name.
+    api_version : string, optional
+        The API version the classes must have been generated for.
+    resources : string, optional
+        If given, the set of resources ("base" or "all") the classes must
+        have been generated for.
+
+    Returns
+    -------
+    classes : dict
+        Maps resource names to endpoint classes.
+    """
+    if isinstance(module, str):
+        module = importlib.import_module(module)
+    if module.API_VERSION != api_version:
+        raise ValueError("{} was generated for API version {}, not "
+                         "{}".format(module.__name__, module.API_VERSION,
+                                     api_version))
+    if resources is not None and module.RESOURCES != resources:
+        raise ValueError("{} was generated with resources={!r}, not "
+                         "{!r}".format(module.__name__, module.RESOURCES,
+                                       resources))
+    return module.CLASSES
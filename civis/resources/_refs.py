@@ -0,0 +1,72 @@
+from collections import OrderedDict
+
+
+class RefResolver:
+    """Resolve JSON references (``$ref``) in a swagger specification.
+
+    Unlike :meth:`jsonref.JsonRef.replace_refs`, which wraps every reference
+    in the whole spec in a proxy object, this only resolves the parts of
+    the spec passed to :meth:`resolve`, and returns plain dicts and lists.
+    Each referenced definition is resolved once and shared by every object
+    that refers to it, so circular references produce circular structures
+    instead of infinite recursion.
+
+    Only local references (e.g. ``#/definitions/Object1``) are supported.
+
+    Parameters
+    ----------
+    spec : dict
+        The raw swagger specification. References are looked up in it.
+    """
+    def __init__(self, spec):
+        self._spec = spec
+        self._memo = {}
+
+    def resolve(self, obj):
+        """Return a copy of `obj` with all references replaced by the
+        objects they point to.
+        """
+        return self._resolve(obj, {})
+
+    def _resolve(self, obj, copies):
+        # `copies` maps the ids of containers already being copied during
+        # this call to their copies, so that circular structures (e.g. a
+        # spec which has already been resolved) are copied only once.
+        if not isinstance(obj, (dict, list)):
+            return obj
+        if id(obj) in copies:
+            return copies[id(obj)]
+        if isinstance(obj, list):
+            copy = copies[id(obj)] = []
+            copy.extend(self._resolve(v, copies) for v in obj)
+            return copy
+        ref = obj.get('$ref')
+        if isinstance(ref, str):
+            return self._resolve_ref(ref, copies)
+        copy = copies[id(obj)] = OrderedDict()
+        for key, value in obj.items():
+            copy[key] = self._resolve(value, copies)
+        return copy
+
+    def _resolve_ref(self, ref, copies):
+        try:
+            return self._memo[ref]
+        except KeyError:
+            pass
+        # References back to this definition from inside it are found
+        # through `copies` while it is being resolved.
+        target = self._lookup(ref)
+        resolved = self._memo[ref] = self._resolve(target, copies)
+        return resolved
+
+    def _lookup(self, ref):
+        if not ref.startswith('#'):
+            raise ValueError("Unable to resolve non-local reference "
+                             "{}".format(ref))
+        node = self._spec
+        for part in ref[1:].split('/'):
+            if not part:
+                continue
+            part = part.replace('~1', '/').replace('~0', '~')
+            node = node[int(part)] if isinstance(node, list) else node[part]
+        return node
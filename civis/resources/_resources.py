@@ -1,20 +1,25 @@
 from collections import OrderedDict
+from collections.abc import Mapping
+import functools
+import hashlib
+import json
 import re
 import textwrap
+import threading
+import time
+import types
 try:
     from inspect import Signature, Parameter
 except ImportError:
     from funcsigs import Signature, Parameter
-try:
-    from functools import lru_cache
-except ImportError:
-    from functools32 import lru_cache
 
-from jsonref import JsonRef
 import requests
 
+from civis import _spec_cache
 from civis.base import Endpoint
-from civis._utils import camel_to_snake, to_camelcase
+from civis.resources._refs import RefResolver
+from civis._utils import (DEFAULT_API_BASE_URL, camel_to_snake,
+                          get_api_base_url, to_camelcase)
 
 
 API_VERSIONS = ["1.0"]
@@ -22,12 +27,26 @@ BASE_RESOURCES_V1 = ["credentials", "databases", "files", "imports",
                      "jobs", "models", "predictions", "queries",
                      "reports", "scripts", "tables", "users"]
 TYPE_MAP = {"array": "list", "object": "dict"}
+CLASS_CACHE_SIZE = 8
+SPEC_MEMO_SIZE = 4
 ITERATOR_PARAM_DESC = (
     "iterator : bool, optional\n"
     "    If True, return a generator to iterate over all responses. Use when\n"
     "    more results than the maximum allowed by limit are needed. When\n"
     "    True, limit and page_num are ignored. Defaults to False.\n")
 
+# Generated classes are shared by every client in the process. They are
+# keyed by the content of the spec rather than by API key, so clients for
+# different users with the same spec don't parse it again.
+_class_cache = OrderedDict()
+_class_cache_lock = threading.Lock()
+_spec_digests = OrderedDict()
+
+# Specs returned by get_swagger_spec, keyed by its arguments, with the time
+# until which each is reused without checking the on-disk spec cache.
+_spec_memo = OrderedDict()
+_spec_memo_lock = threading.Lock()
+
 
 def exclude_resource(path, api_version, resources):
     if api_version == "1.0" and resources == "base":
@@ -213,13 +232,15 @@ def create_method(params, verb, method_name, path, doc):
     path : str
         Endpoint path, possibly including replacement fields
         (i.e. scripts/{id})
-    doc : str
-        Documentation string for the returned function f
+    doc : str or callable
+        Documentation string for the returned function f. If a callable is
+        given, it is called without arguments to build the documentation
+        string the first time the docstring is requested.
 
 
     Returns
     ------
-    f : function
+    f : function or :class:`DeferredDocMethod`
         A function which will make an API call
     """
     elements = split_method_params(params)
@@ -236,16 +257,53 @@ def create_method(params, verb, method_name, path, doc):
         url = path.format(**path_vals) if path_vals else path
         iterator = (arguments.get('iterator', False) and
                     iterable_method(verb, query_params))
-        return self._call_api(verb, url, query, body, iterator=iterator)
+        return self._call_api(verb, url, query, body, iterator=iterator,
+                              path_template=path)
 
     # Add signature to function, including 'self' for class method
     sig_self = create_signature(["self"] + args, kwargs)
     f.__signature__ = sig_self
-    f.__doc__ = doc
     f.__name__ = method_name
+    if callable(doc):
+        return DeferredDocMethod(f, doc)
+    f.__doc__ = doc
     return f
 
 
+class DeferredDocMethod:
+    # Wraps a generated endpoint function whose docstring is built only when
+    # something (``help``, Sphinx, ``inspect``) asks for it. Building the
+    # docstrings of every method accounts for much of the time spent parsing
+    # the API spec, and most programs never read them.
+    #
+    # Instances are non-data descriptors, so they bind to endpoint instances
+    # like regular functions do, and ``inspect`` treats them as routines.
+
+    def __init__(self, func, build_doc):
+        self._func = func
+        self._build_doc = build_doc
+        self._doc = None
+        self.__name__ = func.__name__
+        self.__signature__ = func.__signature__
+
+    @property
+    def __doc__(self):
+        if self._doc is None:
+            self._doc = self._build_doc()
+        return self._doc
+
+    def __call__(self, *args, **kwargs):
+        return self._func(*args, **kwargs)
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return types.MethodType(self, instance)
+
+    def __repr__(self):
+        return "<generated method {}>".format(self.__name__)
+
+
 def bracketed(x):
     return re.search("^{.*}$", x)
 
@@ -294,6 +352,27 @@ def parse_params(parameters, summary, verb):
     return args, docs
 
 
+def parse_args(parameters, verb):
+    """ Parse the parameters of a function specification into the list of
+    dictionaries used by :func:`create_method`, without building any
+    documentation. See :func:`parse_params`.
+    """
+    args = []
+    for param in parameters:
+        if param['in'] == 'body':
+            schema = param['schema']
+            req = schema.get('required', [])
+            for name in schema['properties']:
+                args.append({"name": camel_to_snake(name), "in": "body",
+                             "required": name in req})
+        else:
+            args.append({"name": camel_to_snake(param['name']),
+                         "in": param['in'], "required": param['required']})
+    if iterable_method(verb, (x["name"] for x in args)):
+        args.append({"name": "iterator", "in": None, "required": False})
+    return args
+
+
 def parse_param_body(parameter):
     """ Parse the nested element of a parameter into a list of dictionaries
     which can be used to add the parameter to a dynamically generated
@@ -349,19 +428,29 @@ def parse_method_name(verb, path):
     return re.sub("-", "_", method_name)
 
 
-def parse_method(verb, operation, path):
-    """ Generate a python function from a specification of that function."""
-    summary = operation["summary"]
-    params = operation["parameters"]
-    responses = operation["responses"]
+def is_deprecated(operation):
     deprecated = operation.get('deprecated', False)
-    if 'deprecated' in summary.lower() or deprecated:
+    return 'deprecated' in operation["summary"].lower() or deprecated
+
+
+def method_doc(verb, operation):
+    """ Build the docstring of the function generated from an operation."""
+    _, param_doc = parse_params(operation["parameters"],
+                                operation["summary"], verb)
+    response_doc = doc_from_responses(operation["responses"])
+    return join_doc_elements(param_doc, response_doc)
+
+
+def parse_method(verb, operation, path):
+    """ Generate a python function from a specification of that function.
+    The docstring of the function is built the first time it is requested.
+    """
+    if is_deprecated(operation):
         return None
 
-    args, param_doc = parse_params(params, summary, verb)
-    response_doc = doc_from_responses(responses)
-    docs = join_doc_elements(param_doc, response_doc)
+    args = parse_args(operation["parameters"], verb)
     name = parse_method_name(verb, path)
+    docs = functools.partial(method_doc, verb, operation)
 
     method = create_method(args, verb, name, path, docs)
     return name, method
@@ -386,39 +475,181 @@ def parse_path(path, operations, api_version, resources):
     return class_name, methods
 
 
-def parse_swagger(swagger, api_version, resources):
-    """ Parse a swagger specifiction into a dictionary of classes
-    where each class represents an endpoint resource and contains
-    methods to make http requests on that resource.
+def group_paths(paths, api_version, resources):
+    """ Group the paths of a swagger specification by the resource (i.e. the
+    first path element) they belong to. Resources that would not have any
+    methods, because they are excluded or entirely deprecated, are dropped.
     """
-    paths = swagger['paths']
-    classes = {}
+    groups = OrderedDict()
     for path, ops in paths.items():
+        stripped = path.strip('/')
+        if exclude_resource(stripped, api_version, resources):
+            continue
+        if all(is_deprecated(op) for op in ops.values()):
+            continue
+        class_name = to_camelcase(stripped.split('/')[0])
+        groups.setdefault(class_name.lower(), []).append((path, ops))
+    return groups
+
+
+def parse_resource(paths, api_version, resources, resolver=None,
+                   endpoint_class=Endpoint):
+    """ Parse the paths of a single resource into an endpoint class. Returns
+    None if the resource has no methods. If a :class:`RefResolver` is given,
+    it is used to resolve references in the operations of each path. The
+    class is a subclass of `endpoint_class`.
+    """
+    cls = None
+    for path, ops in paths:
+        if resolver is not None:
+            ops = resolver.resolve(ops)
         class_name, methods = parse_path(path, ops, api_version, resources)
-        class_name_lower = class_name.lower()
-        if methods and classes.get(class_name_lower) is None:
-            classes[class_name_lower] = type(class_name, (Endpoint,), {})
+        if methods and cls is None:
+            cls = type(class_name, (endpoint_class,), {})
         for method_name, method in methods:
-            setattr(classes[class_name_lower], method_name, method)
+            setattr(cls, method_name, method)
+    return cls
+
+
+def parse_swagger(swagger, api_version, resources, endpoint_class=Endpoint):
+    """ Parse a swagger specifiction into a dictionary of classes
+    where each class represents an endpoint resource and contains
+    methods to make http requests on that resource. References in
+    the operations of `swagger` are resolved as they are parsed.
+    The classes are subclasses of `endpoint_class`.
+    """
+    resolver = RefResolver(swagger)
+    groups = group_paths(swagger['paths'], api_version, resources)
+    classes = {}
+    for class_name_lower, paths in groups.items():
+        cls = parse_resource(paths, api_version, resources, resolver,
+                             endpoint_class)
+        if cls is not None:
+            classes[class_name_lower] = cls
     return classes
 
 
-@lru_cache(maxsize=4)
-def get_swagger_spec(api_key, user_agent, api_version):
-    session = requests.Session()
-    session.auth = (api_key, '')
-    session.headers.update({"User-Agent": user_agent.strip()})
-    if api_version == "1.0":
-        response = session.get("https://api.civisanalytics.com/endpoints")
-    else:
+class LazyClasses(Mapping):
+    """ A read-only mapping from resource names to endpoint classes which
+    parses the swagger specification of each resource on first access.
+
+    Looking up a resource costs a single call to :func:`parse_resource`;
+    the resulting class is cached, so every later lookup returns the same
+    class. Only the references used by a resource are resolved.
+    """
+    def __init__(self, swagger, api_version, resources,
+                 endpoint_class=Endpoint):
+        self._api_version = api_version
+        self._endpoint_class = endpoint_class
+        self._resources = resources
+        self._resolver = RefResolver(swagger)
+        self._groups = group_paths(swagger['paths'], api_version, resources)
+        self._classes = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        paths = self._groups[name]
+        with self._lock:
+            if name not in self._classes:
+                self._classes[name] = parse_resource(
+                    paths, self._api_version, self._resources,
+                    self._resolver, self._endpoint_class)
+        return self._classes[name]
+
+    def __iter__(self):
+        return iter(self._groups)
+
+    def __len__(self):
+        return len(self._groups)
+
+
+def get_swagger_spec(api_key, user_agent, api_version,
+                     base_url=DEFAULT_API_BASE_URL):
+    """Return the API spec of the API at `base_url`, using the on-disk spec
+    cache when possible.
+
+    The spec is also kept in memory for the cache TTL, after which the
+    on-disk cache is consulted (and revalidated if stale) again.
+    See :mod:`civis._spec_cache` for how to configure the cache.
+    """
+    if api_version != "1.0":
         msg = "swagger spec for api version {} cannot be found"
         raise ValueError(msg.format(api_version))
-    response.raise_for_status()
-    spec = response.json(object_pairs_hook=OrderedDict)
+
+    key = (api_key, user_agent, api_version, base_url)
+    with _spec_memo_lock:
+        memo = _spec_memo.get(key)
+        if memo is not None and time.time() < memo[1]:
+            return memo[0]
+
+    def fetch(headers):
+        session = requests.Session()
+        session.auth = (api_key, '')
+        session.headers.update({"User-Agent": user_agent.strip()})
+        return session.get(base_url + "endpoints", headers=headers)
+
+    spec = _spec_cache.load_spec(fetch, api_key, api_version,
+                                 base_url=base_url)
+    ttl = _spec_cache.cache_ttl()
+    if ttl > 0:
+        with _spec_memo_lock:
+            _spec_memo[key] = (spec, time.time() + ttl)
+            _spec_memo.move_to_end(key)
+            while len(_spec_memo) > SPEC_MEMO_SIZE:
+                _spec_memo.popitem(last=False)
     return spec
 
 
-def generate_classes(api_key, user_agent, api_version="1.0", resources="base"):
+def spec_digest(spec):
+    """ Return a hash of the content of a swagger specification.
+
+    The digest of the last few spec objects seen is remembered, so hashing
+    the spec returned by the (cached) :func:`get_swagger_spec` is cheap.
+    Specs must therefore not be modified after they are hashed.
+    """
+    with _class_cache_lock:
+        seen = _spec_digests.get(id(spec))
+        if seen is not None and seen[0] is spec:
+            return seen[1]
+    content = json.dumps(spec, separators=(',', ':')).encode('utf-8')
+    digest = hashlib.sha256(content).hexdigest()
+    with _class_cache_lock:
+        # Keep a reference to the spec so that its id can't be reused.
+        _spec_digests[id(spec)] = (spec, digest)
+        while len(_spec_digests) > CLASS_CACHE_SIZE:
+            _spec_digests.popitem(last=False)
+    return digest
+
+
+def cached_classes(raw_swagger, api_version, resources, lazy=False,
+                   endpoint_class=Endpoint):
+    """ Return the endpoint classes for a raw swagger specification.
+
+    Classes are cached for the whole process, keyed by the content of the
+    spec, `api_version`, `resources`, `lazy` and `endpoint_class`, so each
+    spec is only parsed once no matter how many clients are created from it.
+    """
+    key = (spec_digest(raw_swagger), api_version, resources, lazy,
+           endpoint_class)
+    with _class_cache_lock:
+        classes = _class_cache.get(key)
+        if classes is None:
+            if lazy:
+                classes = LazyClasses(raw_swagger, api_version, resources,
+                                      endpoint_class)
+            else:
+                classes = parse_swagger(raw_swagger, api_version, resources,
+                                        endpoint_class)
+            _class_cache[key] = classes
+            while len(_class_cache) > CLASS_CACHE_SIZE:
+                _class_cache.popitem(last=False)
+        else:
+            _class_cache.move_to_end(key)
+    return classes
+
+
+def generate_classes(api_key, user_agent, api_version="1.0", resources="base",
+                     lazy=False, endpoint_class=Endpoint, base_url=None):
     """ Dynamically create classes to interface with the Civis API.
 
     The Civis API documents behavior using an OpenAPI/Swagger specification.
@@ -443,11 +674,26 @@ def generate_classes(api_key, user_agent, api_version="1.0", resources="base"):
         client object.  Set to "all" to include all endpoints available for
         a given user, including those that may be in development and subject
         to breaking changes at a later date.
+    lazy : bool, optional
+        If True, return a :class:`LazyClasses` mapping which only builds the
+        class of a resource when it is first looked up.
+    endpoint_class : type, optional
+        The base class of the generated classes, e.g.
+        :class:`civis.aio.AsyncEndpoint` for coroutine methods.
+    base_url : str, optional
+        Fetch the API specification from the API at this URL. See
+        :class:`civis.APIClient`.
+
+    Notes
+    -----
+    The returned classes are shared with every other caller that uses a
+    spec with the same content. See :func:`cached_classes`.
     """
     assert api_version in API_VERSIONS, (
         "APIClient api_version must be one of {}".format(API_VERSIONS))
     assert resources in ["base", "all"], (
         "resources must be one of {}".format(["base", "all"]))
-    raw_swagger = get_swagger_spec(api_key, user_agent, api_version)
-    swagger = JsonRef.replace_refs(raw_swagger)
-    return parse_swagger(swagger, api_version, resources)
+    raw_swagger = get_swagger_spec(api_key, user_agent, api_version,
+                                   get_api_base_url(base_url))
+    return cached_classes(raw_swagger, api_version, resources, lazy,
+                          endpoint_class)
@@ -12,13 +12,16 @@ class CivisClientError(Exception):
         return self.error_message
 
 
-def _response_to_json(response):
+def _response_to_json(response, json_codec=None):
     """Parse a raw response to a dict.
 
     Parameters
     ----------
     response: requests.Response
         A raw response returned by an API call.
+    json_codec : ``JSONCodec``, optional
+        Decode the response body with this codec instead of
+        :meth:`requests.Response.json`.
 
     Returns
     -------
@@ -31,13 +34,16 @@ def _response_to_json(response):
         If the data in the raw response cannot be parsed.
     """
     try:
-        return response.json()
+        if json_codec is None:
+            return response.json()
+        return json_codec.loads(response.content)
     except ValueError:
         raise CivisClientError("Unable to parse JSON from response",
                                response)
 
 
-def convert_response_data_type(response, headers=None, return_type='snake'):
+def convert_response_data_type(response, headers=None, return_type='snake',
+                               json_codec=None):
     """Convert a raw response into a given type.
 
     Parameters
@@ -51,6 +57,8 @@ def convert_response_data_type(response, headers=None, return_type='snake'):
     return_type : string, {'snake', 'raw', 'pandas'}
         Convert the response to this type. See documentation on
         `civis.APIClient` for details of the return types.
+    json_codec : ``JSONCodec``, optional
+        Decode the body of a `requests.Response` with this codec.
 
     Returns
     -------
@@ -65,7 +73,7 @@ def convert_response_data_type(response, headers=None, return_type='snake'):
 
     if isinstance(response, requests.Response):
         headers = response.headers
-        data = _response_to_json(response)
+        data = _response_to_json(response, json_codec)
     else:
         data = response
 
@@ -84,6 +92,39 @@ def convert_response_data_type(response, headers=None, return_type='snake'):
         return Response(data, headers=headers)
 
 
+# Translations of camelCase keys, shared by all responses. The API uses a
+# limited set of keys, but the table is capped in case it returns arbitrary
+# ones.
+_SNAKE_KEYS = {}
+_MAX_SNAKE_KEYS = 10000
+
+
+def _snake(key):
+    try:
+        return _SNAKE_KEYS[key]
+    except KeyError:
+        pass
+    snake = camel_to_snake(key)
+    if len(_SNAKE_KEYS) < _MAX_SNAKE_KEYS:
+        _SNAKE_KEYS[key] = snake
+    return snake
+
+
+def _wrap(value):
+    """Return `value` as it is presented by a :class:`Response`, or `value`
+    itself if it needs no conversion."""
+    if isinstance(value, dict):
+        if isinstance(value, Response):
+            return value
+        return Response(value, False)
+    if isinstance(value, list):
+        if any(isinstance(o, dict) and not isinstance(o, Response)
+               for o in value):
+            return [Response(o) if isinstance(o, dict) and
+                    not isinstance(o, Response) else o for o in value]
+    return value
+
+
 class Response(dict):
     """Custom Civis response object.
 
@@ -104,6 +145,11 @@ class Response(dict):
     The main features of this class are that it maps camelCase to snake_case
     at the top level of the json object and attaches keys as attributes.
     Nested object keys are not changed.
+
+    Nested objects, and objects in lists, are converted to :class:`Response`
+    objects the first time they are accessed rather than when the response
+    is created, so that large responses are cheap to create when only some
+    of their values are used.
     """
     def __init__(self, json_data, snake_case=True, headers=None):
         self.json_data = json_data
@@ -113,19 +159,94 @@ class Response(dict):
             self.calls_remaining = headers.get('X-RateLimit-Remaining')
             self.rate_limit = headers.get('X-RateLimit-Limit')
 
-        for key, v in json_data.items():
-            if snake_case:
-                key = camel_to_snake(key)
+        if snake_case:
+            dict.__init__(self, zip(map(_snake, json_data),
+                                    json_data.values()))
+        else:
+            dict.__init__(self, json_data)
+        # Keys named like attributes of the response (e.g. "items" or
+        # "headers") are set as instance attributes, which take precedence.
+        if not _ATTRIBUTES.isdisjoint(self):
+            for key in _ATTRIBUTES.intersection(self):
+                self.__dict__[key] = self[key]
+
+    def __getattr__(self, name):
+        # Only called for names which aren't instance or class attributes.
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError("{!r} object has no attribute {!r}".format(
+                type(self).__name__, name)) from None
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        wrapped = _wrap(value)
+        if wrapped is not value:
+            dict.__setitem__(self, key, wrapped)
+        return wrapped
+
+    def _wrap_values(self):
+        for key, value in list(dict.items(self)):
+            wrapped = _wrap(value)
+            if wrapped is not value:
+                dict.__setitem__(self, key, wrapped)
+
+    def __iter__(self):
+        # Overriding __iter__ makes dict(response) and {**response} read
+        # values through __getitem__ instead of the underlying storage.
+        return dict.__iter__(self)
+
+    def __eq__(self, other):
+        self._wrap_values()
+        if isinstance(other, Response):
+            other._wrap_values()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        self._wrap_values()
+        return dict.__repr__(self)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def items(self):
+        self._wrap_values()
+        return dict.items(self)
+
+    def values(self):
+        self._wrap_values()
+        return dict.values(self)
+
+    def copy(self):
+        self._wrap_values()
+        return dict.copy(self)
+
+    def pop(self, key, *default):
+        if key in self:
+            value = self[key]
+            dict.__delitem__(self, key)
+            return value
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        return key, _wrap(value)
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        dict.__setitem__(self, key, default)
+        return default
 
-            if isinstance(v, dict):
-                val = Response(v, False)
-            elif isinstance(v, list):
-                val = [Response(o) if isinstance(o, dict) else o for o in v]
-            else:
-                val = v
 
-            self.update({key: val})
-            self.__dict__.update({key: val})
+_ATTRIBUTES = frozenset(dir(Response)) | {'json_data', 'headers',
+                                          'calls_remaining', 'rate_limit'}
 
 
 class PaginatedResponse:
@@ -141,6 +262,11 @@ class PaginatedResponse:
         be ignored. The given dict is not modified.
     endpoint : `civis.base.Endpoint`
         An endpoint used to make API requests.
+    json_codec : ``JSONCodec``, optional
+        Decode each page with this codec.
+    path_template : str, optional
+        The path of the endpoint in the API specification, reported to
+        request hooks.
 
     Notes
     -----
@@ -154,10 +280,15 @@ class PaginatedResponse:
     >>> for query in queries:
     ...    print(query['id'])
     """
-    def __init__(self, path, initial_params, endpoint):
+    def __init__(self, path, initial_params, endpoint, json_codec=None,
+                 path_template=None):
         self._path = path
         self._params = initial_params.copy()
         self._endpoint = endpoint
+        self._json_codec = json_codec
+        self._request_kwargs = {}
+        if path_template is not None:
+            self._request_kwargs['path_template'] = path_template
 
         # We are paginating through all items, so start at the beginning and
         # let the API determine the limit.
@@ -168,8 +299,9 @@ class PaginatedResponse:
         while True:
             response = self._endpoint._make_request('GET',
                                                     self._path,
-                                                    self._params)
-            page_data = _response_to_json(response)
+                                                    self._params,
+                                                    **self._request_kwargs)
+            page_data = _response_to_json(response, self._json_codec)
             if len(page_data) == 0:
                 return
 
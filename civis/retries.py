@@ -0,0 +1,170 @@
+"""Retrying failed API requests.
+
+:class:`RetryPolicy` retries requests which failed for reasons that are
+likely to be temporary: rate limiting (``429 Too Many Requests``), a busy or
+restarting server (``502``, ``503`` and ``504``), and connection failures.
+Between attempts it waits for the time requested by the ``Retry-After``
+header, or for a random, growing delay ("decorrelated jitter"), so that many
+clients which failed at the same moment don't all retry at the same moment.
+It is enabled with ``civis.APIClient(retry_policy=True)``.
+"""
+import email.utils
+import logging
+import random
+import time
+
+import requests
+
+
+log = logging.getLogger(__name__)
+
+RETRY_CODES = [429, 502, 503, 504]
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE',
+                                'TRACE'])
+DEFAULT_MAX_RETRIES = 6
+DEFAULT_BASE_DELAY = 0.75
+DEFAULT_MAX_DELAY = 60
+DEFAULT_MAX_TOTAL_TIME = 5 * 60
+
+
+def _retry_after(response):
+    """Return the number of seconds to wait from the Retry-After header of
+    `response`, or ``None``."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """Decide whether and when to retry a request, and retry it.
+
+    Responses with a status in `retry_codes` and connection or read errors
+    are retried for idempotent methods (e.g. ``GET``, ``PUT`` and
+    ``DELETE``). ``429 Too Many Requests`` responses and connection timeouts
+    are retried for every method, because the API hasn't processed those
+    requests.
+
+    Parameters
+    ----------
+    max_retries : int, optional
+        The maximum number of times a request is retried.
+    base_delay : float, optional
+        The shortest wait in seconds between attempts. Each wait is chosen
+        at random between `base_delay` and three times the previous wait.
+    max_delay : float, optional
+        The longest wait in seconds between attempts, unless the API asks
+        for a longer wait with the ``Retry-After`` header.
+    max_total_time : float, optional
+        Don't retry if the time since the first attempt, plus the wait
+        before the next attempt, would be longer than this many seconds.
+    retry_codes : list of int, optional
+        The response statuses to retry.
+    """
+    def __init__(self, max_retries=DEFAULT_MAX_RETRIES,
+                 base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY,
+                 max_total_time=DEFAULT_MAX_TOTAL_TIME,
+                 retry_codes=RETRY_CODES):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_total_time = max_total_time
+        self.retry_codes = frozenset(retry_codes)
+
+    def is_retryable(self, method, response=None, error=None,
+                     idempotent=None):
+        """Return whether a request with `method` which got `response` or
+        raised `error` may be retried.
+
+        If `idempotent` is given, it overrides whether `method` is
+        considered idempotent.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        if error is not None:
+            if isinstance(error, requests.exceptions.ConnectTimeout):
+                return True
+            return idempotent and isinstance(
+                error, (requests.ConnectionError, requests.Timeout,
+                        requests.exceptions.ChunkedEncodingError))
+        if response.status_code == 429:
+            return True
+        return idempotent and response.status_code in self.retry_codes
+
+    def next_delay(self, previous=None, response=None):
+        """Return the number of seconds to wait before the next attempt.
+
+        Parameters
+        ----------
+        previous : float, optional
+            The previous wait, if there was one.
+        response : :class:`requests:requests.Response`, optional
+            The response to the last attempt. Its ``Retry-After`` header is
+            honored.
+        """
+        upper = max(self.base_delay, (previous or self.base_delay) * 3)
+        delay = min(self.max_delay, random.uniform(self.base_delay, upper))
+        retry_after = None if response is None else _retry_after(response)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def run(self, method, send, idempotent=None):
+        """Call ``send()`` until it returns a response which shouldn't be
+        retried, or the retries are used up.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method of the request.
+        send : callable
+            Sends the request and returns a
+            :class:`requests:requests.Response`.
+        idempotent : bool, optional
+            Whether the request can safely be made more than once. By
+            default, this depends on `method`.
+
+        Returns
+        -------
+        :class:`requests:requests.Response`
+            The last response, which may be an error response.
+
+        Raises
+        ------
+        :class:`requests:requests.RequestException`
+            If the last attempt raised it.
+        """
+        start = time.monotonic()
+        delay = None
+        for attempt in range(self.max_retries + 1):
+            response, error = None, None
+            try:
+                response = send()
+            except requests.RequestException as e:
+                error = e
+            if (attempt == self.max_retries or
+                    not self.is_retryable(method, response, error,
+                                          idempotent)):
+                break
+            delay = self.next_delay(delay, response)
+            if time.monotonic() - start + delay > self.max_total_time:
+                break
+            log.debug("Retrying %s request in %.2f seconds after %s", method,
+                      delay, error or response.status_code)
+            # Release the connection of the response which won't be read.
+            # Responses without a connection (`raw`) can't be closed before
+            # requests 2.8.
+            if response is not None and response.raw is not None:
+                response.close()
+            time.sleep(delay)
+        if error is not None:
+            raise error
+        return response
@@ -0,0 +1,7 @@
+import sys
+
+collect_ignore = []
+if sys.version_info < (3, 6):
+    # civis.aio uses asynchronous generators, which are syntax errors
+    # before Python 3.6.
+    collect_ignore.append("test_aio.py")
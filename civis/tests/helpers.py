@@ -0,0 +1,110 @@
+"""Helpers shared by the tests in this directory."""
+from collections import OrderedDict
+import contextlib
+import http.server
+import json
+import os
+import socketserver
+import threading
+
+import requests
+
+THIS_DIR = os.path.dirname(os.path.realpath(__file__))
+
+# The API spec used by tests which build clients without network access.
+# Tests must not modify it.
+with open(os.path.join(THIS_DIR, "civis_api_spec.json")) as f:
+    civis_api_spec = json.load(f, object_pairs_hook=OrderedDict)
+
+
+def make_response(status_code=200, body=None, headers=None, request=None):
+    """Return a :class:`requests.Response` which has already been read.
+
+    Parameters
+    ----------
+    status_code : int, optional
+    body : bytes or str, optional
+        The body of the response. By default, ``{"id": 1}`` for successful
+        responses and an error description for error responses.
+    headers : dict, optional
+    request : :class:`requests.PreparedRequest`, optional
+        The request which the response answers.
+    """
+    if body is None:
+        body = (b'{"id": 1}' if status_code < 400 else
+                b'{"errorDescription": "error"}')
+    elif isinstance(body, str):
+        body = body.encode("utf-8")
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response._content = body
+    response._content_consumed = True
+    response.request = request
+    return response
+
+
+class _ThreadingServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+
+class JSONHandler(http.server.BaseHTTPRequestHandler):
+    """Base class of request handlers for :func:`local_server`.
+
+    Subclasses define ``do_GET`` and friends, and answer with
+    :meth:`send_json`. Connections are kept alive between requests.
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def send_json(self, status, body=None, headers=None):
+        """Send a response with `body` encoded as JSON.
+
+        Without a `body` (e.g. for a 304 response), only the status and
+        `headers` are sent.
+        """
+        # Read the request body so that it isn't taken for the start of the
+        # next request on the connection.
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if body is None:
+            self.end_headers()
+            return
+        body = json.dumps(body).encode("utf-8")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextlib.contextmanager
+def local_server(handler):
+    """Serve requests on localhost with `handler` in a background thread.
+
+    Each request is handled in its own thread.
+
+    Parameters
+    ----------
+    handler : type
+        A subclass of :class:`JSONHandler`.
+
+    Yields
+    ------
+    str
+        The base URL of the server, ending in a slash.
+    """
+    server = _ThreadingServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever,
+                              kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield "http://127.0.0.1:{}/".format(server.server_port)
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import sys
+from unittest import mock
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+
+import civis
+from civis.aio import AsyncAPIClient, AsyncEndpoint, _query_params
+from civis.base import CivisAPIError
+from civis.response import Response
+from civis.tests.helpers import JSONHandler, civis_api_spec, local_server
+
+swagger_import_str = 'civis.resources._resources.get_swagger_spec'
+
+
+class FakeResponse:
+    def __init__(self, status, body, reason="OK"):
+        self.status = status
+        self.reason = reason
+        self.headers = {"Content-Type": "application/json",
+                        "X-RateLimit-Remaining": "999"}
+        self.url = "https://api.civisanalytics.com/"
+        self._body = json.dumps(body).encode("utf-8")
+
+    async def read(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+
+class FakeSession:
+    """Stands in for an aiohttp.ClientSession."""
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        params = kwargs.get("params")
+        if params is not None:
+            kwargs = dict(kwargs, params=dict(params))
+        self.requests.append((method, url, kwargs))
+        return self.responses.pop(0)
+
+
+class _QueryHandler(JSONHandler):
+    """Answer with the query parameters of each request."""
+    def do_GET(self):
+        self.send_json(200, dict(parse_qsl(urlsplit(self.path).query)))
+
+
+def _run(coro):
+    # asyncio.run needs Python 3.7.
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def _client(session, **kwargs):
+    with mock.patch(swagger_import_str, return_value=civis_api_spec):
+        return AsyncAPIClient(api_key="key", session=session, **kwargs)
+
+
+def test_methods_return_coroutines():
+    session = FakeSession(FakeResponse(200, {"id": 1, "userName": "me"}))
+    client = _client(session)
+    assert isinstance(client.users, AsyncEndpoint)
+
+    result = _run(client.users.list_me())
+
+    assert isinstance(result, Response)
+    assert result.user_name == "me"
+    assert result.calls_remaining == "999"
+    method, url, kwargs = session.requests[0]
+    assert (method, url) == ("get",
+                             "https://api.civisanalytics.com/users/me")
+    assert kwargs["headers"]["Authorization"] == "Basic a2V5Og=="
+    assert kwargs["headers"]["User-Agent"].startswith("civis-python/")
+
+
+def test_concurrent_calls():
+    session = FakeSession(*[FakeResponse(200, {"id": i}) for i in range(3)])
+    client = _client(session, lazy_resources=True)
+
+    async def main():
+        return await asyncio.gather(*[client.scripts.get(i)
+                                      for i in range(3)])
+
+    results = _run(main())
+    assert sorted(r.id for r in results) == [0, 1, 2]
+    assert len(session.requests) == 3
+
+
+def test_async_pagination():
+    session = FakeSession(FakeResponse(200, [{"id": 1}, {"id": 2}]),
+                          FakeResponse(200, [{"id": 3}]),
+                          FakeResponse(200, []))
+    client = _client(session)
+
+    async def main():
+        return [q.id async for q in client.queries.list(iterator=True,
+                                                        limit=2)]
+
+    assert _run(main()) == [1, 2, 3]
+    pages = [kwargs["params"]["page_num"] for _, _, kwargs in session.requests]
+    assert pages == [1, 2, 3]
+    assert all("limit" not in kwargs["params"]
+               for _, _, kwargs in session.requests)
+
+
+def test_errors_and_raw_responses():
+    session = FakeSession(
+        FakeResponse(404, {"errorDescription": "not found"}, "Not Found"),
+        FakeResponse(200, {"id": 5}))
+    client = _client(session, return_type="raw")
+
+    with pytest.raises(CivisAPIError) as excinfo:
+        _run(client.scripts.get(5))
+    assert excinfo.value.status_code == 404
+    assert excinfo.value.error_message == "not found"
+
+    response = _run(client.scripts.get(5))
+    assert response.json() == {"id": 5}
+
+
+def test_classes_are_cached_separately_from_sync_client():
+    async_client = _client(FakeSession())
+    with mock.patch(swagger_import_str, return_value=civis_api_spec):
+        sync_client = civis.APIClient(api_key="key")
+    assert isinstance(async_client.scripts, AsyncEndpoint)
+    assert not isinstance(sync_client.scripts, AsyncEndpoint)
+    async_name = async_client.scripts.__class__.__name__
+    assert async_name == sync_client.scripts.__class__.__name__
+    if sys.version_info >= (3, 7):
+        assert civis.AsyncAPIClient is AsyncAPIClient
+
+
+@mock.patch.dict("sys.modules", {"aiohttp": None})
+def test_aiohttp_required_without_session():
+    with pytest.raises(ImportError):
+        _client(None)
+
+
+def test_query_params_with_aiohttp():
+    aiohttp = pytest.importorskip("aiohttp")
+
+    async def main(url):
+        async with aiohttp.ClientSession() as session:
+            client = _client(session, base_url=url, resources="all")
+            return [await client.codes.list(featured=True),
+                    await client.codes.list(featured=False, author=None)]
+
+    with local_server(_QueryHandler) as url:
+        featured, not_featured = _run(main(url))
+    assert featured == {"featured": "true"}
+    assert not_featured == {"featured": "false"}
+    query = _query_params({"ids": [1, 2], "hidden": None})
+    assert query == [("ids", 1), ("ids", 2)]
@@ -0,0 +1,53 @@
+import threading
+
+import requests
+
+from civis.base import Endpoint
+from civis.tests.helpers import JSONHandler, local_server
+
+
+N_THREADS = 4
+
+
+class _BarrierHandler(JSONHandler):
+    """Only respond successfully once N_THREADS requests are being
+    handled at the same time."""
+    barrier = None
+
+    def do_GET(self):
+        try:
+            self.barrier.wait(timeout=5)
+            self.send_json(200, {"concurrent": True})
+        except threading.BrokenBarrierError:
+            self.send_json(500, {"errorDescription": "requests serialized"})
+
+
+def test_endpoint_requests_are_concurrent():
+    handler = type("Handler", (_BarrierHandler,),
+                   {"barrier": threading.Barrier(N_THREADS)})
+    session = requests.Session()
+    endpoints = [Endpoint(session, return_type="raw")
+                 for _ in range(N_THREADS)]
+    results, errors = [], []
+
+    def request(endpoint):
+        try:
+            results.append(endpoint._call_api("get", "barrier").json())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=request, args=(endpoint,))
+               for endpoint in endpoints]
+    with local_server(handler) as url:
+        for endpoint in endpoints:
+            endpoint._base_url = url
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=10)
+        finally:
+            session.close()
+
+    assert not errors
+    assert results == [{"concurrent": True}] * N_THREADS
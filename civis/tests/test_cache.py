@@ -0,0 +1,281 @@
+import threading
+from unittest import mock
+
+import pytest
+
+import requests
+
+import civis
+from civis import cache
+from civis.base import Endpoint
+from civis.cache import ETagCache, ResponseCache, SingleFlight
+from civis.tests.helpers import (JSONHandler, civis_api_spec, local_server,
+                                 make_response)
+
+
+def test_get_and_expire():
+    responses = ResponseCache(ttl=10, resource_ttls={"databases": 100})
+    with mock.patch.object(cache.time, "monotonic", return_value=0):
+        responses.set("scripts/1", None, "script")
+        responses.set("databases", {"limit": 5}, "databases")
+        assert responses.get("/scripts/1/") == "script"
+        assert responses.get("databases", {"limit": "5"}) == "databases"
+        assert responses.get("databases") is None
+    with mock.patch.object(cache.time, "monotonic", return_value=50):
+        assert responses.get("scripts/1") is None
+        assert responses.get("databases", {"limit": 5}) == "databases"
+    assert (responses.hits, responses.misses) == (3, 2)
+
+
+def test_resource_ttl_of_zero_disables_caching():
+    responses = ResponseCache(resource_ttls={"jobs": 0})
+    responses.set("jobs/1", None, "job")
+    assert responses.get("jobs/1") is None
+
+
+def test_lru_eviction():
+    responses = ResponseCache(maxsize=2)
+    responses.set("a", None, 1)
+    responses.set("b", None, 2)
+    responses.get("a")
+    responses.set("c", None, 3)
+    assert len(responses) == 2
+    assert responses.get("b") is None
+    assert responses.get("a") == 1
+    assert responses.get("c") == 3
+
+
+def test_invalidate_related_paths():
+    responses = ResponseCache()
+    paths = ["scripts", "scripts/5", "scripts/5/runs", "scripts/6",
+             "scripts/sql", "tables/5"]
+    for path in paths:
+        responses.set(path, None, path)
+    responses.invalidate("scripts/5")
+    assert [p for p in paths if responses.get(p)] == ["scripts/6",
+                                                      "scripts/sql",
+                                                      "tables/5"]
+
+
+def test_endpoint_caches_gets_and_invalidates_on_write():
+    session = mock.Mock()
+    session.request.side_effect = lambda *args, **kwargs: make_response()
+    endpoint = Endpoint(session, return_type="snake",
+                        response_cache=ResponseCache())
+
+    first = endpoint._call_api("get", "scripts/5")
+    second = endpoint._call_api("get", "scripts/5")
+    assert first == second == {"id": 1}
+    assert first is not second
+    assert session.request.call_count == 1
+
+    endpoint._call_api("get", "scripts", params={"limit": 2})
+    endpoint._call_api("get", "scripts", params={"limit": 2})
+    assert session.request.call_count == 2
+
+    endpoint._call_api("patch", "scripts/5", data={"name": "x"})
+    assert session.request.call_count == 3
+    endpoint._call_api("get", "scripts/5")
+    endpoint._call_api("get", "scripts", params={"limit": 2})
+    assert session.request.call_count == 5
+
+
+@mock.patch('civis.resources._resources.get_swagger_spec',
+            return_value=civis_api_spec)
+def test_client_response_cache_option(mock_spec):
+    client = civis.APIClient(api_key='key', response_cache=True)
+    assert isinstance(client.scripts._response_cache, ResponseCache)
+    assert client.scripts._response_cache is client.tables._response_cache
+    assert civis.APIClient(api_key='key').scripts._response_cache is None
+
+
+def _run_in_threads(n, func):
+    results = [None] * n
+
+    def target(i):
+        try:
+            results[i] = func()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def _count_followers():
+    """Patch :class:`SingleFlight` to release the returned semaphore each
+    time a caller starts waiting for a call in progress."""
+    waiting = threading.Semaphore(0)
+
+    class Event(threading.Event):
+        def wait(self, timeout=None):
+            waiting.release()
+            return super().wait(timeout)
+
+    class Call(cache._Call):
+        def __init__(self):
+            super().__init__()
+            self.done = Event()
+
+    return mock.patch.object(cache, "_Call", Call), waiting
+
+
+def _wait_for(semaphore, n):
+    for _ in range(n):
+        assert semaphore.acquire(timeout=5)
+
+
+def test_single_flight_shares_result_and_exception():
+    flights = SingleFlight()
+    patch, waiting = _count_followers()
+    calls = []
+
+    def slow(value, followers):
+        def func():
+            # Only return once every other caller is waiting for this call.
+            calls.append(value)
+            _wait_for(waiting, followers)
+            if isinstance(value, Exception):
+                raise value
+            return value
+        return func
+
+    with patch:
+        threads, results = _run_in_threads(
+            5, lambda: flights.do("a", slow(1, 4)))
+        for thread in threads:
+            thread.join()
+        assert results == [1] * 5
+        assert calls == [1]
+
+        error = ValueError("boom")
+        threads, results = _run_in_threads(
+            3, lambda: flights.do("a", slow(error, 2)))
+        for thread in threads:
+            thread.join()
+    assert results == [error] * 3
+    assert flights._calls == {}
+
+    # Calls which start after the previous one finished make a new call.
+    assert flights.do("a", lambda: 2) == 2
+    with pytest.raises(KeyError):
+        flights.do("b", mock.Mock(side_effect=KeyError))
+
+
+def test_endpoint_coalesces_identical_gets():
+    patch, waiting = _count_followers()
+
+    def request(method, url, params=None, **kwargs):
+        # Wait for the other three requests for {"a": 1} to share this one.
+        _wait_for(waiting, 3 if params == {"a": 1} else 0)
+        return make_response()
+
+    session = mock.Mock()
+    session.request.side_effect = request
+    endpoint = Endpoint(session, return_type="snake",
+                        single_flight=SingleFlight())
+
+    with patch:
+        threads, results = _run_in_threads(
+            4, lambda: endpoint._call_api("get", "scripts/5",
+                                          params={"a": 1}))
+        other_threads, other_results = _run_in_threads(
+            1, lambda: endpoint._call_api("get", "scripts/5",
+                                          params={"a": 2}))
+        for thread in threads + other_threads:
+            thread.join()
+    assert results + other_results == [{"id": 1}] * 5
+    assert len(set(map(id, results))) == 4
+    assert session.request.call_count == 2
+
+    # Writes are never coalesced.
+    endpoint._call_api("post", "scripts", data={})
+    endpoint._call_api("post", "scripts", data={})
+    assert session.request.call_count == 4
+
+
+@mock.patch('civis.resources._resources.get_swagger_spec',
+            return_value=civis_api_spec)
+def test_client_coalesce_requests_option(mock_spec):
+    client = civis.APIClient(api_key='key', coalesce_requests=True)
+    assert isinstance(client.scripts._single_flight, SingleFlight)
+    assert client.scripts._single_flight is client.tables._single_flight
+    assert civis.APIClient(api_key='key').scripts._single_flight is None
+
+
+class _ETagHandler(JSONHandler):
+    """Serve a script whose version is its ETag, and record the status of
+    each response."""
+    version = "1"
+    statuses = None
+
+    def do_GET(self):
+        etag = '"{}"'.format(self.version)
+        if self.headers.get("If-None-Match") == etag:
+            self.statuses.append(304)
+            self.send_json(304, headers={"ETag": etag,
+                                         "X-RateLimit-Remaining": "9"})
+            return
+        self.statuses.append(200)
+        self.send_json(200, {"id": 5, "version": self.version},
+                       headers={"ETag": etag, "X-RateLimit-Remaining": "10"})
+
+
+def test_endpoint_makes_conditional_gets():
+    handler = type("Handler", (_ETagHandler,), {"statuses": []})
+    session = requests.Session()
+    etags = ETagCache()
+    endpoint = Endpoint(session, return_type="snake", etag_cache=etags)
+    with local_server(handler) as url:
+        endpoint._base_url = url
+        try:
+            first = endpoint._call_api("get", "scripts/5")
+            second = endpoint._call_api("get", "scripts/5")
+            handler.version = "2"
+            third = endpoint._call_api("get", "scripts/5")
+        finally:
+            session.close()
+
+    assert handler.statuses == [200, 304, 200]
+    assert first == second == {"id": 5, "version": "1"}
+    assert first is not second
+    assert (first.calls_remaining, second.calls_remaining) == ("10", "9")
+    assert third == {"id": 5, "version": "2"}
+    assert (etags.hits, etags.misses) == (1, 2)
+
+
+def test_etag_cache_only_stores_validated_responses():
+    etags = ETagCache(maxsize=1)
+    plain = make_response()
+    assert etags.update("scripts/1", None, plain) is plain
+    assert etags.headers("scripts/1") == {}
+
+    tagged = make_response()
+    tagged.headers["ETag"] = '"a"'
+    tagged.headers["Last-Modified"] = "Tue, 01 Sep 2026 00:00:00 GMT"
+    etags.update("scripts/1", None, tagged)
+    assert etags.headers("/scripts/1/") == {
+        "If-None-Match": '"a"',
+        "If-Modified-Since": "Tue, 01 Sep 2026 00:00:00 GMT"}
+
+    other = make_response()
+    other.headers["ETag"] = '"b"'
+    etags.update("scripts/2", None, other)
+    assert len(etags) == 1
+    assert etags.headers("scripts/1") == {}
+
+    # A 304 without a stored response is passed on as it is.
+    not_modified = make_response(body=b"")
+    not_modified.status_code = 304
+    assert etags.update("scripts/1", None, not_modified) is not_modified
+
+
+@mock.patch('civis.resources._resources.get_swagger_spec',
+            return_value=civis_api_spec)
+def test_client_etag_cache_option(mock_spec):
+    client = civis.APIClient(api_key='key', etag_cache=True)
+    assert isinstance(client.scripts._etag_cache, ETagCache)
+    assert client.scripts._etag_cache is client.tables._etag_cache
+    assert civis.APIClient(api_key='key').scripts._etag_cache is None
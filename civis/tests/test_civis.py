@@ -0,0 +1,120 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+import requests
+
+import civis
+from civis.tests.helpers import civis_api_spec
+
+swagger_import_str = 'civis.resources._resources.get_swagger_spec'
+
+
+@mock.patch(swagger_import_str, return_value=civis_api_spec)
+def test_lazy_resources(mock_spec):
+    client = civis.APIClient(api_key='key', lazy_resources=True)
+    assert 'scripts' not in vars(client)
+    assert 'scripts' in dir(client)
+
+    scripts = client.scripts
+    assert isinstance(scripts, civis.base.Endpoint)
+    assert client.scripts is scripts
+    assert 'scripts' in vars(client)
+    assert hasattr(scripts, 'get_sql_runs')
+
+    with pytest.raises(AttributeError):
+        client.not_a_resource
+
+
+@mock.patch(swagger_import_str, return_value=civis_api_spec)
+def test_lazy_resources_match_eager(mock_spec):
+    eager = civis.APIClient(api_key='key')
+    lazy = civis.APIClient(api_key='key', lazy_resources=True)
+    eager_resources = {k for k, v in vars(eager).items()
+                       if isinstance(v, civis.base.Endpoint)}
+    for name in eager_resources:
+        lazy_name = getattr(lazy, name).__class__.__name__
+        assert lazy_name == getattr(eager, name).__class__.__name__
+    assert set(lazy._lazy_classes) == eager_resources
+
+
+@mock.patch(swagger_import_str, return_value=civis_api_spec)
+def test_connection_pool_options(mock_spec):
+    client = civis.APIClient(api_key='key', pool_connections=2,
+                             pool_maxsize=32, pool_block=True)
+    adapter = client._session.get_adapter('https://api.civisanalytics.com')
+    assert isinstance(adapter, requests.adapters.HTTPAdapter)
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 32
+    assert adapter._pool_block is True
+
+
+@mock.patch(swagger_import_str, return_value=civis_api_spec)
+def test_custom_adapter_and_session(mock_spec):
+    adapter = requests.adapters.HTTPAdapter()
+    client = civis.APIClient(api_key='key', adapter=adapter)
+    assert client._session.get_adapter('https://api.civisanalytics.com') \
+        is adapter
+
+    session = requests.Session()
+    default_adapter = session.get_adapter('https://api.civisanalytics.com')
+    client = civis.APIClient(api_key='key', session=session)
+    assert client._session is session
+    assert session.auth == ('key', '')
+    assert session.headers['User-Agent'].startswith('civis-python/')
+    assert session.get_adapter('https://api.civisanalytics.com') \
+        is default_adapter
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+@mock.patch(swagger_import_str, return_value=civis_api_spec)
+def test_timeout(mock_spec, lazy):
+    session = mock.Mock(spec=requests.Session, headers={})
+    session.request.return_value.status_code = 204
+    client = civis.APIClient(api_key='key', session=session,
+                             return_type='raw', timeout=(3.05, 27),
+                             lazy_resources=lazy)
+    client.users.list_me()
+    assert session.request.call_args[1]['timeout'] == (3.05, 27)
+
+
+@mock.patch(swagger_import_str, return_value=civis_api_spec)
+def test_batch(mock_spec):
+    client = civis.APIClient(api_key='key', lazy_resources=True)
+    lock = threading.Lock()
+    in_flight = []
+    max_in_flight = []
+
+    def get(i, delay=0):
+        with lock:
+            in_flight.append(i)
+            max_in_flight.append(len(in_flight))
+        time.sleep(delay)
+        with lock:
+            in_flight.remove(i)
+        if i == 3:
+            raise ValueError(i)
+        return i * 10
+
+    calls = [(get, (i,), {'delay': 0.05 - i * 0.005}) for i in range(8)]
+    calls.append(lambda: 'last')
+    results = client.batch(calls, max_workers=4)
+
+    assert results[:3] == [0, 10, 20]
+    assert isinstance(results[3], ValueError)
+    assert results[4:] == [40, 50, 60, 70, 'last']
+    assert max(max_in_flight) == 4
+
+    with pytest.raises(ValueError):
+        client.batch(calls, return_exceptions=False)
+    assert client.batch([]) == []
+    with pytest.raises(TypeError):
+        client.batch([(1, 2)])
+
+
+@mock.patch(swagger_import_str, return_value=civis_api_spec)
+def test_json_codec(mock_spec):
+    client = civis.APIClient(api_key='key', json_codec='json')
+    assert client.scripts._json_codec.name == 'json'
+    assert civis.APIClient(api_key='key').scripts._json_codec is None
@@ -12,7 +12,7 @@ CIVIS_RESOURCES = [
     'exports', 'files', 'groups', 'imports', 'jobs', 'match-targets',
     'models', 'notifications', 'ontology', 'predictions', 'projects',
     'queries', 'remote-hosts', 'results', 'reports', 'scripts', 'surveys',
-    'tables', 'templates', 'users', 'civis'
+    'tables', 'templates', 'users', 'civis', 'generate-endpoints'
 ]
 
 
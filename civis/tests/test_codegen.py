@@ -0,0 +1,80 @@
+from importlib.machinery import SourceFileLoader
+import inspect
+import types
+from unittest import mock
+
+import pytest
+
+import civis
+from civis.resources import _codegen, _resources
+from civis.tests.helpers import civis_api_spec
+
+swagger_import_str = 'civis.resources._resources.get_swagger_spec'
+
+
+def _import_generated(tmpdir, resources="all"):
+    path = str(tmpdir.join("civis_endpoints.py"))
+    with open(path, "w") as f:
+        f.write(_codegen.generate_module(civis_api_spec, "1.0", resources))
+    # importlib.util.module_from_spec needs Python 3.5, and load_module is
+    # deprecated, so execute the module in a new module object.
+    module = types.ModuleType("civis_endpoints")
+    module.__file__ = path
+    SourceFileLoader("civis_endpoints", path).exec_module(module)
+    return module
+
+
+def _fake_args(method):
+    sig = inspect.signature(method)
+    return ["{}-value".format(name) for name in sig.parameters
+            if name not in ("self", "kwargs")]
+
+
+def test_generated_module_matches_dynamic_classes(tmpdir):
+    module = _import_generated(tmpdir)
+    dynamic = _resources.cached_classes(civis_api_spec, "1.0", "all")
+    assert module.CLASSES.keys() == dynamic.keys()
+    assert module.SPEC_DIGEST == _resources.spec_digest(civis_api_spec)
+
+    for resource, cls in dynamic.items():
+        generated = module.CLASSES[resource]
+        assert issubclass(generated, civis.base.Endpoint)
+        names = {k for k in vars(cls) if not k.startswith('_')}
+        assert {k for k in vars(generated) if not k.startswith('_')} == names
+        for name in names:
+            method = getattr(cls, name)
+            gen_method = getattr(generated, name)
+            assert inspect.signature(gen_method) == inspect.signature(method)
+            assert inspect.getdoc(gen_method) == inspect.getdoc(method)
+
+            args = _fake_args(method)
+            kwargs = {'iterator': True, 'limit': 2, 'not_a_param': 1}
+            if 'kwargs' not in inspect.signature(method).parameters:
+                kwargs = {}
+            expected, actual = mock.MagicMock(), mock.MagicMock()
+            method(expected, *args, **kwargs)
+            gen_method(actual, *args, **kwargs)
+            assert (actual._call_api.call_args ==
+                    expected._call_api.call_args)
+
+
+@mock.patch(swagger_import_str, return_value=civis_api_spec)
+def test_client_from_endpoints_module(mock_spec, tmpdir):
+    module = _import_generated(tmpdir, "base")
+    client = civis.APIClient(api_key="key", endpoints_module=module)
+    mock_spec.assert_not_called()
+    assert isinstance(client.scripts, module.Scripts)
+
+    with pytest.raises(ValueError):
+        civis.APIClient(api_key="key", endpoints_module=module,
+                        api_version="2.0")
+
+
+@mock.patch(swagger_import_str, return_value=civis_api_spec)
+def test_write_endpoints_module(mock_spec, tmpdir):
+    path = str(tmpdir.join("endpoints.py"))
+    _codegen.write_endpoints_module(path, api_key="key", resources="base")
+    with open(path) as f:
+        source = f.read()
+    assert source == _codegen.generate_module(civis_api_spec, "1.0", "base")
+    compile(source, path, "exec")
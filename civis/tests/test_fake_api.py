@@ -0,0 +1,118 @@
+import io
+import time
+
+import pytest
+import requests
+
+import civis
+from civis._utils import DEFAULT_API_BASE_URL, get_api_base_url
+from civis.base import CivisAPIError
+from civis.fake_api import DEFAULT_QUERY_RESULT, FakeCivisAPI
+
+
+@pytest.fixture
+def server(tmpdir, monkeypatch):
+    monkeypatch.setenv("CIVIS_API_SPEC_CACHE", str(tmpdir.join("spec.json")))
+    with FakeCivisAPI(job_duration=0.05, page_size=5) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    return civis.APIClient(api_key="fake", base_url=server.url)
+
+
+def _wait_for_run(get, *args):
+    deadline = time.monotonic() + 5
+    run = get(*args)
+    while run.state == "running" and time.monotonic() < deadline:
+        time.sleep(0.01)
+        run = get(*args)
+    return run
+
+
+def test_get_api_base_url(monkeypatch):
+    monkeypatch.delenv("CIVIS_API_ENDPOINT", raising=False)
+    assert get_api_base_url() == DEFAULT_API_BASE_URL
+    monkeypatch.setenv("CIVIS_API_ENDPOINT", "http://localhost:8080")
+    assert get_api_base_url() == "http://localhost:8080/"
+    assert get_api_base_url("http://other/") == "http://other/"
+
+
+def test_client_uses_base_url(server, client, tmpdir):
+    assert client.users.list_me().username == "fake-user"
+    assert client.get_database_id("fake-db") == 1
+    assert client.default_credential == 2
+    with pytest.raises(CivisAPIError) as excinfo:
+        client.scripts.get_sql(12345)
+    assert excinfo.value.status_code == 404
+
+    # The spec of an API on the local machine isn't cached.
+    assert tmpdir.listdir() == []
+
+
+def test_file_round_trip(client):
+    contents = b"\x00\xffsome\r\nbinary data"
+    file_id = civis.io.file_to_civis(io.BytesIO(contents), "name",
+                                     client=client)
+    buf = io.BytesIO()
+    civis.io.civis_to_file(file_id, buf, client=client)
+    assert buf.getvalue() == contents
+
+
+def test_sql_runs_finish(client):
+    script = client.scripts.post_sql("query", remote_host_id=1,
+                                     credential_id=2, sql="select 1")
+    run = client.scripts.post_sql_runs(script.id)
+    assert (run.state, run.sql_id) == ("running", script.id)
+
+    run = _wait_for_run(client.scripts.get_sql_runs, script.id, run.id)
+    assert run.state == "succeeded"
+    assert run.finished_at is not None
+    response = requests.get(run.output[0]["path"])
+    assert response.content == DEFAULT_QUERY_RESULT
+
+
+def test_import_runs_can_fail(server, client):
+    server.final_state = "failed"
+    job = client.imports.post_files(schema="s", name="t", remote_host_id=1,
+                                    credential_id=2)
+    assert requests.put(job.upload_uri, data=b"a,b\n").ok
+    response = client._session.post(job.run_uri)
+    assert response.status_code == 202
+    run_id = response.json()["id"]
+
+    run = _wait_for_run(client.imports.get_files_runs, job.id, run_id)
+    assert (run.state, run.import_id) == ("failed", job.id)
+    assert server.storage["imports/{}".format(job.id)] == b"a,b\n"
+
+
+def test_lists_are_paginated(server, client):
+    for i in range(12):
+        server.add("tables", {"name": "table_{}".format(i)})
+    tables = list(client.tables.list(iterator=True))
+    assert [t.name for t in tables] == ["table_{}".format(i)
+                                        for i in range(12)]
+
+    response = requests.get(server.url + "tables?page_num=3",
+                            auth=("fake", ""))
+    assert len(response.json()) == 2
+    assert response.headers["X-Pagination-Total-Pages"] == "3"
+    assert response.headers["X-Pagination-Total-Entries"] == "12"
+
+
+def test_authentication_and_rate_limits(server):
+    server.rate_limit = 2
+    url = server.url + "users/me"
+    response = requests.get(url)
+    assert response.status_code == 401
+
+    response = requests.get(url, auth=("fake", ""))
+    assert response.ok
+    assert response.headers["X-RateLimit-Limit"] == "2"
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+
+    response = requests.get(url, auth=("fake", ""))
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert server.requests == 3
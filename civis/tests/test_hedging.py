@@ -0,0 +1,131 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+import requests
+
+import civis
+from civis import ratelimit
+from civis.base import Endpoint
+from civis.hedging import HedgingPolicy
+from civis.tests.helpers import civis_api_spec, make_response
+
+
+def test_delay_is_percentile_of_recent_latencies():
+    policy = HedgingPolicy(percentile=90, min_delay=0.01, initial_delay=2,
+                           window=100)
+    assert policy.delay() == 2
+    for latency in range(1, 201):
+        policy.record(latency / 1000)
+    # Only the last 100 latencies (0.101 to 0.200) are kept.
+    assert policy.delay() == pytest.approx(0.191)
+
+    policy = HedgingPolicy(min_delay=0.5)
+    for _ in range(20):
+        policy.record(0.001)
+    assert policy.delay() == 0.5
+
+    with pytest.raises(ValueError):
+        HedgingPolicy(percentile=0)
+
+
+def test_slow_request_is_hedged():
+    policy = HedgingPolicy(budget=1, initial_delay=0.01)
+    release = threading.Event()
+    calls = []
+
+    def send():
+        calls.append(threading.current_thread().name)
+        if len(calls) == 1:
+            release.wait(5)
+            return "slow"
+        return "fast"
+
+    try:
+        assert policy.send(send) == "fast"
+    finally:
+        release.set()
+    assert len(calls) == 2
+    assert (policy.hedged, policy.hedge_wins) == (1, 1)
+
+
+def test_fast_requests_and_errors_are_not_hedged():
+    policy = HedgingPolicy(budget=1, initial_delay=5)
+    send = mock.Mock(return_value="response")
+    assert policy.send(send) == "response"
+    with pytest.raises(requests.ConnectionError):
+        policy.send(mock.Mock(side_effect=requests.ConnectionError))
+    assert send.call_count == 1
+    assert policy.hedged == 0
+
+
+def test_hedged_requests_are_not_queued():
+    # Every request is in flight at once, however many threads send them,
+    # so none of them waits long enough to be hedged.
+    n_threads = 64
+    policy = HedgingPolicy(budget=1, initial_delay=2)
+    barrier = threading.Barrier(n_threads)
+
+    def send():
+        barrier.wait(5)
+        return "response"
+
+    threads = [threading.Thread(target=policy.send, args=(send,))
+               for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not barrier.broken
+    assert policy.hedged == 0
+
+
+def test_hedges_are_limited_by_budget():
+    policy = HedgingPolicy(budget=0.5, initial_delay=0.001)
+    send = mock.Mock(side_effect=lambda: time.sleep(0.05) or "response")
+    for _ in range(4):
+        policy.send(send)
+    # Every second request earns enough budget for a hedge.
+    assert policy.hedged == 2
+    assert send.call_count == 6
+
+
+def test_hedges_keep_background_context():
+    policy = HedgingPolicy(budget=1, initial_delay=0.01)
+    hedged = threading.Event()
+    contexts = []
+
+    def send():
+        contexts.append(ratelimit._is_background())
+        if len(contexts) == 1:
+            hedged.wait(5)
+        hedged.set()
+        return "response"
+
+    with ratelimit.background():
+        policy.send(send)
+    assert contexts == [True, True]
+
+
+def test_endpoint_only_hedges_gets():
+    policy = mock.Mock()
+    policy.send.side_effect = lambda send: send()
+    session = mock.Mock()
+    session.request.side_effect = lambda *args, **kwargs: make_response()
+    endpoint = Endpoint(session, return_type="raw", hedging_policy=policy)
+
+    endpoint._call_api("get", "scripts/5", params={"a": 1})
+    endpoint._call_api("post", "scripts", data={})
+    assert policy.send.call_count == 1
+    assert session.request.call_count == 2
+    assert session.request.call_args_list[0][1]["params"] == {"a": 1}
+
+
+@mock.patch('civis.resources._resources.get_swagger_spec',
+            return_value=civis_api_spec)
+def test_client_hedging_option(mock_spec):
+    client = civis.APIClient(api_key='key', hedging=True)
+    assert isinstance(client.scripts._hedging_policy, HedgingPolicy)
+    assert client.scripts._hedging_policy is client.tables._hedging_policy
+    assert civis.APIClient(api_key='key').scripts._hedging_policy is None
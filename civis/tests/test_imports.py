@@ -0,0 +1,59 @@
+import subprocess
+import sys
+
+import pytest
+
+import civis
+
+
+def _imported_modules(statement):
+    """Return the modules imported by running `statement` in a new
+    interpreter."""
+    output = subprocess.check_output(
+        [sys.executable, "-c",
+         statement + "; import sys; print('\\n'.join(sys.modules))"],
+        universal_newlines=True)
+    return set(output.split())
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7),
+                    reason="lazy imports need module __getattr__")
+def test_import_civis_is_cheap():
+    modules = _imported_modules("import civis")
+    assert "civis" in modules
+    for heavy in ["requests", "pandas", "civis.civis", "civis.io",
+                  "civis.resources"]:
+        assert heavy not in modules
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7),
+                    reason="lazy imports need module __getattr__")
+def test_import_civis_io_does_not_import_pandas():
+    modules = _imported_modules("import civis.io")
+    assert "civis.io._tables" in modules
+    assert "pandas" not in modules
+    assert "civis.resources" not in modules
+
+
+def test_lazy_attributes():
+    from civis import APIClient
+    from civis.civis import find
+
+    assert civis.APIClient is APIClient
+    assert civis.find is find
+    assert civis.io.read_civis is not None
+    assert {"APIClient", "find", "find_one", "io"} <= set(dir(civis))
+    with pytest.raises(AttributeError):
+        civis.not_an_attribute
+
+
+def test_submodules_are_attributes():
+    # In a new interpreter, so that the submodules haven't been imported by
+    # other tests.
+    statement = ("import civis; "
+                 "civis.base.CivisAPIError; civis.response.Response; "
+                 "civis.polling.PollableResult; civis.resources; "
+                 "civis.civis.APIClient")
+    subprocess.check_call([sys.executable, "-c", statement])
+    with pytest.raises(AttributeError):
+        civis.not_a_submodule
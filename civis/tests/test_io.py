@@ -1,6 +1,4 @@
-from collections import OrderedDict
 from io import StringIO, BytesIO
-import json
 import os
 import tempfile
 from unittest.mock import patch
@@ -15,14 +13,12 @@ except ImportError:
     has_pandas = False
 
 import civis
+from civis.tests.helpers import civis_api_spec
 from civis.tests.testcase import (CivisVCRTestCase,
                                   cassette_dir,
                                   conditionally_patch)
 
 swagger_import_str = 'civis.resources._resources.get_swagger_spec'
-THIS_DIR = os.path.dirname(os.path.realpath(__file__))
-with open(os.path.join(THIS_DIR, "civis_api_spec.json")) as f:
-    civis_api_spec = json.load(f, object_pairs_hook=OrderedDict)
 
 
 @conditionally_patch('civis.polling.time.sleep', return_value=None)
@@ -75,7 +71,8 @@ class ImportTests(CivisVCRTestCase):
 
     @patch(swagger_import_str, return_value=civis_api_spec)
     def test_get_url_from_file_id(self, *mocks):
-        url = civis.io._files._get_url_from_file_id(self.file_id)
+        client = civis.APIClient()
+        url = civis.io._files._get_url_from_file_id(self.file_id, client)
         assert url.startswith('https://civis-console.s3.amazonaws.com/files/')
 
     @patch(swagger_import_str, return_value=civis_api_spec)
@@ -0,0 +1,66 @@
+from io import BytesIO
+from unittest import mock
+
+import pytest
+
+import civis
+from civis.io import _clients
+
+
+@pytest.fixture
+def shared_clients():
+    civis.io.share_clients()
+    yield
+    civis.io.share_clients(False)
+
+
+@mock.patch.object(_clients, "APIClient")
+def test_get_client_creates_new_clients_by_default(mock_client):
+    assert _clients._get_client("key") is mock_client.return_value
+    assert _clients._get_client("key") is mock_client.return_value
+    assert mock_client.call_count == 2
+    mock_client.assert_called_with(api_key="key")
+
+
+@mock.patch.object(_clients, "APIClient")
+def test_get_client_prefers_given_client(mock_client):
+    client = mock.Mock()
+    assert _clients._get_client(None, client) is client
+    assert not mock_client.called
+    with pytest.raises(ValueError):
+        _clients._get_client("key", client)
+
+
+@mock.patch.object(_clients, "APIClient",
+                   side_effect=lambda api_key: mock.Mock(api_key=api_key))
+def test_share_clients_one_client_per_key(mock_client, shared_clients):
+    client = _clients._get_client("key")
+    assert _clients._get_client("key") is client
+    assert _clients._get_client("other key").api_key == "other key"
+    assert mock_client.call_count == 2
+
+    civis.io.share_clients(False)
+    assert _clients._get_client("key") is not client
+
+
+@mock.patch.dict("os.environ", {"CIVIS_API_KEY": "env key"})
+@mock.patch.object(_clients, "APIClient",
+                   side_effect=lambda api_key: mock.Mock(api_key=api_key))
+def test_share_clients_uses_environment_key(mock_client, shared_clients):
+    assert _clients._get_client() is _clients._get_client("env key")
+    assert mock_client.call_count == 1
+
+
+@mock.patch.object(_clients, "APIClient")
+@mock.patch("civis.io._files._transfer")
+def test_civis_to_file_uses_one_client(mock_transfer, mock_client):
+    mock_transfer.return_value.iter_content.return_value = [b"abc"]
+    client = mock.Mock()
+    client.files.get.return_value.file_url = "https://example.com/file"
+    buf = BytesIO()
+
+    civis.io.civis_to_file(123, buf, client=client)
+
+    assert buf.getvalue() == b"abc"
+    client.files.get.assert_called_once_with(123)
+    assert not mock_client.called
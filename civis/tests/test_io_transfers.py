@@ -0,0 +1,81 @@
+from io import BytesIO
+from unittest import mock
+
+import pytest
+import requests
+
+import civis
+from civis import retries
+from civis.io import _transfers
+from civis.retries import RetryPolicy
+from civis.tests.helpers import make_response
+
+
+@pytest.fixture
+def session():
+    session = mock.Mock()
+    civis.io.configure_transfers(session=session, timeout=5)
+    yield session
+    _transfers._settings.clear()
+
+
+def test_default_session_is_shared_and_pooled():
+    _transfers._settings.clear()
+    try:
+        session, timeout, policy = _transfers._get_settings()
+        assert _transfers._get_settings()[0] is session
+        assert timeout is None
+        assert isinstance(policy, RetryPolicy)
+        adapter = session.get_adapter("https://bucket.s3.amazonaws.com")
+        assert adapter._pool_maxsize == _transfers.DEFAULT_POOL_MAXSIZE
+        assert session.headers["User-Agent"].startswith("civis-python/")
+
+        civis.io.configure_transfers(pool_maxsize=32, retry_policy=False)
+        new_session, _, policy = _transfers._get_settings()
+        assert new_session is not session
+        assert policy is None
+        adapter = new_session.get_adapter("https://bucket.s3.amazonaws.com")
+        assert adapter._pool_maxsize == 32
+    finally:
+        _transfers._settings.clear()
+
+
+@mock.patch.object(retries.time, "sleep")
+def test_retried_upload_is_rewound(mock_sleep, session):
+    bodies = []
+
+    def request(method, url, data=None, timeout=None):
+        bodies.append(data.read())
+        return make_response(503 if len(bodies) == 1 else 200, body=b"")
+
+    session.request.side_effect = request
+    buf = BytesIO(b"header\nrow\n")
+    buf.readline()
+    response = _transfers._transfer("POST", "https://upload", data=buf)
+    assert response.status_code == 200
+    assert bodies == [b"row\n", b"row\n"]
+    assert session.request.call_args[1]["timeout"] == 5
+
+
+def test_unseekable_upload_is_not_retried(session):
+    body = mock.Mock(spec=["read"])
+    session.request.return_value = make_response(503, body=b"")
+    response = _transfers._transfer("PUT", "https://upload", data=body)
+    assert response.status_code == 503
+    assert session.request.call_count == 1
+
+
+@mock.patch.object(retries.time, "sleep")
+def test_download_uses_transfer_session(mock_sleep, session):
+    response = make_response(200, body=b"")
+    response.iter_content = mock.Mock(return_value=[b"abc"])
+    session.request.side_effect = [requests.ConnectionError(), response]
+    client = mock.Mock()
+    client.files.get.return_value.file_url = "https://download"
+    buf = BytesIO()
+
+    civis.io.civis_to_file(123, buf, client=client)
+
+    assert buf.getvalue() == b"abc"
+    session.request.assert_called_with("GET", "https://download",
+                                       stream=True, timeout=5)
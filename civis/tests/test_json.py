@@ -0,0 +1,82 @@
+import json
+import sys
+import types
+from unittest import mock
+
+import pytest
+
+from civis import _json
+from civis.base import Endpoint
+from civis.response import PaginatedResponse, _response_to_json
+from civis.tests.helpers import make_response
+
+
+def test_get_codec():
+    codec = _json.get_codec("json")
+    assert codec.loads(b'{"a": [1, 2]}') == {"a": [1, 2]}
+    assert json.loads(codec.dumps({"a": None})) == {"a": None}
+
+    custom = mock.Mock(spec=["loads", "dumps"])
+    assert _json.get_codec(custom) is custom
+    with pytest.raises(TypeError):
+        _json.get_codec(object())
+    with pytest.raises(ValueError):
+        _json.get_codec("yaml")
+
+
+def test_stdlib_codec_decodes_bytes():
+    codec = _json.get_codec("json")
+    with mock.patch.object(_json.json, "loads") as mock_loads:
+        codec.loads(b'{"a": "\xc3\xa9"}')
+    mock_loads.assert_called_once_with('{"a": "\u00e9"}')
+
+
+def test_auto_codec_prefers_orjson():
+    orjson = types.ModuleType("orjson")
+    ujson = types.ModuleType("ujson")
+    for module in (orjson, ujson):
+        module.loads, module.dumps = json.loads, json.dumps
+    with mock.patch.dict(sys.modules, {"orjson": orjson, "ujson": ujson}):
+        assert _json.get_codec("auto").name == "orjson"
+    with mock.patch.dict(sys.modules, {"orjson": None, "ujson": ujson}):
+        assert _json.get_codec("auto").name == "ujson"
+
+
+@mock.patch.dict(sys.modules, {"orjson": None, "ujson": None})
+def test_auto_codec_falls_back_to_stdlib():
+    assert _json.get_codec("auto").name == "json"
+    with pytest.raises(ImportError):
+        _json.get_codec("orjson")
+
+
+def test_response_to_json_with_codec():
+    codec = mock.Mock(wraps=_json.get_codec("json"))
+    response = make_response(body='[{"id": 1}]')
+    assert _response_to_json(response, codec) == [{"id": 1}]
+    codec.loads.assert_called_once_with(response.content)
+
+
+def test_pagination_with_codec():
+    codec = mock.Mock(wraps=_json.get_codec("json"))
+    endpoint = mock.Mock(_return_type="snake")
+    endpoint._make_request.side_effect = [make_response(body='[{"id": 1}]'),
+                                          make_response(body='[]')]
+    pages = PaginatedResponse("objects", {}, endpoint, json_codec=codec)
+    assert [obj.id for obj in pages] == [1]
+    assert codec.loads.call_count == 2
+
+
+def test_endpoint_encodes_and_decodes_with_codec():
+    codec = mock.Mock(wraps=_json.get_codec("json"))
+    session = mock.Mock()
+    session.request.return_value = make_response(body='{"id": 5}')
+    endpoint = Endpoint(session, return_type="snake", json_codec=codec)
+
+    result = endpoint._call_api("post", "scripts", data={"name": "x"})
+
+    assert result.id == 5
+    kwargs = session.request.call_args[1]
+    assert kwargs["json"] is None
+    assert json.loads(kwargs["data"]) == {"name": "x"}
+    assert kwargs["headers"]["Content-Type"] == "application/json"
+    assert codec.loads.call_count == 1
@@ -0,0 +1,173 @@
+import threading
+from unittest import mock
+
+import pytest
+import requests
+from requests.packages.urllib3.util import Retry
+
+import civis
+from civis import retries
+from civis.base import CivisAPIError, Endpoint
+from civis.metrics import (Histogram, MetricsRegistry, RequestHook,
+                           RequestInfo)
+from civis.retries import RetryPolicy
+from civis.tests.helpers import (JSONHandler, civis_api_spec, local_server,
+                                 make_response)
+
+
+def _response(status_code=200, body=None, sent=None):
+    request = requests.Request(
+        "POST", "https://api.civisanalytics.com", data=sent).prepare()
+    return make_response(status_code, body,
+                         headers={"X-RateLimit-Limit": "1000",
+                                  "X-RateLimit-Remaining": "999",
+                                  "Content-Type": "application/json"},
+                         request=request)
+
+
+class _BusyOnceHandler(JSONHandler):
+    """Answer the first request with a 503 and the rest successfully."""
+    lock = threading.Lock()
+    statuses = None
+
+    def do_GET(self):
+        with self.lock:
+            status = 503 if not self.statuses else 200
+            self.statuses.append(status)
+        self.send_json(status, {"id": 7, "state": "succeeded"})
+
+
+class RecordingHook(RequestHook):
+    def __init__(self):
+        self.calls = []
+
+    def before_request(self, info):
+        self.calls.append(("before", info.method, info.path_template,
+                           info.status_code))
+
+    def after_request(self, info):
+        self.calls.append(("after", info.method, info.path_template,
+                           info.status_code))
+        self.info = info
+
+
+def test_hooks_receive_request_info():
+    hook = RecordingHook()
+    session = mock.Mock()
+    session.request.return_value = _response(sent=b'{"name":"x"}')
+    endpoint = Endpoint(session, return_type="raw", hooks=[hook])
+
+    endpoint._call_api("post", "scripts/5/runs", data={"name": "x"},
+                       path_template="scripts/{id}/runs")
+
+    assert hook.calls == [("before", "POST", "scripts/{id}/runs", None),
+                          ("after", "POST", "scripts/{id}/runs", 200)]
+    info = hook.info
+    assert info.path == "scripts/5/runs"
+    assert (info.bytes_sent, info.bytes_received) == (12, 9)
+    assert info.retries == 0
+    assert info.latency >= 0
+    assert info.rate_limit == {"X-RateLimit-Limit": "1000",
+                               "X-RateLimit-Remaining": "999"}
+
+
+@mock.patch.object(retries.time, "sleep")
+def test_hooks_count_retries_and_errors(mock_sleep):
+    hook = RecordingHook()
+    session = mock.Mock()
+    session.request.side_effect = [
+        _response(503, b'{"errorDescription": "busy"}'),
+        _response(404, b'{"errorDescription": "not found"}'),
+        requests.ConnectionError("down"),
+    ]
+    endpoint = Endpoint(session, return_type="raw", hooks=[hook],
+                        retry_policy=RetryPolicy(max_retries=1))
+
+    with pytest.raises(CivisAPIError):
+        endpoint._call_api("get", "scripts/5")
+    assert (hook.info.status_code, hook.info.retries) == (404, 1)
+    assert hook.info.path_template == "scripts/5"
+
+    with pytest.raises(requests.ConnectionError):
+        endpoint._call_api("post", "scripts")
+    assert hook.info.status_code is None
+    assert isinstance(hook.info.error, requests.ConnectionError)
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(0.1, 1, 10))
+    assert histogram.quantile(0.5) is None
+    for value in (0.05, 0.5, 0.5, 5, 50):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 1]
+    assert histogram.sum == pytest.approx(56.05)
+    assert histogram.quantile(0.5) == 1
+    assert histogram.quantile(0.8) == 10
+    assert histogram.quantile(1) == float("inf")
+
+
+def test_metrics_registry_groups_by_endpoint():
+    registry = MetricsRegistry()
+    for path, template, latency, status in [
+            ("scripts/1", "scripts/{id}", 0.2, 200),
+            ("scripts/2", "scripts/{id}", 0.3, 404),
+            ("users/me", "users/me", 0.1, 200)]:
+        info = RequestInfo("GET", path, template)
+        info.status_code = status
+        info.latency = latency
+        info.bytes_received = 10
+        info.rate_limit = {"X-RateLimit-Remaining": "5"}
+        registry.after_request(info)
+
+    stats = registry.get("get", "scripts/{id}")
+    assert (stats.requests, stats.errors, stats.bytes_received) == (2, 1, 20)
+    assert stats.status_codes == {200: 1, 404: 1}
+    assert stats.latency.sum == pytest.approx(0.5)
+    assert [s.path_template for s in registry.top(1)] == ["scripts/{id}"]
+    assert len(registry.snapshot()) == 2
+    assert registry.rate_limit == {"X-RateLimit-Remaining": "5"}
+
+    registry.reset()
+    assert registry.snapshot() == []
+    assert registry.get("GET", "scripts/{id}") is None
+
+
+@mock.patch('civis.resources._resources.get_swagger_spec',
+            return_value=civis_api_spec)
+def test_client_metrics_option(mock_spec):
+    hook = RecordingHook()
+    client = civis.APIClient(api_key='key', metrics=True, hooks=[hook])
+    assert isinstance(client.metrics, MetricsRegistry)
+    assert client.scripts._hooks == (hook, client.metrics)
+
+    with mock.patch.object(client._session, "request",
+                           return_value=_response()):
+        client.scripts.get_sql_runs(5, 7)
+    stats = client.metrics.get("GET", "scripts/sql/{id}/runs/{run_id}")
+    assert stats.requests == 1
+    assert hook.info.path == "scripts/sql/5/runs/7"
+
+    client = civis.APIClient(api_key='key')
+    assert client.metrics is None
+    assert client.scripts._hooks == ()
+
+
+@pytest.mark.skipif(not hasattr(Retry(), "history"),
+                    reason="urllib3 only records retries from version 1.19")
+@mock.patch('civis.resources._resources.get_swagger_spec',
+            return_value=civis_api_spec)
+@mock.patch.object(Retry, "get_backoff_time", return_value=0)
+def test_hooks_count_adapter_retries(mock_backoff, mock_spec):
+    # The default client leaves retries to the urllib3 adapter. The
+    # request is sent once, but it was retried once.
+    hook = RecordingHook()
+    handler = type("Handler", (_BusyOnceHandler,), {"statuses": []})
+    with local_server(handler) as url:
+        client = civis.APIClient(api_key='key', base_url=url, metrics=True,
+                                 hooks=[hook])
+        run = client.scripts.get_sql_runs(5, 7)
+
+    assert run.state == "succeeded"
+    assert handler.statuses == [503, 200]
+    assert (hook.info.status_code, hook.info.retries) == (200, 1)
+    assert client.metrics.snapshot()[0].retries == 1
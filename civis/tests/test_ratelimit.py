@@ -0,0 +1,96 @@
+import time
+from unittest import mock
+
+import pytest
+
+from civis import ratelimit
+from civis.base import Endpoint
+from civis.polling import PollableResult
+from civis.response import Response
+from civis.tests.helpers import make_response
+
+
+def _response(limit=None, remaining=None, status_code=200):
+    headers = {}
+    if limit is not None:
+        headers["X-RateLimit-Limit"] = str(limit)
+    if remaining is not None:
+        headers["X-RateLimit-Remaining"] = str(remaining)
+    return make_response(status_code, headers=headers)
+
+
+def test_limiter_learns_from_headers():
+    limiter = ratelimit.RateLimiter()
+    limiter.acquire()
+    limiter.acquire()
+    assert limiter.limit is None
+
+    limiter.release(_response(limit=1000, remaining=500))
+    assert limiter.limit == 1000
+    # One request is still in flight and not yet counted by the API.
+    assert limiter.tokens == pytest.approx(499, abs=1)
+
+    limiter.release(_response(status_code=429))
+    assert limiter.tokens < 1
+
+
+def test_limiter_paces_requests():
+    limiter = ratelimit.RateLimiter(limit=2, period=0.2)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release()
+    # The first two requests use up the bucket, and the third has to wait
+    # for a new token, which takes period / limit seconds.
+    assert time.monotonic() - start >= 0.09
+
+
+def test_background_requests_leave_a_reserve():
+    limiter = ratelimit.RateLimiter(limit=10, period=1, reserve=0.5)
+    with ratelimit.background():
+        for _ in range(5):
+            limiter.acquire()
+            limiter.release()
+        assert limiter._wait_time(True) > 0
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start < 0.05
+    limiter.release()
+
+
+def test_shared_rate_limiter():
+    limiter = ratelimit.shared_rate_limiter("key")
+    assert ratelimit.shared_rate_limiter("key") is limiter
+    assert ratelimit.shared_rate_limiter("other key") is not limiter
+
+
+def test_endpoint_uses_rate_limiter():
+    limiter = mock.Mock(spec=ratelimit.RateLimiter)
+    session = mock.Mock()
+    session.request.return_value = _response(1000, 999)
+    endpoint = Endpoint(session, return_type="raw", rate_limiter=limiter)
+
+    endpoint._make_request("get", "scripts")
+
+    limiter.acquire.assert_called_once_with()
+    limiter.release.assert_called_once_with(session.request.return_value)
+
+    session.request.side_effect = ConnectionError
+    with pytest.raises(ConnectionError):
+        endpoint._make_request("get", "scripts")
+    limiter.release.assert_called_with(None)
+
+
+def test_polling_is_background():
+    contexts = []
+
+    def poller():
+        contexts.append(ratelimit._is_background())
+        return Response({"state": "running"})
+
+    result = PollableResult(poller, (), polling_interval=60)
+    # Poll once in this thread, without starting the polling thread.
+    result._self_polling_executor = mock.Mock()
+    result._check_result()
+    assert contexts == [True]
+    assert not ratelimit._is_background()
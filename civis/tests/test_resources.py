@@ -1,16 +1,12 @@
 from collections import defaultdict, OrderedDict
+import inspect
 import json
-import os
 import pytest
 from unittest import mock
 
-from jsonref import JsonRef
-
 from civis.resources import _resources
-
-THIS_DIR = os.path.dirname(os.path.realpath(__file__))
-with open(os.path.join(THIS_DIR, "civis_api_spec.json")) as f:
-    civis_api_spec = json.load(f, object_pairs_hook=OrderedDict)
+from civis.resources._refs import RefResolver
+from civis.tests.helpers import civis_api_spec, make_response
 
 
 RESPONSE_DOC = (
@@ -49,7 +45,7 @@ def test_create_method_iterator_kwarg():
 
     method(mock_endpoint, iterator=True)
     mock_endpoint._call_api.assert_called_once_with(
-        'get', '/objects', {}, {}, iterator=True)
+        'get', '/objects', {}, {}, iterator=True, path_template='/objects')
 
 
 def test_create_method_no_iterator_kwarg():
@@ -73,7 +69,33 @@ def test_create_method_no_iterator_kwarg():
     mock_endpoint2 = mock.MagicMock()
     method2(mock_endpoint2, iterator=True)
     mock_endpoint2._call_api.assert_called_once_with(
-        'get', '/objects', {}, {}, iterator=False)
+        'get', '/objects', {}, {}, iterator=False, path_template='/objects')
+
+
+def test_create_method_deferred_doc():
+    args = [{"name": 'id', "in": 'path', "required": True}]
+    build_doc = mock.Mock(return_value='lazy doc')
+    method = _resources.create_method(args, 'get', 'get_objects',
+                                      '/objects/{id}', build_doc)
+    assert method.__name__ == 'get_objects'
+    build_doc.assert_not_called()
+
+    mock_endpoint = mock.MagicMock()
+    method(mock_endpoint, 5)
+    mock_endpoint._call_api.assert_called_once_with(
+        'get', '/objects/5', {}, {}, iterator=False,
+        path_template='/objects/{id}')
+    build_doc.assert_not_called()
+
+    assert method.__doc__ == 'lazy doc'
+    assert inspect.getdoc(method) == 'lazy doc'
+    assert build_doc.call_count == 1
+
+    cls = type('Objects', (object,), {'get_objects': method})
+    bound = cls().get_objects
+    assert bound.__doc__ == 'lazy doc'
+    assert str(inspect.signature(bound)) == '(id)'
+    assert inspect.isroutine(cls.get_objects)
 
 
 def test_exclude_resource():
@@ -167,6 +189,18 @@ def test_parse_params():
     assert y == expect_y
 
 
+def test_parse_args_matches_parse_params():
+    resolver = RefResolver(civis_api_spec)
+    resolved_civis_api_spec = resolver.resolve(civis_api_spec)
+    for ops in resolved_civis_api_spec['paths'].values():
+        for verb, op in ops.items():
+            args, _ = _resources.parse_params(op['parameters'], 'summary',
+                                              verb)
+            for arg in args:
+                del arg['doc']
+            assert _resources.parse_args(op['parameters'], verb) == args
+
+
 def test_parse_param_body():
     expected = [{'required': False, 'name': 'a', 'in': 'body',
                  'doc': 'a : list, optional\n'}]
@@ -194,7 +228,8 @@ def test_parse_method_name():
 
 
 def test_duplicate_names_generated_from_swagger():
-    resolved_civis_api_spec = JsonRef.replace_refs(civis_api_spec)
+    resolver = RefResolver(civis_api_spec)
+    resolved_civis_api_spec = resolver.resolve(civis_api_spec)
     paths = resolved_civis_api_spec['paths']
     classes = defaultdict(list)
     for path, ops in paths.items():
@@ -204,3 +239,112 @@ def test_duplicate_names_generated_from_swagger():
     for cls, names in classes.items():
         err_msg = "Duplicate methods in {}: {}".format(cls, sorted(names))
         assert len(set(names)) == len(names), err_msg
+
+
+def test_ref_resolver():
+    spec = {"definitions": {"Obj": {"properties": {"a": {"type": "string"}}},
+                            "Tree": {"properties": {"child": {
+                                "$ref": "#/definitions/Tree"}}}},
+            "paths": {"/x": {"get": {"schema": {"$ref": "#/definitions/Obj"},
+                                     "items": [{"$ref": "#/definitions/Obj"},
+                                               "plain"]}}}}
+    resolver = RefResolver(spec)
+    op = resolver.resolve(spec["paths"]["/x"])["get"]
+    assert op["schema"] == spec["definitions"]["Obj"]
+    # Definitions are resolved once and shared.
+    assert op["items"][0] is op["schema"]
+    assert op["items"][1] == "plain"
+    # The spec itself is not modified.
+    assert spec["paths"]["/x"]["get"]["schema"] == {
+        "$ref": "#/definitions/Obj"}
+
+    tree = resolver.resolve({"$ref": "#/definitions/Tree"})
+    assert tree["properties"]["child"] is tree
+
+    with pytest.raises(ValueError):
+        resolver.resolve({"$ref": "other.json#/definitions/Obj"})
+
+
+def test_lazy_classes_match_parse_swagger():
+    resolver = RefResolver(civis_api_spec)
+    resolved_civis_api_spec = resolver.resolve(civis_api_spec)
+    eager = _resources.parse_swagger(resolved_civis_api_spec, "1.0", "base")
+    lazy = _resources.LazyClasses(resolved_civis_api_spec, "1.0", "base")
+
+    # No classes are built until they are looked up.
+    assert lazy._classes == {}
+    assert sorted(lazy) == sorted(eager)
+    assert len(lazy) == len(eager)
+    assert "scripts" in lazy
+    assert sorted(lazy._classes) == ["scripts"]
+
+    for name, cls in eager.items():
+        lazy_cls = lazy[name]
+        assert lazy_cls.__name__ == cls.__name__
+        assert lazy[name] is lazy_cls
+        methods = {k for k in vars(cls) if not k.startswith('_')}
+        lazy_methods = {k for k in vars(lazy_cls) if not k.startswith('_')}
+        assert lazy_methods == methods
+
+    with pytest.raises(KeyError):
+        lazy["not_a_resource"]
+
+
+@mock.patch.dict(_resources._class_cache, clear=True)
+def test_cached_classes_shared_by_content():
+    spec_copy = json.loads(json.dumps(civis_api_spec),
+                           object_pairs_hook=OrderedDict)
+    with mock.patch.object(_resources, 'parse_swagger',
+                           wraps=_resources.parse_swagger) as parse:
+        classes = _resources.cached_classes(civis_api_spec, "1.0", "base")
+        assert _resources.cached_classes(spec_copy, "1.0", "base") is classes
+        assert parse.call_count == 1
+
+        all_classes = _resources.cached_classes(spec_copy, "1.0", "all")
+        assert all_classes is not classes
+        assert parse.call_count == 2
+
+    lazy = _resources.cached_classes(civis_api_spec, "1.0", "base", True)
+    assert isinstance(lazy, _resources.LazyClasses)
+    assert _resources.cached_classes(spec_copy, "1.0", "base", True) is lazy
+
+
+@mock.patch.dict(_resources._class_cache, clear=True)
+def test_generate_classes_uses_cache():
+    with mock.patch.object(_resources, 'get_swagger_spec',
+                           return_value=civis_api_spec):
+        classes = _resources.generate_classes('key', 'agent')
+        other_user = _resources.generate_classes('other key', 'agent')
+    assert other_user is classes
+
+
+def test_spec_digest():
+    spec_copy = json.loads(json.dumps(civis_api_spec),
+                           object_pairs_hook=OrderedDict)
+    digest = _resources.spec_digest(civis_api_spec)
+    assert _resources.spec_digest(spec_copy) == digest
+    changed = OrderedDict(civis_api_spec, info={'version': 'changed'})
+    assert _resources.spec_digest(changed) != digest
+
+
+@mock.patch.dict(_resources._spec_memo, clear=True)
+def test_get_swagger_spec_revalidates_after_ttl(tmpdir, monkeypatch):
+    monkeypatch.setenv("CIVIS_API_SPEC_CACHE", str(tmpdir.join("spec.json")))
+    monkeypatch.setenv("CIVIS_API_SPEC_CACHE_TTL", "60")
+    spec = {"swagger": "2.0", "paths": {}}
+    responses = [make_response(body=json.dumps(spec),
+                               headers={"ETag": '"v1"'}),
+                 make_response(304, body=b"", headers={"ETag": '"v1"'})]
+
+    with mock.patch.object(_resources.requests.Session, "get",
+                           side_effect=responses) as mock_get:
+        assert _resources.get_swagger_spec('key', 'agent', '1.0') == spec
+        # Reused from memory within the TTL
+        assert _resources.get_swagger_spec('key', 'agent', '1.0') == spec
+        assert mock_get.call_count == 1
+
+        later = _resources.time.time() + 120
+        with mock.patch.object(_resources.time, "time", return_value=later):
+            assert _resources.get_swagger_spec('key', 'agent', '1.0') == spec
+    assert mock_get.call_count == 2
+    assert mock_get.call_args[1]["headers"] == {"If-None-Match": '"v1"'}
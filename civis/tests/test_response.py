@@ -1,3 +1,6 @@
+import json
+import pickle
+
 import pytest
 from unittest import mock
 
@@ -135,3 +138,41 @@ def test_convert_data_type_civis_list():
     assert isinstance(data[0], Response)
     assert data[0]['foo'] == 'bar'
     assert data[0].headers == {'header': 'val'}
+
+
+def test_response_converts_nested_values_on_access():
+    json_data = {'fooBar': 1, 'lastRun': {'errorMessage': None},
+                 'runs': [{'runId': 1}, 2]}
+    response = Response(json_data, headers={'X-RateLimit-Remaining': '9'})
+
+    assert list(response) == ['foo_bar', 'last_run', 'runs']
+    assert dict.__getitem__(response, 'last_run') is json_data['lastRun']
+    last_run = response.last_run
+    assert isinstance(last_run, Response)
+    assert last_run == {'errorMessage': None}
+    assert response['last_run'] is last_run
+    assert response.runs[0].run_id == 1
+    assert response.runs[1] == 2
+    assert response.calls_remaining == '9'
+    with pytest.raises(AttributeError):
+        response.missing
+
+
+def test_response_matches_converted_data():
+    json_data = {'fooBar': {'bazQux': [{'deepKey': 1}]},
+                 'items': [{'itemId': 2}], 'jsonData': 3}
+    converted = {'foo_bar': {'bazQux': [{'deep_key': 1}]},
+                 'items': [{'item_id': 2}], 'json_data': 3}
+
+    assert Response(json_data) == converted
+    assert repr(Response(json_data)) == repr(converted)
+    assert Response(json_data).get('foo_bar') == converted['foo_bar']
+    # Keys named like attributes of the response are attributes too.
+    assert Response(json_data).items == [{'item_id': 2}]
+    assert Response(json_data).json_data == 3
+
+    json_data.pop('items')
+    converted.pop('items')
+    assert json.loads(json.dumps(Response(json_data))) == converted
+    assert dict(Response(json_data)) == converted
+    assert pickle.loads(pickle.dumps(Response(json_data))) == converted
@@ -0,0 +1,109 @@
+from unittest import mock
+
+import pytest
+import requests
+
+import civis
+from civis import retries
+from civis.base import CivisAPIError, Endpoint
+from civis.retries import RetryPolicy
+from civis.tests.helpers import civis_api_spec, make_response
+
+
+@pytest.mark.parametrize("method,status,error,expected", [
+    ("GET", 503, None, True),
+    ("POST", 503, None, False),
+    ("POST", 429, None, True),
+    ("GET", 404, None, False),
+    ("DELETE", None, requests.exceptions.ReadTimeout(), True),
+    ("POST", None, requests.exceptions.ReadTimeout(), False),
+    ("POST", None, requests.exceptions.ConnectTimeout(), True),
+    ("PUT", None, requests.ConnectionError(), True),
+    ("GET", None, requests.TooManyRedirects(), False),
+])
+def test_is_retryable(method, status, error, expected):
+    response = None if status is None else make_response(status)
+    policy = RetryPolicy()
+    assert policy.is_retryable(method, response, error) is expected
+
+
+def test_next_delay_is_jittered_and_capped():
+    policy = RetryPolicy(base_delay=1, max_delay=10)
+    with mock.patch.object(retries.random, "uniform",
+                           side_effect=lambda a, b: b) as uniform:
+        assert policy.next_delay() == 3
+        assert policy.next_delay(3) == 9
+        assert policy.next_delay(9) == 10
+        assert uniform.call_args_list[1] == mock.call(1, 9)
+
+
+def test_next_delay_honors_retry_after():
+    policy = RetryPolicy(base_delay=1, max_delay=10)
+    with mock.patch.object(retries.random, "uniform", return_value=1):
+        assert policy.next_delay(
+            response=make_response(429, headers={"Retry-After": "30"})) == 30
+        assert policy.next_delay(
+            response=make_response(429, headers={"Retry-After": "soon"})) == 1
+        date = "Thu, 01 Jan 2026 00:01:00 GMT"
+        with mock.patch.object(retries.time, "time",
+                               return_value=1767225600):
+            response = make_response(503, headers={"Retry-After": date})
+            assert policy.next_delay(response=response) == 60
+
+
+@mock.patch.object(retries.time, "sleep")
+def test_run_retries_until_success(mock_sleep):
+    send = mock.Mock(side_effect=[requests.ConnectionError(),
+                                  make_response(503), make_response(200)])
+    response = RetryPolicy().run("GET", send)
+    assert response.status_code == 200
+    assert send.call_count == 3
+    assert mock_sleep.call_count == 2
+
+
+@mock.patch.object(retries.time, "sleep")
+def test_run_gives_up(mock_sleep):
+    send = mock.Mock(return_value=make_response(503))
+    assert RetryPolicy(max_retries=2).run("GET", send).status_code == 503
+    assert send.call_count == 3
+
+    send = mock.Mock(side_effect=requests.exceptions.ReadTimeout())
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        RetryPolicy(max_retries=2).run("GET", send)
+    assert send.call_count == 3
+
+    # A wait which would exceed the total retry time isn't made.
+    send = mock.Mock(
+        return_value=make_response(429, headers={"Retry-After": "600"}))
+    assert RetryPolicy(max_total_time=60).run("POST", send).status_code == 429
+    assert send.call_count == 1
+    assert mock_sleep.call_count == 4
+
+
+@mock.patch.object(retries.time, "sleep")
+def test_endpoint_retries_with_policy(mock_sleep):
+    session = mock.Mock()
+    session.request.side_effect = [make_response(502), make_response(200),
+                                   make_response(502)]
+    endpoint = Endpoint(session, return_type="raw",
+                        retry_policy=RetryPolicy())
+    assert endpoint._call_api("get", "scripts/5").status_code == 200
+    with pytest.raises(CivisAPIError):
+        endpoint._call_api("post", "scripts", data={})
+    assert session.request.call_count == 3
+
+
+@mock.patch('civis.resources._resources.get_swagger_spec',
+            return_value=civis_api_spec)
+def test_client_retry_policy_option(mock_spec):
+    client = civis.APIClient(api_key='key', retry_total=3, retry_policy=True)
+    policy = client.scripts._retry_policy
+    assert isinstance(policy, RetryPolicy)
+    assert policy.max_retries == 3
+    adapter = client._session.get_adapter("https://api.civisanalytics.com")
+    assert adapter.max_retries.total == 0
+
+    client = civis.APIClient(api_key='key', retry_total=3)
+    assert client.scripts._retry_policy is None
+    adapter = client._session.get_adapter("https://api.civisanalytics.com")
+    assert adapter.max_retries.total == 3
@@ -0,0 +1,226 @@
+from email.utils import formatdate
+import json
+import os
+from unittest import mock
+
+import requests
+
+from civis import _spec_cache
+from civis.tests.helpers import JSONHandler, local_server
+
+
+SPEC = {"swagger": "2.0", "paths": {"/scripts/": {}}}
+
+
+def _fetcher(spec=SPEC):
+    response = mock.Mock(text=json.dumps(spec), status_code=200, headers={})
+    return mock.Mock(return_value=response)
+
+
+def test_load_spec_writes_and_reuses_cache(tmpdir):
+    cache = str(tmpdir.join("spec.json"))
+    path = _spec_cache.entry_path(cache, "key")
+    fetch = _fetcher()
+
+    spec = _spec_cache.load_spec(fetch, "key", "1.0", path=cache, ttl=60)
+    assert spec == SPEC
+    assert fetch.call_count == 1
+    assert os.listdir(str(tmpdir)) == [os.path.basename(path)]
+
+    spec = _spec_cache.load_spec(fetch, "key", "1.0", path=cache, ttl=60)
+    assert spec == SPEC
+    assert fetch.call_count == 1
+
+
+def test_load_spec_refreshes_stale_cache(tmpdir):
+    cache = str(tmpdir.join("spec.json"))
+    path = _spec_cache.entry_path(cache, "key")
+    _spec_cache.write_entry(path, "key", "1.0", {"old": "spec"})
+    fetch = _fetcher()
+
+    with mock.patch.object(_spec_cache.time, "time",
+                           return_value=_spec_cache.time.time() + 120):
+        spec = _spec_cache.load_spec(fetch, "key", "1.0", path=cache, ttl=60)
+    assert spec == SPEC
+    assert fetch.call_count == 1
+    fetch.assert_called_once_with({})
+    assert _spec_cache.read_entry(path, "key", "1.0")["spec"] == SPEC
+
+
+class _SpecHandler(JSONHandler):
+    """Serve SPEC at /endpoints, honoring conditional request headers."""
+    etag = '"v1"'
+    last_modified = formatdate(0, usegmt=True)
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(dict(self.headers))
+        if (self.headers.get("If-None-Match") == self.etag or
+                self.headers.get("If-Modified-Since") == self.last_modified):
+            self.send_json(304, headers={"ETag": self.etag})
+            return
+        self.send_json(200, SPEC,
+                       headers={"ETag": self.etag,
+                                "Last-Modified": self.last_modified})
+
+
+def test_load_spec_revalidates_against_server(tmpdir):
+    cache = str(tmpdir.join("spec.json"))
+    path = _spec_cache.entry_path(cache, "key")
+    handler = type("Handler", (_SpecHandler,), {"requests": []})
+
+    with local_server(handler) as url:
+        def fetch(headers):
+            return requests.get(url + "endpoints", headers=headers)
+
+        spec = _spec_cache.load_spec(fetch, "key", "1.0", path=cache, ttl=60)
+        assert spec == SPEC
+        entry = _spec_cache.read_entry(path, "key", "1.0")
+        assert entry["etag"] == '"v1"'
+        assert entry["last_modified"] == _SpecHandler.last_modified
+
+        # Make the cached copy stale; the server answers 304, and the
+        # cached spec is reused for another TTL period.
+        stale = _spec_cache.time.time() + 120
+        with mock.patch.object(_spec_cache.time, "time", return_value=stale):
+            spec = _spec_cache.load_spec(fetch, "key", "1.0", path=cache,
+                                         ttl=60)
+        assert spec == SPEC
+        assert len(handler.requests) == 2
+        assert handler.requests[1]["If-None-Match"] == '"v1"'
+        assert (handler.requests[1]["If-Modified-Since"] ==
+                _SpecHandler.last_modified)
+        entry = _spec_cache.read_entry(path, "key", "1.0")
+        assert entry["fetched_at"] == stale
+        assert entry["etag"] == '"v1"'
+
+        # Fresh again, so no request is made.
+        with mock.patch.object(_spec_cache.time, "time", return_value=stale):
+            _spec_cache.load_spec(fetch, "key", "1.0", path=cache, ttl=60)
+        assert len(handler.requests) == 2
+
+
+def test_load_spec_replaces_modified_spec(tmpdir):
+    cache = str(tmpdir.join("spec.json"))
+    path = _spec_cache.entry_path(cache, "key")
+    _spec_cache.write_entry(path, "key", "1.0", {"old": "spec"}, etag='"v0"')
+    new_spec = {"swagger": "2.0", "paths": {}}
+    response = mock.Mock(text=json.dumps(new_spec), status_code=200,
+                         headers={"ETag": '"v2"'})
+    fetch = mock.Mock(return_value=response)
+
+    with mock.patch.object(_spec_cache.time, "time",
+                           return_value=_spec_cache.time.time() + 120):
+        spec = _spec_cache.load_spec(fetch, "key", "1.0", path=cache, ttl=60)
+    assert spec == new_spec
+    fetch.assert_called_once_with({"If-None-Match": '"v0"'})
+    assert _spec_cache.read_entry(path, "key", "1.0")["etag"] == '"v2"'
+
+
+def test_read_entry_rejects_other_users_and_versions(tmpdir):
+    path = str(tmpdir.join("spec.json"))
+    _spec_cache.write_entry(path, "key", "1.0", SPEC)
+
+    assert _spec_cache.read_entry(path, "key", "1.0")["spec"] == SPEC
+    assert _spec_cache.read_entry(path, "other key", "1.0") is None
+    assert _spec_cache.read_entry(path, "key", "2.0") is None
+    with open(path) as f:
+        assert '"key"' not in f.read()
+
+
+def test_read_entry_rejects_other_base_urls(tmpdir):
+    path = str(tmpdir.join("spec.json"))
+    _spec_cache.write_entry(path, "key", "1.0", SPEC,
+                            base_url="http://localhost:8080/")
+    assert _spec_cache.read_entry(path, "key", "1.0") is None
+    assert _spec_cache.read_entry(
+        path, "key", "1.0", "http://localhost:8080/")["spec"] == SPEC
+
+    # Entries written before the base URL was recorded are for the public
+    # API.
+    with open(path) as f:
+        entry = json.load(f)
+    del entry["base_url"]
+    with open(path, "w") as f:
+        json.dump(entry, f)
+    assert _spec_cache.read_entry(path, "key", "1.0")["spec"] == SPEC
+
+
+def test_read_entry_ignores_unusable_files(tmpdir):
+    missing = str(tmpdir.join("missing.json"))
+    assert _spec_cache.read_entry(missing, "key", "1.0") is None
+
+    corrupt = tmpdir.join("corrupt.json")
+    corrupt.write('{"cache_version": 1, "spec": {')
+    assert _spec_cache.read_entry(str(corrupt), "key", "1.0") is None
+
+    # A raw spec as written by older versions of the CLI.
+    raw = tmpdir.join("raw.json")
+    raw.write(json.dumps(SPEC))
+    assert _spec_cache.read_entry(str(raw), "key", "1.0") is None
+
+
+def test_load_spec_without_cache(tmpdir):
+    cache = str(tmpdir.join("spec.json"))
+    fetch = _fetcher()
+
+    _spec_cache.load_spec(fetch, "key", "1.0", path=cache, ttl=0)
+    _spec_cache.load_spec(fetch, "key", "1.0", path=cache, ttl=0)
+    assert fetch.call_count == 2
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_load_spec_caches_each_key_and_base_url(tmpdir):
+    cache = str(tmpdir.join("spec.json"))
+    clients = [("key", "https://api.civisanalytics.com/"),
+               ("other key", "https://api.civisanalytics.com/"),
+               ("key", "https://civis.example.com/")]
+    fetch = _fetcher()
+
+    # Alternating between users and APIs doesn't evict their cached specs.
+    for _ in range(2):
+        for api_key, base_url in clients:
+            _spec_cache.load_spec(fetch, api_key, "1.0", path=cache, ttl=60,
+                                  base_url=base_url)
+    assert fetch.call_count == 3
+    assert sorted(os.listdir(str(tmpdir))) == sorted(
+        os.path.basename(_spec_cache.entry_path(cache, api_key, base_url))
+        for api_key, base_url in clients)
+    assert all(name.startswith("spec-") and name.endswith(".json")
+               for name in os.listdir(str(tmpdir)))
+
+
+@mock.patch.dict(os.environ, {"CIVIS_API_SPEC_CACHE": "/tmp/spec.json",
+                              "CIVIS_API_SPEC_CACHE_TTL": "30"})
+def test_cache_configuration_from_environment():
+    assert _spec_cache.cache_path() == "/tmp/spec.json"
+    assert _spec_cache.cache_ttl() == 30
+
+
+def test_load_spec_prunes_old_cache_files(tmpdir):
+    cache = str(tmpdir.join("spec.json"))
+    old = _spec_cache.entry_path(cache, "old key")
+    recent = _spec_cache.entry_path(cache, "recent key")
+    for path in (old, recent):
+        _spec_cache.write_entry(path, "key", "1.0", SPEC)
+    tmpdir.join("other.json").write("{}")
+    long_ago = _spec_cache.time.time() - 120
+    os.utime(old, (long_ago, long_ago))
+    os.utime(str(tmpdir.join("other.json")), (long_ago, long_ago))
+
+    _spec_cache.load_spec(_fetcher(), "key", "1.0", path=cache, ttl=60)
+    assert sorted(os.listdir(str(tmpdir))) == sorted(
+        ["other.json", os.path.basename(recent),
+         os.path.basename(_spec_cache.entry_path(cache, "key"))])
+
+
+def test_load_spec_does_not_cache_local_apis(tmpdir):
+    cache = str(tmpdir.join("spec.json"))
+    fetch = _fetcher()
+
+    for base_url in ["http://127.0.0.1:8080/", "http://localhost:8080/",
+                     "http://[::1]:8080/"]:
+        _spec_cache.load_spec(fetch, "key", "1.0", path=cache, ttl=60,
+                              base_url=base_url)
+    assert fetch.call_count == 3
+    assert os.listdir(str(tmpdir)) == []
@@ -306,6 +306,8 @@ texinfo_documents = [
 
 nitpick_ignore = [
     ('envvar', 'CIVIS_API_KEY'),
+    ('envvar', 'CIVIS_API_SPEC_CACHE'),
+    ('envvar', 'CIVIS_API_SPEC_CACHE_TTL'),
     ('py:class', 'concurrent.futures._base.Future')
 ]
 numpydoc_show_class_members = False
@@ -369,14 +371,12 @@ _test_build = os.getenv('TRAVIS') == 'true' or _on_rtd
 if _test_build:
     import json
     from collections import OrderedDict
-    from jsonref import JsonRef
 
     this_dir = os.path.dirname(os.path.realpath(__file__))
     test_dir = os.path.join(this_dir, os.pardir, os.pardir, 'civis', 'tests')
     swagger_path = os.path.join(test_dir, 'civis_api_spec.json')
     with open(swagger_path) as _raw:
-        swagger = JsonRef.replace_refs(
-            json.load(_raw, object_hook=OrderedDict))
+        swagger = json.load(_raw, object_hook=OrderedDict)
     extra_classes = civis.resources._resources.parse_swagger(
         swagger, '1.0', 'base')
 else: